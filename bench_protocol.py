@@ -0,0 +1,126 @@
+# ===== Thermal UART codec check and microbenchmark =====
+# Needs only the standard library (no serial port, no camera).
+#   check: every setting value and every static command encodes to the same
+#          bytes as the old hex-string builders, decode(encode(x)) gives x back,
+#          and randomly corrupted frames are rejected.
+#   bench: old hex-string path (format + int(x, 16) parse) vs thermal_protocol.
+#          "read" is what the UART read path does per response (checksum_ok
+#          on the framed bytes, then the payload); decode() also checks the
+#          header and length byte and builds a Frame, for tools and tests.
+#
+#   python bench_protocol.py
+#   python bench_protocol.py --seed 7 --cases 20000 --number 200000
+
+import argparse
+import random
+import timeit
+
+import thermal_protocol as tp
+
+# The hex strings the command tables used to hold, and how they were built
+LEGACY_SETTINGS = {
+    "brightness": (0x93, "02 00"),
+    "contrast":   (0x94, "02 01"),
+    "denoise":    (0x98, "02 05"),
+    "vstripe":    (0x9A, "02 07"),
+    "zoom":       (0x96, "04 01"),
+}
+LEGACY_STATIC = {
+    "rainbow": (tp.PALETTES["rainbow"], "68 11 03 01 00 00 80 00 02 01 00"),
+    "green":   (tp.PALETTES["green"],   "68 11 03 01 00 00 81 00 02 01 01"),
+    "metel":   (tp.PALETTES["metel"],   "68 11 03 01 00 00 82 00 02 01 02"),
+    "white":   (tp.PALETTES["white"],   "68 11 03 01 00 00 83 00 02 01 03"),
+    "black":   (tp.PALETTES["black"],   "68 11 03 01 00 00 84 00 02 01 04"),
+    "save":    (tp.PALETTE_SAVE,        "68 11 01 01 00 00 7E 00 03"),
+    "hot on":  (tp.HOTSPOT["on"],       "68 10 03 01 00 00 80 00 02 01 01"),
+    "hot off": (tp.HOTSPOT["off"],      "68 10 03 01 00 00 7F 00 02 01 00"),
+    "model":   (tp.INFO_REQUESTS["chip_model"][0], "68 01 00 01 00 00 6A 00"),
+    "chip id": (tp.INFO_REQUESTS["chip_id"][0],    "68 35 00 01 00 00 9E 00"),
+    "fw":      (tp.INFO_REQUESTS["firmware"][0],   "68 10 02 01 00 00 7C 00 01 00"),
+    "hw":      (tp.INFO_REQUESTS["hardware"][0],   "68 10 02 01 00 00 7D 00 01 01"),
+}
+
+
+def legacy_setting(name, v):
+    opcode, selector = LEGACY_SETTINGS[name]
+    checksum = opcode + v
+    return f"68 24 04 01 00 00 {checksum & 0xFF:02X} {(checksum >> 8) & 0xFF:02X} {selector} {v:02X} 00"
+
+
+def legacy_parse(hex_data):
+    return bytes([int(x, 16) for x in hex_data.split()])
+
+
+def legacy_decode(response):
+    """The old hand decoder: payload if the checksum matches, else 0."""
+    calc = list(response)
+    recv = calc[6] | calc[7] << 8
+    calc[6] = calc[7] = 0
+    return response[8:8 + response[2]] if recv == sum(calc) & 0xFFFF else 0
+
+
+# ===================== CHECK =====================
+def check(cases, rng):
+    for name, (frame, hex_data) in LEGACY_STATIC.items():
+        assert frame == legacy_parse(hex_data), name
+    for name, setting in tp.SETTINGS.items():
+        lo, hi = setting.limits or (0, 0xFF if setting.mask == 0xFF else 1)
+        for v in range(lo, hi + 1):
+            frame = setting.encode(v)
+            assert frame == legacy_parse(legacy_setting(name, v)), (name, v)
+            assert tp.Setting.decode_value(frame) == v and tp.decode(frame).payload[2] == v, (name, v)
+        for bad in (lo - 1, hi + 1):
+            if setting.limits is not None:
+                try:
+                    setting.encode(bad)
+                except ValueError:
+                    continue
+                raise AssertionError(f"{name}={bad} was accepted")
+    corrupted = 0
+    for _ in range(cases):
+        cmd, address = rng.randrange(256), rng.randrange(256)
+        payload = bytes(rng.randrange(256) for _ in range(rng.randrange(64)))
+        frame = tp.encode(cmd, payload, address)
+        assert tp.decode(frame) == (cmd, address, payload)
+        assert legacy_decode(frame) == payload
+        damaged = bytearray(frame)
+        i = rng.randrange(len(damaged))
+        damaged[i] ^= 1 << rng.randrange(8)
+        try:
+            tp.decode(bytes(damaged))
+        except tp.ProtocolError:
+            corrupted += 1
+    # a single flipped bit always changes the byte sum, the length or the header
+    assert corrupted == cases, f"{cases - corrupted} corrupted frames decoded"
+    print(f"check: static commands, every setting value and {cases} random frames OK")
+
+
+# ===================== BENCH =====================
+def bench(number):
+    response = tp.encode(0x24, b"\x02\x00\x80\x00")
+    cases = {
+        "static (hex parse)":  lambda: legacy_parse(LEGACY_STATIC["white"][1]),
+        "static (protocol)":   lambda: tp.PALETTES["white"],
+        "setting (hex)":       lambda: legacy_parse(legacy_setting("brightness", 128)),
+        "setting (protocol)":  lambda: tp.SETTINGS["brightness"].encode(128),
+        "decode (by hand)":    lambda: legacy_decode(response),
+        "read (protocol)":     lambda: tp.checksum_ok(response) and response[tp.HEADER_LEN:],
+        "decode (protocol)":   lambda: tp.decode(response),
+    }
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=number, repeat=5))
+        print(f"{label:22s} {best / number * 1e9:8.0f} ns/op")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Thermal UART codec check and microbenchmark")
+    parser.add_argument("--cases", type=int, default=5000, help="random frames to round-trip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--number", type=int, default=100000, help="calls per timing")
+    args = parser.parse_args(argv)
+    check(args.cases, random.Random(args.seed))
+    bench(args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# ===== Headless benchmark for the day and thermal processing chains =====
+# Runs the same frame-processing code as main_gui.py without cameras or Tk:
+#   day:     videotestsrc with the day_start_stream caps -> FramePump -> render_day_frame
+#            (--gst-scale: crop/scale/convert in the pipeline, as the engine's scaled layout)
+#   thermal: synthetic intensity frames -> capture-style resize -> render_thermal_frame
+#
+#   python benchmark.py                      # full matrix, JSON in ./bench_results
+#   python benchmark.py --quick --frames 120
+#   python benchmark.py --only thermal --out thermal.json
+
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from frame_buffers import FramePool, sample_frame
+from frame_processing import render_day_frame, render_thermal_frame, zoom_box
+from frame_pump import FramePump
+from latency import FrameTrace, Histogram
+from thermal_palette import palette_engine
+from utils import overlay_crosshair
+
+Gst.init(None)
+
+# Same caps strings as day_start_stream / toggle_day_colour_stream
+DAY_CAPS = "video/x-raw,format={fmt},width={w},height={h},framerate=30/1"
+DAY_FORMATS = ["GRAY8", "RGB"]
+DAY_RESOLUTIONS = [(1280, 720), (1920, 1080)]
+ZOOM_LEVELS = [1.0, 2.0, 4.0]
+
+# Display size per fullscreen mode: normal window, Day+Thermal fullscreen, Thermal+Day PiP
+MODE_SIZES = {"normal": (720, 540), "day_thermal": (1920, 1080), "thermal_day": (320, 240)}
+
+THERMAL_SIZE = (640, 480)
+
+
+def _crosshair_in_place(rgb):
+    # per-frame pixel crosshair (gui.py / day_camera.py); main_gui uses a canvas HUD item instead
+    rgb[...] = overlay_crosshair(rgb)
+
+
+# ===================== MEASUREMENT =====================
+class _Run:
+    """Per-configuration counters: wall time, per-frame CPU, latency and stage histograms."""
+
+    def __init__(self):
+        self.frames = 0
+        self.cpu = Histogram()
+        self.latency = Histogram()
+        self.pipeline = Histogram()
+        self.stages = {}
+
+    def add(self, cpu_ms, latency_ms, trace):
+        self.frames += 1
+        self.cpu.add(cpu_ms)
+        self.latency.add(latency_ms)
+        for stage, ms in trace.stages:
+            if stage == "pipeline":
+                self.pipeline.add(ms)
+            else:
+                self.stages.setdefault(stage, Histogram()).add(ms)
+
+    def result(self, config, elapsed, pool=None, alloc_peak=None):
+        res = dict(config)
+        res.update({
+            "frames": self.frames,
+            "seconds": elapsed,
+            "fps": self.frames / elapsed if elapsed else 0.0,
+            "cpu_ms_per_frame": {"mean": self.cpu.mean, "p50": self.cpu.percentile(50),
+                                 "p99": self.cpu.percentile(99)},
+            "latency_ms": {"p50": self.latency.percentile(50), "p90": self.latency.percentile(90),
+                           "p99": self.latency.percentile(99), "max": self.latency.max},
+            "stages_ms": {k: {"mean": h.mean, "p99": h.percentile(99)} for k, h in self.stages.items()},
+        })
+        if self.pipeline.count:
+            res["pipeline_ms"] = {"p50": self.pipeline.percentile(50), "p99": self.pipeline.percentile(99)}
+        if pool is not None:
+            res["pool"] = {"allocated": pool.allocated, "reused": pool.reused}
+        if alloc_peak is not None:
+            res["alloc_peak_mb"] = alloc_peak / (1024 * 1024)
+        return res
+
+
+def _start_alloc(enabled):
+    if enabled:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+
+
+def _stop_alloc(enabled):
+    if not enabled:
+        return None
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+# ===================== DAY =====================
+def bench_day(fmt, resolution, zoom, mode, crosshair, frames, trace_alloc=True, gst_scale=False):
+    """Push `frames` videotestsrc buffers through the day chain as fast as it will go."""
+    w, h = resolution
+    caps = DAY_CAPS.format(fmt=fmt, w=w, h=h)
+    size = MODE_SIZES[mode]
+    if gst_scale:
+        # same elements as payload_engine.scaled_day_pipeline; Python only wraps the result
+        x, y, crop_w, crop_h = zoom_box(w, h, zoom)
+        chain = (f"videocrop left={x} top={y} right={w - x - crop_w} bottom={h - y - crop_h} ! "
+                 f"videoscale add-borders=false ! videoconvert ! "
+                 f"video/x-raw,format=RGB,width={size[0]},height={size[1]},pixel-aspect-ratio=1/1")
+        zoom_py = 1.0
+    else:
+        chain = "videoconvert"
+        zoom_py = zoom
+    pipeline = Gst.parse_launch(
+        f"videotestsrc num-buffers={frames} pattern=ball ! {caps} ! {chain} ! "
+        "appsink name=sink sync=false"
+    )
+    sink = pipeline.get_by_name("sink")
+    sink.set_property("emit-signals", False)
+    sink.set_property("max-buffers", 2)
+    sink.set_property("drop", False)  # every buffer is measured
+
+    pool = FramePool()
+    run = _Run()
+    overlay = _crosshair_in_place if crosshair else None
+    pump = None
+
+    def handler(sample):
+        cpu0, t0 = time.thread_time(), time.monotonic()
+        trace = FrameTrace(pump.capture_ts)
+        trace.mark("pipeline")
+        with sample_frame(sample) as arr:
+            if gst_scale and overlay is None:
+                Image.fromarray(arr)  # what _DisplayBranch.process does
+                trace.mark("fromarray")
+            else:
+                render_day_frame(arr, zoom_py, size, pool, trace, overlay)
+        run.add((time.thread_time() - cpu0) * 1000.0, (time.monotonic() - t0) * 1000.0, trace)
+
+    pump = FramePump(pipeline, sink, handler, active=lambda: not sink.get_property("eos"),
+                     name="bench-day")
+    _start_alloc(trace_alloc)
+    pipeline.set_state(Gst.State.PLAYING)
+    t0 = time.monotonic()
+    pump.start()
+    pump.thread.join()
+    elapsed = time.monotonic() - t0
+    peak = _stop_alloc(trace_alloc)
+    pipeline.set_state(Gst.State.NULL)
+
+    config = {"stream": "day", "format": fmt, "resolution": f"{w}x{h}", "zoom": zoom,
+              "mode": mode, "crosshair": crosshair, "scaling": "gst" if gst_scale else "python"}
+    res = run.result(config, elapsed, pool, peak)
+    res["pump_errors"] = pump.errors
+    return res
+
+
+# ===================== THERMAL =====================
+def synthetic_thermal_frames(count=16, size=THERMAL_SIZE, seed=0):
+    """Grey intensity frames: a moving warm blob on a gradient, plus sensor noise."""
+    w, h = size
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    base = 40 + 60 * (yy / h)
+    frames = []
+    for i in range(count):
+        cx, cy = w * (0.2 + 0.6 * i / count), h / 2
+        blob = 150 * np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2 * (w / 12) ** 2))
+        noise = rng.normal(0, 3, (h, w))
+        frames.append(np.clip(base + blob + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def bench_thermal(palette, mode, crosshair, frames, source=None, trace_alloc=True):
+    """Run the thermal display chain on synthetic frames (capture resize + palette + RGB)."""
+    source = source or synthetic_thermal_frames()
+    size = MODE_SIZES[mode]
+    overlay = _crosshair_in_place if crosshair else None
+    run = _Run()
+    _start_alloc(trace_alloc)
+    t0 = time.monotonic()
+    for i in range(frames):
+        cpu0, t1 = time.thread_time(), time.monotonic()
+        trace = FrameTrace(t1)
+        image = source[i % len(source)]
+        if (image.shape[1], image.shape[0]) != size:
+            # what ThermalCapture._fan_out does for a sized subscriber
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            trace.mark("capture_resize")
+        render_thermal_frame(image, palette, size, trace, overlay)
+        run.add((time.thread_time() - cpu0) * 1000.0, (time.monotonic() - t1) * 1000.0, trace)
+    elapsed = time.monotonic() - t0
+    peak = _stop_alloc(trace_alloc)
+    config = {"stream": "thermal", "resolution": f"{THERMAL_SIZE[0]}x{THERMAL_SIZE[1]}",
+              "palette": palette, "mode": mode, "crosshair": crosshair}
+    return run.result(config, elapsed, alloc_peak=peak)
+
+
+# ===================== MATRIX / CLI =====================
+def day_matrix(quick=False):
+    for fmt in DAY_FORMATS:
+        for res in DAY_RESOLUTIONS[:1] if quick else DAY_RESOLUTIONS:
+            for zoom in ZOOM_LEVELS[:2] if quick else ZOOM_LEVELS:
+                for mode in MODE_SIZES:
+                    for crosshair in (False, True):
+                        yield fmt, res, zoom, mode, crosshair
+
+
+def thermal_matrix(quick=False):
+    palettes = palette_engine.names[:2] if quick else palette_engine.names
+    for palette in palettes:
+        for mode in MODE_SIZES:
+            for crosshair in (False, True):
+                yield palette, mode, crosshair
+
+
+def _describe(res):
+    keys = ("format", "resolution", "palette", "zoom", "mode", "crosshair", "scaling")
+    label = " ".join(f"{k}={res[k]}" for k in keys if k in res)
+    return (f"{res['stream']:7s} {label:70s} {res['fps']:7.1f} fps  "
+            f"cpu {res['cpu_ms_per_frame']['mean']:6.2f} ms  "
+            f"p50/p99 {res['latency_ms']['p50']:.1f}/{res['latency_ms']['p99']:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless day/thermal processing benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="frames per configuration")
+    parser.add_argument("--only", choices=["day", "thermal"], help="run one stream only")
+    parser.add_argument("--quick", action="store_true", help="reduced configuration matrix")
+    parser.add_argument("--no-alloc", action="store_true", help="skip tracemalloc (slightly faster)")
+    parser.add_argument("--gst-scale", action="store_true",
+                        help="also run each day configuration with in-pipeline scaling")
+    parser.add_argument("--out", help="JSON output path (default: bench_results/bench_<time>.json)")
+    args = parser.parse_args(argv)
+
+    results = []
+    trace_alloc = not args.no_alloc
+    if args.only in (None, "day"):
+        for fmt, res, zoom, mode, crosshair in day_matrix(args.quick):
+            for gst_scale in (False, True) if args.gst_scale else (False,):
+                results.append(bench_day(fmt, res, zoom, mode, crosshair, args.frames, trace_alloc, gst_scale))
+                print(_describe(results[-1]), flush=True)
+    if args.only in (None, "thermal"):
+        source = synthetic_thermal_frames()
+        for palette, mode, crosshair in thermal_matrix(args.quick):
+            results.append(bench_thermal(palette, mode, crosshair, args.frames, source, trace_alloc))
+            print(_describe(results[-1]), flush=True)
+
+    out = args.out or os.path.join("bench_results", time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    meta = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "gstreamer": Gst.version_string(),
+        "cpu_count": os.cpu_count(),
+        "frames": args.frames,
+        "quick": args.quick,
+        "alloc_traced": trace_alloc,
+        "gst_scale": args.gst_scale,
+    }
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"Saved {len(results)} results to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+import multiprocessing as mp
+import time
+
+import cv2
+
+from frame_buffers import FramePool, sample_frame
+from frame_processing import render_day_rgb
+from frame_pump import FramePump
+from shm_ring import ShmFrameRing
+
+# Display targets a day capture process renders for (main view + PiP overlay)
+MAX_DISPLAY_TARGETS = 2
+DAY_SOURCE_SHAPE = (720, 1280, 3)
+DAY_DISPLAY_SHAPE = (1080, 1920, 3)
+THERMAL_SHAPE = (1024, 1280)
+
+# control array: (w, h, zoom, pan_x, pan_y, stride, interpolation) per display
+# target, written by the parent
+CONTROL_FIELDS = 7
+
+# stats array layout, written by the child
+STAT_FRAMES, STAT_FPS, STAT_PROCESS_MS, STAT_STATE, STAT_ERRORS = range(5)
+
+
+def fit_display(size, max_shape=DAY_DISPLAY_SHAPE):
+    """
+    (w, h) a display ring can hold for a target of `size`: the same aspect,
+    shrunk to fit the ring. Larger targets (a 4K fullscreen view) are scaled
+    up once by the parent.
+    """
+    w, h = size
+    scale = min(1.0, max_shape[1] / w, max_shape[0] / h)
+    return max(1, int(w * scale)), max(1, int(h * scale))
+
+
+def _report_error(stats, messages, e):
+    """Child side: count a failure and send its text to the parent, once per distinct message."""
+    stats[STAT_ERRORS] += 1
+    text = f"{type(e).__name__}: {e}"
+    if text != getattr(_report_error, "last", None):
+        _report_error.last = text
+        try:
+            messages.put_nowait(text)
+        except Exception:
+            pass
+
+
+# ===================== CHILD PROCESSES =====================
+def _day_main(pipeline_str, ring_names, control, stop, new_frame, stats, messages):
+    """
+    Day capture process: pulls samples, writes the source frame into the
+    "source" ring and renders every enabled display target straight into its
+    display ring, so none of this runs under the GUI process's GIL.
+    control holds (w, h, zoom, pan_x, pan_y, stride, interpolation) per
+    display target; w == 0 disables it, stride n renders every n-th frame.
+    """
+    Gst.init(None)
+    source = ShmFrameRing.attach(ring_names[0])
+    displays = [ShmFrameRing.attach(n) for n in ring_names[1:]]
+    pool = FramePool()
+    pipeline = Gst.parse_launch(pipeline_str)
+    sink = pipeline.get_by_name("sink")
+    sink.set_property("emit-signals", False)
+    sink.set_property("max-buffers", 1)
+    sink.set_property("drop", True)
+    pump = None
+    frame_no = [0]
+
+    def handler(sample):
+        t0 = time.perf_counter()
+        ts = pump.capture_ts
+        ctl = control[:]
+        frame_no[0] += 1
+        try:
+            with sample_frame(sample) as arr:
+                source.write(arr, ts)
+                for i, ring in enumerate(displays):
+                    w, h, zoom, pan_x, pan_y, stride, interpolation = ctl[CONTROL_FIELDS * i:CONTROL_FIELDS * (i + 1)]
+                    if w <= 0 or h <= 0 or frame_no[0] % max(1, int(stride)):
+                        continue
+                    dst = ring.begin_write((int(h), int(w), 3))
+                    render_day_rgb(arr, zoom, dst, pool, interpolation=int(interpolation), pan=(pan_x, pan_y))
+                    ring.commit(ts)
+        except Exception as e:
+            _report_error(stats, messages, e)
+            return
+        new_frame.set()
+        stats[STAT_FRAMES] += 1
+        stats[STAT_PROCESS_MS] = (time.perf_counter() - t0) * 1000.0
+
+    pump = FramePump(pipeline, sink, handler, active=lambda: not stop.is_set(), name="day-process-pump")
+    try:
+        pipeline.set_state(Gst.State.PLAYING)
+        pump.start()
+        stats[STAT_STATE] = 1
+        while not stop.wait(1.0):
+            stats[STAT_FPS] = pump.stats()["fps"]
+    finally:
+        pump.stop()
+        pipeline.set_state(Gst.State.NULL)
+        source.close()
+        for ring in displays:
+            ring.close()
+
+
+def _thermal_main(index, ring_names, control, stop, new_frame, stats, messages):
+    """Thermal capture process: device reads + grey conversion into the ring."""
+    ring = ShmFrameRing.attach(ring_names[0])
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        stats[STAT_STATE] = -1
+        ring.close()
+        return
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    fps = fps if 1 <= fps <= 240 else 30.0
+    stats[STAT_FPS] = fps
+    stats[STAT_STATE] = 1
+    period = 1.0 / fps
+    try:
+        while not stop.is_set():
+            t0 = time.monotonic()
+            ok, frame = cap.read()
+            t1 = time.monotonic()
+            if ok:
+                if frame.ndim == 3:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                ring.write(frame, t1)
+                new_frame.set()
+                stats[STAT_FRAMES] += 1
+                stats[STAT_PROCESS_MS] = (time.monotonic() - t0) * 1000.0
+            spare = period - (time.monotonic() - t0)
+            if spare > 0.001:
+                time.sleep(spare)
+    finally:
+        cap.release()
+        ring.close()
+
+
+# ===================== PARENT HANDLE =====================
+class CaptureProcess:
+    """
+    Parent side of a capture process: owns the shared-memory rings, the
+    control/stat arrays and the spawned process. Rings are created here and
+    unlinked by stop(); the child only attaches.
+    """
+
+    def __init__(self, rings):
+        ctx = mp.get_context("spawn")  # no fork of a process that already runs GStreamer / Tk
+        self._ctx = ctx
+        self.rings = {key: ShmFrameRing(slots=slots, max_shape=shape) for key, (slots, shape) in rings.items()}
+        self.control = ctx.Array("d", CONTROL_FIELDS * MAX_DISPLAY_TARGETS)
+        self.stats = ctx.Array("d", 5)
+        self.stop_event = ctx.Event()
+        self.new_frame = ctx.Event()
+        self.messages = ctx.Queue()  # error texts from the child
+        self.process = None
+
+    def start(self, target, *args, name="capture"):
+        names = [ring.name for ring in self.rings.values()]
+        self.process = self._ctx.Process(
+            target=target, name=name, daemon=True,
+            args=(*args, names, self.control, self.stop_event, self.new_frame, self.stats, self.messages))
+        self.process.start()
+        return self
+
+    def wait_started(self, timeout=5.0):
+        """True once the child reports it is capturing, False if it failed or timed out."""
+        t_end = time.monotonic() + timeout
+        while time.monotonic() < t_end:
+            state = self.stats[STAT_STATE]
+            if state:
+                return state > 0
+            if self.process and not self.process.is_alive():
+                return False
+            time.sleep(0.02)
+        return False
+
+    def wait_frame(self, timeout):
+        """Block until the child has published a new frame (or timeout)."""
+        if self.new_frame.wait(timeout):
+            self.new_frame.clear()
+            return True
+        return False
+
+    def set_target(self, i, size, zoom=1.0, pan=(0.0, 0.0), stride=1, interpolation=cv2.INTER_LINEAR):
+        w, h = fit_display(size) if size else (0, 0)
+        with self.control.get_lock():
+            self.control[CONTROL_FIELDS * i:CONTROL_FIELDS * (i + 1)] = [w, h, zoom, pan[0], pan[1],
+                                                                         stride, interpolation]
+
+    def poll_messages(self):
+        """Error texts the child has reported since the last call."""
+        out = []
+        try:
+            while True:
+                out.append(self.messages.get_nowait())
+        except Exception:
+            pass
+        return out
+
+    @property
+    def alive(self):
+        return bool(self.process and self.process.is_alive())
+
+    def summary(self):
+        return (f"capture process: {int(self.stats[STAT_FRAMES])} frames, "
+                f"{self.stats[STAT_FPS]:.1f} fps, {self.stats[STAT_PROCESS_MS]:.1f} ms/frame")
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        if self.process:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        for ring in self.rings.values():
+            ring.close()
+
+
+def start_day_process(pipeline_str):
+    rings = {"source": (4, DAY_SOURCE_SHAPE)}
+    rings.update({f"display{i}": (3, DAY_DISPLAY_SHAPE) for i in range(MAX_DISPLAY_TARGETS)})
+    return CaptureProcess(rings).start(_day_main, pipeline_str, name="day-capture")
+
+
+def start_thermal_process(index):
+    return CaptureProcess({"source": (8, THERMAL_SHAPE)}).start(_thermal_main, index, name="thermal-capture")
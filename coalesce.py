@@ -0,0 +1,103 @@
+import threading
+import time
+
+
+# ===================== LATEST-VALUE-WINS COALESCER =====================
+class Coalescer:
+    """
+    Hands settings from a UI to a slow device channel on one worker thread.
+
+    submit(key, value) never blocks: it replaces whatever value is still
+    pending for that key, so a slider drag leaves at most one write per key
+    in flight and superseded values never reach the device. The worker
+    applies each key at most once per `min_interval` seconds by calling
+    apply(key, value), and reports done(key, value, result, latency_ms, error)
+    where latency is from the submit() of the applied value to the end of the
+    apply call. Everything runs on the worker thread; apply may block.
+    """
+
+    def __init__(self, apply, min_interval=0.05, done=None, name="coalescer"):
+        self.apply = apply
+        self.min_interval = min_interval
+        self.done = done
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = {}      # key -> (value, submitted_at)
+        self._last_apply = {}   # key -> monotonic time of the last apply
+        self._running = True
+        self.submitted = 0
+        self.applied = 0
+        self.superseded = 0
+        self.errors = 0
+        self.last_latency_ms = {}
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, key, value):
+        with self._cond:
+            if key in self._pending:
+                self.superseded += 1
+            self._pending[key] = (value, time.monotonic())
+            self.submitted += 1
+            self._cond.notify()
+
+    def pending(self, key):
+        with self._cond:
+            return key in self._pending
+
+    def _next_ready(self, now):
+        """(key, wait_s) of the pending key that may be applied soonest."""
+        best, best_wait = None, None
+        for key in self._pending:
+            wait = self._last_apply.get(key, 0.0) + self.min_interval - now
+            if best_wait is None or wait < best_wait:
+                best, best_wait = key, wait
+        return best, best_wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    key, wait = self._next_ready(time.monotonic())
+                    if key is None:
+                        self._cond.wait()
+                    elif wait > 0:
+                        self._cond.wait(wait)  # newer values may still replace it
+                    else:
+                        break
+                if not self._running:
+                    return
+                value, submitted_at = self._pending.pop(key)
+            result, error = None, None
+            try:
+                result = self.apply(key, value)
+            except Exception as e:
+                error = e
+                self.errors += 1
+            end = time.monotonic()
+            self._last_apply[key] = end
+            self.applied += 1
+            latency_ms = (end - submitted_at) * 1000.0
+            self.last_latency_ms[key] = latency_ms
+            if self.done:
+                try:
+                    self.done(key, value, result, latency_ms, error)
+                except Exception:
+                    pass
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "applied": self.applied,
+            "superseded": self.superseded,
+            "errors": self.errors,
+            "latency_ms": dict(self.last_latency_ms),
+        }
+
+    def close(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
@@ -1,7 +1,7 @@
 import gi, cv2, numpy as np, time
 from gi.repository import Gst
-from PIL import Image, ImageTk
-from utils import overlay_crosshair
+from PIL import Image
+from frame_buffers import FramePool, sample_frame
 
 gi.require_version("Gst", "1.0")
 gi.require_version("GstApp", "1.0")
@@ -15,6 +15,8 @@ class DayCamera:
         self.sink = None
         self.streaming = False
         self.colour_running = False
+        self.zero_copy = True
+        self.pool = FramePool()
 
     def _setup_pipeline(self, pipeline_str):
         if self.pipeline:
@@ -33,20 +35,19 @@ class DayCamera:
         sample = sink.emit("pull-sample")
         if not sample:
             return Gst.FlowReturn.OK
-        buf = sample.get_buffer()
-        caps = sample.get_caps()
-        w, h = caps.get_structure(0).get_value("width"), caps.get_structure(0).get_value("height")
-        data = buf.extract_dup(0, buf.get_size())
-        arr = np.frombuffer(data, np.uint8).reshape((h, w))
-        arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
-
-        if self.gui.crosshair_enabled:
-            arr = overlay_crosshair(arr)
+        with sample_frame(sample, mapped=self.zero_copy) as view:
+            h, w = view.shape[:2]
+            full = self.pool.acquire((h, w, 3))
+            if view.ndim == 2:
+                arr = cv2.cvtColor(view, cv2.COLOR_GRAY2RGB, dst=full)
+            else:
+                np.copyto(full, view)
+                arr = full
 
+        # crosshair is a HUD item on the canvas; show() reuses its PhotoImage
         img = Image.fromarray(cv2.cvtColor(arr, cv2.COLOR_RGB2BGR))
-        imgtk = ImageTk.PhotoImage(img)
-        self.gui.day_video_label.config(image=imgtk)
-        self.gui.day_video_label.imgtk = imgtk
+        self.pool.release(full)
+        self.gui.day_view.show(img)
         return Gst.FlowReturn.OK
 
     def start_bw(self):
@@ -34,6 +34,7 @@ class DayCameraGUI:
         self.day_streaming = False
         self.day_colour_running = False
         self.day_imgtk = None
+        self.day_bgr = None  # recycled conversion buffer for the pull loop
 
         # --- Layout ---
         self.video_frame = tk.Frame(self.root, bg="black")
@@ -88,7 +89,9 @@ class DayCameraGUI:
             # Loop pulling frames
             def pull_frames():
                 while self.day_streaming and self.day_pipeline:
-                    sample = self.day_sink.emit("try-pull-sample", 0)  # non-blocking
+                    # block inside GStreamer until a frame arrives (100 ms timeout so
+                    # the stop flag is still honoured) instead of polling + sleep
+                    sample = self.day_sink.emit("try-pull-sample", 100 * Gst.MSECOND)
                     if sample:
                         buf = sample.get_buffer()
                         caps = sample.get_caps()
@@ -98,16 +101,23 @@ class DayCameraGUI:
                         except:
                             w, h = 1280, 720
 
-                        data = buf.extract_dup(0, buf.get_size())
-                        arr = np.frombuffer(data, np.uint8)
-
-                        if arr.size == (h * w):  # grayscale
-                            arr = arr.reshape((h, w))
-                            arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
-                        else:
-                            arr = arr.reshape((h, w, 3))
+                        # Map the buffer instead of copying it with extract_dup. The
+                        # view is read-only and only valid until unmap, so the first
+                        # conversion writes into a recycled buffer we own.
+                        ok, info = buf.map(Gst.MapFlags.READ)
+                        if not ok:
+                            continue
+                        try:
+                            arr = np.frombuffer(info.data, np.uint8, count=info.size)
+                            if self.day_bgr is None or self.day_bgr.shape != (h, w, 3):
+                                self.day_bgr = np.empty((h, w, 3), np.uint8)
+                            if arr.size == (h * w):  # grayscale
+                                rgb = cv2.cvtColor(arr.reshape((h, w)), cv2.COLOR_GRAY2BGR, dst=self.day_bgr)
+                            else:
+                                rgb = cv2.cvtColor(arr[: h * w * 3].reshape((h, w, 3)), cv2.COLOR_RGB2BGR, dst=self.day_bgr)
+                        finally:
+                            buf.unmap(info)
 
-                        rgb = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
                         rgb = cv2.resize(rgb, (self.video_frame.winfo_width() or 640,
                                             self.video_frame.winfo_height() or 480))
                         img = Image.fromarray(cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB))
@@ -115,7 +125,6 @@ class DayCameraGUI:
                         # Update GUI safely
                         self.root.after(0, lambda img=img: self._update_image(img))
 
-                    time.sleep(0.01)
         except Exception as e:
             print(f"Error in pipeline loop: {e}")   
             pass
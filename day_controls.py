@@ -0,0 +1,106 @@
+import math
+
+from coalesce import Coalescer
+
+# Minimum time between two writes of the same control (the GigE control
+# channel answers in a few ms; a drag at 60 Hz would otherwise flood it)
+CONTROL_INTERVAL_S = 0.05
+
+
+def kelvin_to_balance(kelvin):
+    """
+    (red, blue) balance ratios relative to green that neutralise a light
+    source of the given colour temperature (blackbody fit, 1000-40000 K).
+    """
+    t = min(40000.0, max(1000.0, float(kelvin))) / 100.0
+    if t <= 66:
+        red = 255.0
+        green = 99.4708025861 * math.log(t) - 161.1195681661
+        blue = 0.0 if t <= 19 else 138.5177312231 * math.log(t - 10) - 305.0447927307
+    else:
+        red = 329.698727446 * (t - 60) ** -0.1332047592
+        green = 288.1221695283 * (t - 60) ** -0.0755148492
+        blue = 255.0
+    red, green, blue = (min(255.0, max(1.0, c)) for c in (red, green, blue))
+    return green / red, green / blue
+
+
+# ===================== DAY CAMERA CONTROLS =====================
+class DayControls:
+    """
+    Exposure (ms), gain (dB) and white balance (K) on the live aravissrc.
+
+    set(name, value) only records the latest value; a Coalescer applies it on
+    its own thread at most every CONTROL_INTERVAL_S per control, then reads
+    back what the camera actually accepted (it rounds to its own steps and
+    limits). report(name, requested, applied, latency_ms, error) is called on
+    that thread for every write. The last requested values are re-applied
+    whenever the day pipeline is (re)built. With capture processes the
+    camera lives in the child, so set() is refused with a single report.
+    """
+
+    NAMES = ("exposure", "gain", "wb")
+
+    def __init__(self, capture, report=None):
+        self.capture = capture
+        self.report = report
+        self.requested = {}
+        self.applied = {}
+        self._refused = False
+        self.coalescer = Coalescer(self._apply, CONTROL_INTERVAL_S, self._done, name="day-controls")
+
+    def set(self, name, value):
+        if name not in self.NAMES:
+            raise ValueError(f"unknown day control {name!r}")
+        self.requested[name] = value
+        if self.capture.proc is not None:
+            if not self._refused and self.report:
+                self._refused = True
+                self.report(name, value, None, 0.0,
+                            RuntimeError("day camera controls are not available with capture processes"))
+            return
+        if self.capture.pipeline is not None:
+            self.coalescer.submit(name, value)  # otherwise applied by reapply() on start
+
+    def reapply(self):
+        for name, value in list(self.requested.items()):
+            self.coalescer.submit(name, value)
+
+    def _camera(self):
+        pipeline = self.capture.pipeline
+        src = pipeline.get_by_name("src") if pipeline is not None else None
+        if src is None:
+            raise RuntimeError("day camera controls need the in-process pipeline")
+        return src, src.get_property("camera")
+
+    def _apply(self, name, value):
+        """Coalescer thread: write one control and return the read-back value."""
+        src, camera = self._camera()
+        if name == "exposure":
+            src.set_property("exposure-auto", 0)       # off
+            src.set_property("exposure", value * 1000.0)  # aravissrc takes µs
+            return camera.get_exposure_time() / 1000.0
+        if name == "gain":
+            src.set_property("gain-auto", 0)
+            src.set_property("gain", float(value))
+            return camera.get_gain()
+        # white balance: GenICam balance ratios, green is the reference channel
+        camera.set_string("BalanceWhiteAuto", "Off")
+        applied = []
+        for selector, ratio in zip(("Red", "Blue"), kelvin_to_balance(value)):
+            camera.set_string("BalanceRatioSelector", selector)
+            camera.set_float("BalanceRatio", ratio)
+            applied.append(camera.get_float("BalanceRatio"))
+        return tuple(applied)
+
+    def _done(self, name, value, result, latency_ms, error):
+        if error is None:
+            self.applied[name] = result
+        if self.report:
+            self.report(name, value, result, latency_ms, error)
+
+    def stats(self):
+        return dict(self.coalescer.stats(), applied=dict(self.applied))
+
+    def close(self):
+        self.coalescer.close()
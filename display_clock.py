@@ -0,0 +1,122 @@
+import time
+
+
+# ===================== DISPLAY CLOCK =====================
+class DisplayClock:
+    """
+    One Tk timer that repaints every registered display target in a single pass.
+
+    Targets are (name, paint, visible) triples: on each tick paint() is called
+    for every target whose visible() returns True. paint() should only take the
+    newest state it has (mailbox frame, latest range value, ...) and push it to
+    its widget, so the work done per tick is bounded by the number of targets,
+    not by how fast the sources produce data.
+
+    A paint() that raises does not stop the clock; failures are counted per
+    target in `errors` and the first one of each target is passed to
+    on_error(name, exception).
+    """
+
+    def __init__(self, root, fps=30, report=None, report_every=1.0, on_error=None):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / fps))
+        self.report = report
+        self.report_every = report_every
+        self.on_error = on_error
+        self.errors = {}
+        self.targets = {}
+        self.running = False
+        self._job = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.ticks = 0
+        self.last_paint_ms = 0.0
+        self.max_paint_ms = 0.0
+        self.total_paint_ms = 0.0
+        self.target_ms = {}
+        self._last_report = time.monotonic()
+
+    # ---------------- Targets ----------------
+    def add_target(self, name, paint, visible=None):
+        self.targets[name] = (paint, visible or (lambda: True))
+
+    def remove_target(self, name):
+        self.targets.pop(name, None)
+        self.target_ms.pop(name, None)
+
+    # ---------------- Timer ----------------
+    @property
+    def fps(self):
+        return 1000.0 / self.interval_ms
+
+    def set_rate(self, fps):
+        self.interval_ms = max(1, int(1000 / max(0.1, fps)))
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._reset_stats()
+        self._job = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        self.running = False
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        if not self.running:
+            return
+        t0 = time.perf_counter()
+        for name, (paint, visible) in list(self.targets.items()):
+            try:
+                if not visible():
+                    continue
+                t = time.perf_counter()
+                paint()
+                self.target_ms[name] = (time.perf_counter() - t) * 1000.0
+            except Exception as e:
+                self._paint_failed(name, e)
+        paint_ms = (time.perf_counter() - t0) * 1000.0
+        self.ticks += 1
+        self.last_paint_ms = paint_ms
+        self.total_paint_ms += paint_ms
+        self.max_paint_ms = max(self.max_paint_ms, paint_ms)
+
+        now = time.monotonic()
+        if self.report and now - self._last_report >= self.report_every:
+            self._last_report = now
+            try:
+                self.report(self.stats())
+            except Exception:
+                pass
+
+        # Keep the cadence: subtract the time this pass took from the next wait
+        delay = max(1, self.interval_ms - int(paint_ms))
+        self._job = self.root.after(delay, self._tick)
+
+    def _paint_failed(self, name, error):
+        count = self.errors.get(name, 0) + 1
+        self.errors[name] = count
+        if count == 1 and self.on_error:
+            try:
+                self.on_error(name, error)
+            except Exception:
+                pass
+
+    def stats(self):
+        return {
+            "fps": self.fps,
+            "ticks": self.ticks,
+            "last_paint_ms": self.last_paint_ms,
+            "avg_paint_ms": self.total_paint_ms / self.ticks if self.ticks else 0.0,
+            "max_paint_ms": self.max_paint_ms,
+            "targets_ms": dict(self.target_ms),
+            "errors": dict(self.errors),
+        }
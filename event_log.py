@@ -0,0 +1,64 @@
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+
+DEBUG, INFO, WARNING, ERROR = range(4)
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# seq: 1, 2, ... in logging order, time: time.time() wall clock
+Event = namedtuple("Event", ["seq", "time", "level", "source", "message"])
+
+
+# ===================== EVENT LOG =====================
+class EventLog:
+    """
+    Fixed-size ring of events that any thread can append to.
+
+    log() touches no Tk state: it draws a sequence number and appends to a
+    deque with maxlen under one tiny lock (held for those two steps only), so
+    it is cheap enough for capture and serial threads and the ring is always
+    in seq order. The oldest events fall off once `capacity` is reached.
+    Readers (the Tk drain) copy the ring and pick the events after the last
+    seq they saw.
+    """
+
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self._ring = deque(maxlen=capacity)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def log(self, message, level=INFO, source=""):
+        message = str(message)
+        now = time.time()
+        # seq and append as one step: a thread preempted between them could
+        # otherwise append seq N after a reader has already moved past N
+        with self._lock:
+            self._ring.append(Event(next(self._seq), now, level, source, message))
+
+    def debug(self, message, source=""):
+        self.log(message, DEBUG, source)
+
+    def info(self, message, source=""):
+        self.log(message, INFO, source)
+
+    def warning(self, message, source=""):
+        self.log(message, WARNING, source)
+
+    def error(self, message, source=""):
+        self.log(message, ERROR, source)
+
+    def snapshot(self, min_level=DEBUG):
+        """Every event still in the ring at min_level or above, oldest first."""
+        return [e for e in self._ring.copy() if e.level >= min_level]
+
+    def since(self, seq):
+        """Events newer than seq (oldest first); events that already fell off are skipped."""
+        return [e for e in self._ring.copy() if e.seq > seq]
+
+
+def format_event(event):
+    stamp = time.strftime("%H:%M:%S", time.localtime(event.time))
+    source = f" {event.source}:" if event.source else ""
+    return f"{stamp}.{int(event.time * 1000) % 1000:03d} {LEVEL_NAMES[event.level]:7s}{source} {event.message}"
@@ -0,0 +1,143 @@
+import gi
+gi.require_version("Gst", "1.0")
+gi.require_version("GstVideo", "1.0")
+from gi.repository import Gst, GstVideo
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+
+
+# ===================== SAMPLE -> NUMPY =====================
+def sample_size(sample, default=(640, 480)):
+    """Return (width, height) from the sample caps, or default if caps are missing."""
+    try:
+        s = sample.get_caps().get_structure(0)
+        return s.get_value("width"), s.get_value("height")
+    except Exception:
+        return default
+
+
+def sample_format(sample):
+    """The caps' format string (e.g. "GRAY8", "RGB"), or None if unknown."""
+    try:
+        return sample.get_caps().get_structure(0).get_value("format")
+    except Exception:
+        return None
+
+
+def _default_stride(w, channels):
+    # GStreamer's default raw video layout pads every row to a multiple of 4 bytes
+    return (w * channels + 3) & ~3
+
+
+def _shape_frame(arr, w, h, channels=None, stride=None):
+    """
+    View a raw GRAY8 / 3-channel buffer as (h, w) or (h, w, 3). Rows may be
+    padded (stride > w * channels); the padding is skipped with a strided view,
+    never copied. channels None guesses from the buffer size.
+    """
+    if channels is None:
+        channels = 1 if arr.size < h * w * 3 else 3
+    row = w * channels
+    if stride is None:
+        stride = row if arr.size == h * row else _default_stride(w, channels)
+    if stride == row:
+        frame = arr[: h * row]
+    else:
+        frame = arr[: h * stride].reshape((h, stride))[:, :row]
+    return frame.reshape((h, w)) if channels == 1 else frame.reshape((h, w, 3))
+
+
+def _sample_layout(sample, buf):
+    """(channels, stride) of the sample from its caps / video meta; None where unknown."""
+    fmt = sample_format(sample)
+    channels = {"GRAY8": 1, "RGB": 3, "BGR": 3}.get(fmt)
+    stride = None
+    try:
+        meta = GstVideo.buffer_get_video_meta(buf)
+        if meta is not None:
+            stride = meta.stride[0]
+    except Exception:
+        pass
+    return channels, stride
+
+
+@contextmanager
+def sample_frame(sample, mapped=True, default_size=(640, 480)):
+    """
+    Yield the sample's pixels as a uint8 (h, w) or (h, w, 3) array. Rows that
+    GStreamer padded to a 4-byte stride (widths not a multiple of 4) come back
+    as a strided view without the padding.
+
+    With mapped=True the array is a read-only view of the Gst.Buffer memory and
+    is only valid inside the with-block; anything that must outlive the sample
+    has to be copied (or written into a FramePool buffer) before leaving it.
+    With mapped=False the buffer is copied with extract_dup (legacy behaviour).
+    """
+    buf = sample.get_buffer()
+    w, h = sample_size(sample, default_size)
+    channels, stride = _sample_layout(sample, buf)
+    if not mapped:
+        arr = np.frombuffer(buf.extract_dup(0, buf.get_size()), np.uint8)
+        yield _shape_frame(arr, w, h, channels, stride)
+        return
+
+    ok, info = buf.map(Gst.MapFlags.READ)
+    if not ok:
+        raise RuntimeError("Failed to map day camera buffer")
+    try:
+        arr = np.frombuffer(info.data, np.uint8, count=info.size)
+        arr.flags.writeable = False
+        yield _shape_frame(arr, w, h, channels, stride)
+    finally:
+        buf.unmap(info)
+
+
+# ===================== FRAME POOL =====================
+class FramePool:
+    """
+    Recycles writable frame buffers so per-frame stages (colour conversion,
+    resize) can write into preallocated memory instead of allocating.
+    At most max_shapes distinct (shape, dtype) keys are kept; the least
+    recently used one is dropped beyond that, so callers whose shapes keep
+    changing (resizing windows, zoom) cannot grow the pool without bound.
+    """
+
+    def __init__(self, max_per_shape=4, max_shapes=16):
+        self.max_per_shape = max_per_shape
+        self.max_shapes = max_shapes
+        self._free = OrderedDict()
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            stack = self._free.get(key)
+            if stack:
+                self._free.move_to_end(key)
+                self.reused += 1
+                return stack.pop()
+            self.allocated += 1
+        return np.empty(shape, dtype)
+
+    def release(self, *arrays):
+        with self._lock:
+            for arr in arrays:
+                if arr is None:
+                    continue
+                key = (arr.shape, arr.dtype.str)
+                stack = self._free.setdefault(key, [])
+                self._free.move_to_end(key)
+                if len(stack) < self.max_per_shape:
+                    stack.append(arr)
+            while len(self._free) > self.max_shapes:
+                self._free.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
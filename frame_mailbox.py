@@ -0,0 +1,51 @@
+import threading
+
+
+# ===================== LATEST-FRAME MAILBOX =====================
+class FrameMailbox:
+    """
+    Single-slot hand-off between a capture thread and the Tk thread.
+
+    post() overwrites whatever is waiting ("latest frame wins"), so a slow
+    consumer never builds a backlog; take() empties the slot. Frames that were
+    overwritten before being taken are counted in `coalesced`.
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._item = None
+        self._full = False
+        self.posted = 0
+        self.taken = 0
+        self.coalesced = 0
+
+    def post(self, item):
+        with self._lock:
+            if self._full:
+                self.coalesced += 1
+            self._item = item
+            self._full = True
+            self.posted += 1
+
+    def take(self):
+        """Return the newest item, or None if nothing arrived since the last take()."""
+        with self._lock:
+            if not self._full:
+                return None
+            item, self._item = self._item, None
+            self._full = False
+            self.taken += 1
+            return item
+
+    def clear(self):
+        with self._lock:
+            self._item = None
+            self._full = False
+
+    def reset_stats(self):
+        with self._lock:
+            self.posted = self.taken = self.coalesced = 0
+
+    def stats(self):
+        return {"posted": self.posted, "taken": self.taken, "coalesced": self.coalesced}
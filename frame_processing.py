@@ -0,0 +1,110 @@
+import cv2
+from PIL import Image
+
+from thermal_palette import palette_engine
+
+
+# ===================== DAY CHAIN =====================
+CENTRE = (0.0, 0.0)
+
+
+def zoom_box(w, h, zoom, pan=CENTRE):
+    """
+    (x, y, w, h) of the digital-zoom window in a w x h frame. pan (px, py) in
+    -1..1 moves the window from the centre towards the left/top (-1) or
+    right/bottom (+1) edge; it has no effect at zoom <= 1.
+    """
+    if zoom <= 1.0:
+        return 0, 0, w, h
+    zoom_w, zoom_h = int(w / zoom), int(h / zoom)
+    px = min(1.0, max(-1.0, pan[0]))
+    py = min(1.0, max(-1.0, pan[1]))
+    x = int(round((w - zoom_w) / 2 * (1 + px)))
+    y = int(round((h - zoom_h) / 2 * (1 + py)))
+    return x, y, zoom_w, zoom_h
+
+
+def zoom_crop(arr, zoom, pan=CENTRE):
+    """Crop view for digital zoom (no copy); zoom <= 1 returns arr."""
+    if zoom <= 1.0:
+        return arr
+    h, w = arr.shape[:2]
+    x1, y1, zoom_w, zoom_h = zoom_box(w, h, zoom, pan)
+    return arr[y1:y1 + zoom_h, x1:x1 + zoom_w]
+
+
+def render_day_rgb(arr, zoom, dst, pool, trace=None, overlay=None, interpolation=cv2.INTER_LINEAR,
+                   pan=CENTRE):
+    """
+    Zoom, resize and convert one day source frame into dst, a (h, w, 3) uint8
+    RGB buffer of the display size (a pool buffer or a shared-memory slot).
+
+    arr is a (h, w) GRAY8 or (h, w, 3) RGB frame and may be a read-only mapped
+    buffer. The zoom window (pan moves it off-centre) is cropped first as a
+    view in the native format; a GRAY8 crop is resized in one channel into a
+    display-sized scratch buffer and converted from there, so the full frame
+    never goes through GRAY2RGB and the only pooled shapes are display sizes
+    (crop sizes change with every zoom / pan step and would pile up in the
+    pool). Intermediate buffers are recycled before returning. overlay(rgb) may
+    draw into dst in place. Stages are recorded on trace when given;
+    interpolation is the cv2 resize flag (the load governor drops to
+    INTER_NEAREST under pressure). Returns dst.
+    """
+    arr = zoom_crop(arr, zoom, pan)
+    widget_h, widget_w = dst.shape[:2]
+    if arr.ndim == 3:
+        cv2.resize(arr, (widget_w, widget_h), dst=dst, interpolation=interpolation)
+        if trace is not None:
+            trace.mark("zoom+resize")
+    else:
+        # resize in GRAY8 (a third of the RGB work), convert at display size
+        scratch = pool.acquire((widget_h, widget_w))
+        cv2.resize(arr, (widget_w, widget_h), dst=scratch, interpolation=interpolation)
+        cv2.cvtColor(scratch, cv2.COLOR_GRAY2RGB, dst=dst)
+        pool.release(scratch)
+        if trace is not None:
+            trace.mark("crop+resize+gray2rgb")
+    if overlay is not None:
+        overlay(dst)
+    return dst
+
+
+def render_day_frame(arr, zoom, size, pool, trace=None, overlay=None, interpolation=cv2.INTER_LINEAR,
+                     pan=CENTRE):
+    """Like render_day_rgb, for a display size (w, h); returns a PIL RGB image."""
+    widget_w, widget_h = size
+    resized = pool.acquire((widget_h, widget_w, 3))
+    rgb = render_day_rgb(arr, zoom, resized, pool, trace, overlay, interpolation, pan)
+    # fromarray copies RGB data, so the pooled buffer can be recycled straight away
+    img = Image.fromarray(rgb)
+    pool.release(resized)
+    if trace is not None:
+        trace.mark("fromarray")
+    return img
+
+
+# ===================== THERMAL CHAIN =====================
+def render_thermal_frame(image, palette, size=None, trace=None, overlay=None):
+    """
+    Colourise one thermal intensity frame and return a PIL RGB image.
+
+    size (w, h) is only used as a fallback resize: normally the capture worker
+    already delivers frames at the subscriber's size.
+    """
+    try:
+        # cached RGB-ordered 256-entry LUT, intensity -> display RGB in one pass
+        rgb = palette_engine.apply(image, palette, rgb=True)
+    except Exception:
+        rgb = image
+    if trace is not None:
+        trace.mark("palette")
+    if rgb is image:  # unknown palette: the frame as the camera sent it
+        rgb = cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB if rgb.ndim == 3 else cv2.COLOR_GRAY2RGB)
+    if size is not None and rgb.shape[:2] != (size[1], size[0]):  # first frame after a widget resize
+        rgb = cv2.resize(rgb, size, interpolation=cv2.INTER_AREA)
+    if overlay is not None:
+        overlay(rgb)
+    img = Image.fromarray(rgb)
+    if trace is not None:
+        trace.mark("fromarray")
+    return img
@@ -0,0 +1,113 @@
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+import threading
+import time
+
+
+# ===================== APPSINK FRAME PUMP =====================
+class FramePump:
+    """
+    Pulls samples from an appsink on a worker thread using a blocking
+    try-pull-sample with a timeout, so the thread sleeps inside GStreamer until
+    a frame is ready instead of polling. Each sample is passed to handler(sample).
+
+    The pump keeps simple counters so it can be compared with the old poll loop:
+    CPU burnt while waiting for frames (idle CPU) and the sample-to-process
+    latency (pipeline running time when the handler starts minus the buffer PTS).
+    While the handler runs, capture_ts holds the buffer's capture time translated
+    to the time.monotonic() clock, for per-frame latency traces.
+    """
+
+    def __init__(self, pipeline, sink, handler, active=None, timeout_ms=100, name="frame-pump"):
+        self.pipeline = pipeline
+        self.sink = sink
+        self.handler = handler
+        self.active = active or (lambda: True)
+        self.timeout = int(timeout_ms) * Gst.MSECOND
+        self.name = name
+        self.running = False
+        self.thread = None
+        self.capture_ts = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_cpu = 0.0
+        self.process_cpu = 0.0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.latency_count = 0
+        self.started_at = time.monotonic()
+
+    def start(self):
+        if self.running:
+            return
+        self._reset_stats()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        while self.running and self.active():
+            t0 = time.thread_time()
+            sample = self.sink.emit("try-pull-sample", self.timeout)
+            t1 = time.thread_time()
+            self.wait_cpu += t1 - t0
+            if sample is None:
+                self.timeouts += 1
+                continue
+            latency = self._sample_latency(sample)
+            self.capture_ts = time.monotonic() - (latency or 0.0)
+            if latency is not None:
+                self.latency_sum += latency
+                self.latency_max = max(self.latency_max, latency)
+                self.latency_count += 1
+            try:
+                self.handler(sample)
+            except Exception:
+                self.errors += 1
+            self.frames += 1
+            self.process_cpu += time.thread_time() - t1
+        self.running = False
+
+    def _sample_latency(self, sample):
+        """Seconds between the buffer's running time and now, or None if unknown."""
+        try:
+            clock = self.pipeline.get_clock()
+            pts = sample.get_buffer().pts
+            if clock is None or pts == Gst.CLOCK_TIME_NONE:
+                return None
+            segment = sample.get_segment()
+            buf_rt = segment.to_running_time(Gst.Format.TIME, pts) if segment else pts
+            now_rt = clock.get_time() - self.pipeline.get_base_time()
+            return max(0, now_rt - buf_rt) / Gst.SECOND
+        except Exception:
+            return None
+
+    def stats(self):
+        elapsed = max(1e-6, time.monotonic() - self.started_at)
+        return {
+            "frames": self.frames,
+            "fps": self.frames / elapsed,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "idle_cpu_pct": 100.0 * self.wait_cpu / elapsed,
+            "process_cpu_pct": 100.0 * self.process_cpu / elapsed,
+            "latency_avg_ms": 1000.0 * self.latency_sum / self.latency_count if self.latency_count else None,
+            "latency_max_ms": 1000.0 * self.latency_max if self.latency_count else None,
+        }
+
+    def summary(self):
+        s = self.stats()
+        lat = "n/a" if s["latency_avg_ms"] is None else f"{s['latency_avg_ms']:.1f}/{s['latency_max_ms']:.1f} ms"
+        return (f"{s['fps']:.1f} fps, idle CPU {s['idle_cpu_pct']:.1f}%, "
+                f"process CPU {s['process_cpu_pct']:.1f}%, latency avg/max {lat}")
@@ -0,0 +1,122 @@
+import os
+import time
+from collections import deque
+
+
+# ===================== LOAD GOVERNOR =====================
+class LoadGovernor:
+    """
+    Sheds display work in a fixed order when the payload PC cannot keep up and
+    gives it back, in reverse order, once there is headroom again.
+
+    Load sources are registered with add_load(name, busy): busy() returns the
+    cumulative seconds that source has spent working (display clock paint time,
+    pump thread CPU, ...) or None when it is idle. Every sample() turns the
+    deltas into a busy fraction of the wall time since the previous sample;
+    the worst one is the pressure.
+
+    Steps are registered with add_step(label, apply) in shedding order;
+    apply(True) engages a step and apply(False) releases it. A step is engaged
+    after `escalate_after` consecutive samples above `high` and released after
+    `relax_after` consecutive samples below `low`, so the ladder does not
+    oscillate. Every decision goes to report(msg) and to `history`.
+    """
+
+    def __init__(self, high=0.75, low=0.45, escalate_after=2, relax_after=5, report=None):
+        self.high = high
+        self.low = low
+        self.escalate_after = escalate_after
+        self.relax_after = relax_after
+        self.report = report
+        self.enabled = True
+        self.level = 0
+        self.pressure = 0.0
+        self.loads = {}
+        self.steps = []
+        self.history = deque(maxlen=200)
+        self._last = {}
+        self._last_t = None
+        self._over = 0
+        self._under = 0
+
+    # ---------------- Registration ----------------
+    def add_load(self, name, busy):
+        self.loads[name] = busy
+
+    def add_step(self, label, apply):
+        self.steps.append((label, apply))
+
+    # ---------------- Sampling ----------------
+    def _measure(self, now):
+        dt = now - self._last_t if self._last_t is not None else 0.0
+        self._last_t = now
+        worst, worst_name = 0.0, None
+        for name, busy in self.loads.items():
+            try:
+                value = busy()
+            except Exception:
+                value = None
+            prev = self._last.get(name)
+            self._last[name] = value
+            if value is None or prev is None or dt <= 0 or value < prev:
+                continue  # idle, first sample or the source restarted
+            frac = (value - prev) / dt
+            if frac > worst:
+                worst, worst_name = frac, name
+        return worst, worst_name
+
+    def sample(self):
+        """Take one measurement and move at most one step; call about once a second."""
+        now = time.monotonic()
+        self.pressure, source = self._measure(now)
+        if not self.enabled:
+            return
+        if self.pressure > self.high:
+            self._over, self._under = self._over + 1, 0
+        elif self.pressure < self.low:
+            self._over, self._under = 0, self._under + 1
+        else:
+            self._over = self._under = 0
+        if self._over >= self.escalate_after and self.level < len(self.steps):
+            self._over = 0
+            self._set_level(self.level + 1, f"{source} at {self.pressure:.0%}")
+        elif self._under >= self.relax_after and self.level > 0:
+            self._under = 0
+            self._set_level(self.level - 1, f"load {self.pressure:.0%}")
+
+    def _set_level(self, level, reason, force=False):
+        """Move one step; a failing apply keeps the level unless force (reset must always make progress)."""
+        engage = level > self.level
+        label, apply = self.steps[level - 1 if engage else level]
+        try:
+            apply(engage)
+        except Exception as e:
+            self.log(f"Governor: '{label}' failed: {e}")
+            if not force:
+                return
+        self.level = level
+        self.log(f"Governor: {'shed' if engage else 'restored'} '{label}' ({reason}), "
+                 f"level {level}/{len(self.steps)}")
+
+    def reset(self):
+        """Release every engaged step (e.g. when the governor is switched off)."""
+        while self.level > 0:
+            self._set_level(self.level - 1, "reset", force=True)
+        self._over = self._under = 0
+
+    def log(self, msg):
+        self.history.append((time.time(), msg))
+        if self.report:
+            try:
+                self.report(msg)
+            except Exception:
+                pass
+
+    def status(self):
+        engaged = [label for label, _ in self.steps[:self.level]]
+        return {"pressure": self.pressure, "level": self.level, "engaged": engaged}
+
+
+def process_cpu_busy():
+    """Process CPU seconds spread over all cores (1.0 = every core busy)."""
+    return time.process_time() / (os.cpu_count() or 1)
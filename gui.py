@@ -19,6 +19,12 @@ import subprocess
 import os
 import signal
 
+from event_log import ERROR, INFO, EventLog
+from frame_buffers import FramePool, sample_frame
+from log_panel import EventLogView
+from thermal_capture import ThermalCapture
+from thermal_palette import palette_engine
+
 Gst.init(None)
 
 
@@ -197,6 +203,9 @@ class TriplePayloadGUI:
 
         self.day_pipeline = None
         self.day_sink = None
+        # Map appsink buffers in place instead of copying them with extract_dup
+        self.day_zero_copy = True
+        self.day_frame_pool = FramePool()
         self.day_black_img = None
         self.fullscreen_mode = False
         
@@ -206,8 +215,14 @@ class TriplePayloadGUI:
         self.day_zoom_level = tk.DoubleVar(value=1.0)
         self.thermal_zoom_var = tk.IntVar(value=1)
 
+        # User-defined thermal palettes (.npy / .txt / .csv / .pal) next to the built-in ones
+        palette_engine.load_dir("./palettes")
+
         # Build UI
+        self.events = EventLog()
         self._build_layout()
+        self.event_view = EventLogView(self.root, self.events, self.status_var)
+        self.event_view.start()
         if PIL_AVAILABLE:
             black_frame = np.zeros((480, 640, 3), dtype=np.uint8)
             try:
@@ -263,40 +278,25 @@ class TriplePayloadGUI:
             raise RuntimeError("Failed to get appsink 'sink' from pipeline.")
 
     def _on_day_sample(self, sink):
-        print(f"[{time.time():.2f}] _on_day_sample CALLED!")
         sample = sink.emit("pull-sample")
         if sample is None:
             return Gst.FlowReturn.OK
-        buf = sample.get_buffer()
-        caps = sample.get_caps()
+        # Map the buffer in place (read-only view, valid only inside the with-block)
+        # and do the first conversion into a pooled buffer we own.
+        pool = self.day_frame_pool
         try:
-            w = caps.get_structure(0).get_value("width")
-            h = caps.get_structure(0).get_value("height")
-        except Exception:
-            # fallback if caps missing
-            w, h = 640, 480
-
-        # Use extract_dup which returns bytes for entire buffer
-        try:
-            data = buf.extract_dup(0, buf.get_size())
+            with sample_frame(sample, mapped=self.day_zero_copy) as view:
+                h, w = view.shape[:2]
+                arr = pool.acquire((h, w, 3))
+                if view.ndim == 2:
+                    # convert to RGB for consistent display and overlay steps
+                    cv2.cvtColor(view, cv2.COLOR_GRAY2RGB, dst=arr)
+                else:
+                    np.copyto(arr, view)
         except Exception:
             return Gst.FlowReturn.OK
+        full = arr
 
-        # Try to interpret data: it may be RGB (3 channels) or GRAY (1 channel)
-        try:
-            arr = np.frombuffer(data, np.uint8)
-            # If buffer size matches h*w -> grayscale
-            if arr.size == (h * w):
-                arr = arr.reshape((h, w))
-                # convert to RGB for consistent display and overlay steps
-                arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
-            else:
-                # assume 3-channel
-                arr = arr.reshape((h, w, 3))
-        except Exception:
-            # fallback to blank
-            arr = np.zeros((h, w, 3), dtype=np.uint8)
-        
         # Apply digital zoom to the Day camera feed
         zoom_level = self.day_zoom_level.get()
         if zoom_level > 1.0:
@@ -330,11 +330,12 @@ class TriplePayloadGUI:
             try:
                 arr_bgr = overlay_crosshair(arr_bgr)
             except Exception as e:
-                self._set_status(f"Crosshair overlay error: {e}")
+                self._set_status(f"Crosshair overlay error: {e}", ERROR)
 
         # Convert back to RGB for PIL
         arr = cv2.cvtColor(arr_bgr, cv2.COLOR_BGR2RGB)
         img = Image.fromarray(arr)
+        pool.release(full)
 
         # Only recreate PhotoImage if shape changed
         try:
@@ -509,7 +510,7 @@ class TriplePayloadGUI:
         pal_box = ttk.Labelframe(th_inner, text="Pseudo-color")
         pal_box.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(6,4), padx=6)
         self.thermal_palette_combo = ttk.Combobox(pal_box, width=12,
-                                                  values=["white","black","rainbow","green","metel"], state="readonly")
+                                                  values=palette_engine.names, state="readonly")
         self.thermal_palette_combo.set("white")
         self.thermal_palette_combo.grid(row=0, column=0, padx=4, pady=6)
         ttk.Button(pal_box, text="Apply", command=self.thermal_apply_palette).grid(row=0, column=1, padx=4)
@@ -623,6 +624,7 @@ class TriplePayloadGUI:
         self.footer.pack(fill="x")
         self.status_var = tk.StringVar(value="Ready.")
         ttk.Label(self.footer, textvariable=self.status_var).pack(side="left")
+        ttk.Button(self.footer, text="Log", width=5, command=lambda: self.event_view.open()).pack(side="right")
 
     # ===================== New Fullscreen Logic =====================
     def _show_fullscreen(self, mode):
@@ -764,8 +766,8 @@ class TriplePayloadGUI:
         self.root.update_idletasks()
         
     def thermal_start_overlay_stream(self):
-        self.thermal_cap = cv2.VideoCapture(0)
-        if self.thermal_cap.isOpened():
+        self.thermal_cap = ThermalCapture(0)
+        if self.thermal_cap.start():
             self.thermal_overlay_stream = True
             self.thermal_overlay_label = tk.Label(self.day_video_frame, bg="black", borderwidth=2, relief="solid")
             self.thermal_overlay_label.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=20)
@@ -790,9 +792,9 @@ class TriplePayloadGUI:
         self.lrf_fullscreen_overlay_label.place(relx=1.0, rely=0.25, anchor="ne", x=-20, y=20) # Adjusted position to be below the day stream
 
     # ===================== Helpers =====================
-    def _set_status(self, msg):
-        self.status_var.set(msg)
-        self.root.update_idletasks()
+    def _set_status(self, msg, level=INFO):
+        # called from GStreamer / serial threads too: log only, the Tk thread drains it
+        self.events.log(msg, level, "gui")
 
     def _list_ports(self):
         return [p.device for p in serial.tools.list_ports.comports()]
@@ -903,15 +905,18 @@ class TriplePayloadGUI:
                 msg = ' '.join(f'{x:02X}' for x in resp[::-1])
             else:
                 msg = "(no/invalid response)"
-            self.root.after(0, lambda: self._set_status((label + " " if label else "") + msg))
+            self._set_status((label + " " if label else "") + msg)
         threading.Thread(target=worker, daemon=True).start()
 
     def thermal_apply_palette(self):
         name = self.thermal_palette_combo.get()
-        key = {"white":"white","black":"black","rainbow":"rainbow","green":"green","metel":"metel"}[name]
-        data = THERMAL_FUNCTION_GROUPS["color"]["functions"][key]["data"]
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["color"]["response_len"], f"Palette {name}:")
         self.thermal_palette = name
+        # user palettes loaded from ./palettes only exist locally, the camera has no command for them
+        if name not in THERMAL_FUNCTION_GROUPS["color"]["functions"]:
+            self._set_status(f"Palette {name}: local")
+            return
+        data = THERMAL_FUNCTION_GROUPS["color"]["functions"][name]["data"]
+        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["color"]["response_len"], f"Palette {name}:")
 
     def thermal_apply_brightness(self):
         v = self.thermal_bright.get()
@@ -961,8 +966,8 @@ class TriplePayloadGUI:
             self._set_status("Thermal stream already running.")
             return
         # Choose appropriate device or pipeline
-        self.thermal_cap = cv2.VideoCapture(0)
-        if not self.thermal_cap.isOpened():
+        self.thermal_cap = ThermalCapture(0)
+        if not self.thermal_cap.start():
             self._set_status("Cannot open thermal camera.")
             return
         self.thermal_streaming = True
@@ -987,20 +992,13 @@ class TriplePayloadGUI:
     def _thermal_video_tick(self):
         if not (self.thermal_streaming and self.thermal_cap):
             return
-        ok, frame = self.thermal_cap.read()
-        if ok and PIL_AVAILABLE:
-            show = frame
+        # Newest frame from the capture worker (never blocks the Tk thread)
+        item = self.thermal_cap.latest()
+        if item is not None and PIL_AVAILABLE:
+            show = item.image
             try:
-                if self.thermal_palette == "white":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_BONE)
-                elif self.thermal_palette == "black":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_OCEAN)
-                elif self.thermal_palette == "rainbow":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_JET)
-                elif self.thermal_palette == "green":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_SUMMER)
-                elif self.thermal_palette == "metel":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_HOT)
+                # cached 256-entry LUT, intensity -> BGR in one pass
+                show = palette_engine.apply(show, self.thermal_palette)
             except Exception:
                 pass
 
@@ -1020,28 +1018,22 @@ class TriplePayloadGUI:
                 self.thermal_video_label.config(image=imgtk)
             except Exception as e:
                 self._set_status(f"Thermal display error: {e}")
-        self.root.after(30, self._thermal_video_tick)
+        # poll at the device frame rate reported by the capture worker
+        if self.thermal_cap:
+            self.root.after(max(5, int(1000 / self.thermal_cap.fps)), self._thermal_video_tick)
     
     # New method to handle thermal overlay stream in Day+Thermal mode
     def _thermal_video_tick_overlay(self):
         if not (self.thermal_overlay_stream and self.thermal_cap):
             return
         
-        ok, frame = self.thermal_cap.read()
-        if ok and PIL_AVAILABLE:
-            show = frame
+        # Newest frame from the capture worker (never blocks the Tk thread)
+        item = self.thermal_cap.latest()
+        if item is not None and PIL_AVAILABLE:
+            show = item.image
             try:
-                # Apply color map
-                if self.thermal_palette == "white":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_BONE)
-                elif self.thermal_palette == "black":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_OCEAN)
-                elif self.thermal_palette == "rainbow":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_JET)
-                elif self.thermal_palette == "green":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_SUMMER)
-                elif self.thermal_palette == "metel":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_HOT)
+                # cached 256-entry LUT, intensity -> BGR in one pass
+                show = palette_engine.apply(show, self.thermal_palette)
             except Exception:
                 pass
 
@@ -1058,7 +1050,8 @@ class TriplePayloadGUI:
             except Exception as e:
                 self._set_status(f"Thermal overlay display error: {e}")
         
-        self.root.after(30, self._thermal_video_tick_overlay)
+        if self.thermal_cap:
+            self.root.after(max(5, int(1000 / self.thermal_cap.fps)), self._thermal_video_tick_overlay)
 
     # ===================== DAY CAMERA =====================
     def day_start_stream(self):
@@ -1220,7 +1213,7 @@ class TriplePayloadGUI:
                     break
                 decoded = line.decode('utf-8', errors='ignore').strip()
                 if decoded:
-                    self.root.after(0, lambda m=decoded: self._set_status(f"Day/GST: {m}"))
+                    self._set_status(f"Day/GST: {decoded}")
         except Exception:
             pass
 
@@ -1236,6 +1229,7 @@ class TriplePayloadGUI:
 
     # ===================== CLEANUP =====================
     def on_close(self):
+        self.event_view.stop()
         # Stop LRF/Range
         try:
             if self.lrf_running and self.lrf_ser and self.lrf_ser.is_open:
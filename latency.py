@@ -0,0 +1,160 @@
+import bisect
+import time
+
+
+# ===================== HISTOGRAM =====================
+class Histogram:
+    """
+    Fixed log-spaced millisecond buckets (0.01 ms .. ~16 s, 25 % apart), so
+    add() is one bisect and one increment and percentiles need no sorting.
+    Percentiles are reported as the upper edge of the bucket they fall in.
+    """
+
+    EDGES = [0.01 * 1.25 ** i for i in range(65)]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(self.EDGES, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.EDGES[i], self.max) if i < len(self.EDGES) else self.max
+        return self.max
+
+
+# ===================== PER-FRAME TRACE =====================
+class FrameTrace:
+    """
+    Timestamps carried along with one frame. t0 is the capture time on the
+    time.monotonic() clock (derived from the buffer PTS / the capture call);
+    mark(stage) records the time since the previous mark under that stage name.
+    """
+
+    __slots__ = ("t0", "last", "stages")
+
+    def __init__(self, t0=None):
+        now = time.monotonic()
+        self.t0 = now if t0 is None else t0
+        self.last = self.t0
+        self.stages = []
+
+    def mark(self, stage):
+        now = time.monotonic()
+        self.stages.append((stage, (now - self.last) * 1000.0))
+        self.last = now
+
+    def fork(self):
+        """Copy for one branch of a fan-out (each display target gets its own)."""
+        twin = FrameTrace(self.t0)
+        twin.last = self.last
+        twin.stages = list(self.stages)
+        return twin
+
+
+# ===================== PER-STREAM STATS =====================
+class StreamLatency:
+    """
+    Per-stage and glass-to-glass histograms for one stream. Histograms cover a
+    rolling window of one to two `window` periods, so the HUD follows changes
+    instead of averaging over the whole session. record() is called once per
+    displayed frame (Tk thread); frames dropped before display are not counted.
+    """
+
+    def __init__(self, name, window=5.0):
+        self.name = name
+        self.window = window
+        self.frames = 0
+        self._cur = {}
+        self._prev = {}
+        self._window_start = time.monotonic()
+        self._rate_start = self._window_start
+        self._rate_frames = 0
+        self.fps = 0.0
+
+    def _hist(self, key):
+        h = self._cur.get(key)
+        if h is None:
+            h = self._cur[key] = Histogram()
+        return h
+
+    def record(self, trace):
+        """Close the trace at 'now' (frame is on screen) and add it to the histograms."""
+        now = time.monotonic()
+        for stage, ms in trace.stages:
+            self._hist(stage).add(ms)
+        self._hist("glass_to_glass").add((now - trace.t0) * 1000.0)
+        self.frames += 1
+        self._rate_frames += 1
+        if now - self._window_start >= self.window:
+            self._prev, self._cur = self._cur, {}
+            self._window_start = now
+
+    def _merged(self):
+        merged = {}
+        for hists in (self._prev, self._cur):
+            for key, h in hists.items():
+                merged.setdefault(key, Histogram()).merge(h)
+        return merged
+
+    def stats(self):
+        now = time.monotonic()
+        if now - self._rate_start >= 0.5:
+            self.fps = self._rate_frames / (now - self._rate_start)
+            self._rate_start, self._rate_frames = now, 0
+        merged = self._merged()
+        total = merged.pop("glass_to_glass", Histogram())
+        stages = {k: {"mean_ms": h.mean, "p99_ms": h.percentile(99)} for k, h in merged.items()}
+        slowest = max(stages.items(), key=lambda kv: kv[1]["mean_ms"], default=(None, None))
+        return {
+            "name": self.name,
+            "fps": self.fps,
+            "p50_ms": total.percentile(50),
+            "p99_ms": total.percentile(99),
+            "stages": stages,
+            "slowest": slowest[0],
+            "slowest_ms": slowest[1]["mean_ms"] if slowest[1] else 0.0,
+        }
+
+    def hud_text(self):
+        s = self.stats()
+        if not s["slowest"]:
+            return f"{self.name}: no frames"
+        return (f"{s['fps']:.0f} fps | g2g p50 {s['p50_ms']:.0f} / p99 {s['p99_ms']:.0f} ms | "
+                f"slowest {s['slowest']} {s['slowest_ms']:.1f} ms")
+
+    def reset(self):
+        self._cur, self._prev = {}, {}
+        self.frames = 0
+        self._window_start = self._rate_start = time.monotonic()
+        self._rate_frames = 0
+        self.fps = 0.0
@@ -0,0 +1,123 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter.scrolledtext import ScrolledText
+
+from event_log import ERROR, INFO, LEVEL_NAMES, WARNING, format_event
+
+LEVEL_COLOURS = {WARNING: "#c08000", ERROR: "#c00000"}
+
+
+# ===================== EVENT LOG VIEW (Tk) =====================
+class EventLogView:
+    """
+    Tk side of an EventLog. Every interval_ms the Tk thread drains the new
+    events in one go: the newest one at INFO or above goes to the status bar
+    and, while the log window is open, all of them are appended to it in a
+    single insert. Nothing here is called from worker threads, and no
+    update_idletasks() is forced; the status bar repaints with the next idle
+    pass like any other widget. watch(source, fn) calls fn(event) on the Tk
+    thread for each drained event from that source, so a worker can have
+    widgets updated by logging an event.
+    """
+
+    def __init__(self, root, log, status_var, interval_ms=200):
+        self.root = root
+        self.log = log
+        self.status_var = status_var
+        self.interval_ms = interval_ms
+        self.window = None
+        self.text = None
+        self.level_var = None
+        self._last_seq = 0
+        self._job = None
+        self._watchers = {}
+
+    def watch(self, source, fn):
+        self._watchers.setdefault(source, []).append(fn)
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _drain(self):
+        self._job = None
+        events = self.log.since(self._last_seq)
+        if events:
+            self._last_seq = max(e.seq for e in events)
+            shown = [e for e in events if e.level >= INFO]
+            if shown:
+                last = shown[-1]
+                prefix = f"{LEVEL_NAMES[last.level]}: " if last.level >= WARNING else ""
+                self.status_var.set(prefix + last.message)
+            if self.window is not None:
+                self._append(events)
+            for e in events:
+                for fn in self._watchers.get(e.source, ()):
+                    fn(e)
+        self._job = self.root.after(self.interval_ms, self._drain)
+
+    # ---------------- Log window ----------------
+    def _min_level(self):
+        return LEVEL_NAMES.index(self.level_var.get()) if self.level_var else INFO
+
+    def open(self):
+        """Open (or raise) the scrollable history window with a severity filter."""
+        if self.window is not None:
+            self.window.lift()
+            return
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Event log")
+        self.window.geometry("900x400")
+        bar = ttk.Frame(self.window, padding=(6, 4))
+        bar.pack(fill="x")
+        ttk.Label(bar, text="Show from").pack(side="left")
+        self.level_var = tk.StringVar(value=LEVEL_NAMES[INFO])
+        combo = ttk.Combobox(bar, textvariable=self.level_var, values=list(LEVEL_NAMES), state="readonly", width=10)
+        combo.pack(side="left", padx=6)
+        combo.bind("<<ComboboxSelected>>", lambda e: self._refill())
+        self.text = ScrolledText(self.window, wrap="none", font=("Consolas", 9), state="disabled")
+        self.text.pack(fill="both", expand=True)
+        for level, colour in LEVEL_COLOURS.items():
+            self.text.tag_configure(LEVEL_NAMES[level], foreground=colour)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self._refill()
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+        self.window = None
+        self.text = None
+        self.level_var = None
+
+    def _refill(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.configure(state="disabled")
+        self._append(self.log.snapshot())
+
+    def _append(self, events):
+        min_level = self._min_level()
+        events = [e for e in events if e.level >= min_level]
+        if not events:
+            return
+        at_end = self.text.yview()[1] >= 0.999
+        self.text.configure(state="normal")
+        args = []
+        for e in events:
+            args += [format_event(e) + "\n", LEVEL_NAMES[e.level]]
+        self.text.insert("end", *args)
+        # keep the widget about as long as the ring
+        excess = int(self.text.index("end-1c").split(".")[0]) - self.log.capacity
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.configure(state="disabled")
+        if at_end:
+            self.text.see("end")
@@ -50,4 +50,4 @@ class LRF:
             txt = f"Range: {self.last_distance:.1f} m"
         else:
             txt = "Range: --.- m"
-        self.gui.lrf_overlay.config(text=txt)
+        self.gui.thermal_view.set_range(txt)
@@ -18,7 +18,7 @@ from PIL import Image, ImageTk
 from day_camera import DayCamera
 from thermal_camera import ThermalCamera
 from lrf import LRF
-from utils import overlay_crosshair
+from video_canvas import VideoCanvas
 
 Gst.init(None)
 
@@ -72,8 +72,8 @@ class TriplePayloadGUI:
 
         self.day_video_frame = tk.Frame(self.s1_group, bg="black")
         self.day_video_frame.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        self.day_video_label = tk.Label(self.day_video_frame, bg="black")
-        self.day_video_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.day_view = VideoCanvas(self.day_video_frame)
+        self.day_view.place(relx=0, rely=0, relwidth=1, relheight=1)
 
         # ---- Thermal stream ----
         self.s2_group = ttk.Labelframe(self.body, text="STREAM-02 (Thermal Camera)")
@@ -83,15 +83,11 @@ class TriplePayloadGUI:
 
         self.thermal_video_frame = tk.Frame(self.s2_group, bg="black")
         self.thermal_video_frame.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        self.thermal_video_label = tk.Label(self.thermal_video_frame, bg="black")
-        self.thermal_video_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.thermal_view = VideoCanvas(self.thermal_video_frame)
+        self.thermal_view.place(relx=0, rely=0, relwidth=1, relheight=1)
 
-        # LRF overlay
-        self.lrf_overlay = tk.Label(self.thermal_video_frame,
-                                    text="Range: --.- m",
-                                    font=("Segoe UI", 12, "bold"),
-                                    fg="cyan", bg="black")
-        self.lrf_overlay.place(relx=1.0, rely=0.0, anchor="ne", x=-8, y=8)
+        # LRF overlay (HUD text on the thermal view)
+        self.thermal_view.set_range("Range: --.- m")
 
         # -------- Controls --------
         self.controls = ttk.Frame(self.root, padding=6)
@@ -135,6 +131,8 @@ class TriplePayloadGUI:
 
     def toggle_crosshair(self):
         self.crosshair_enabled = not self.crosshair_enabled
+        self.day_view.set_crosshair(self.crosshair_enabled)
+        self.thermal_view.set_crosshair(self.crosshair_enabled)
         self._set_status("Crosshair " + ("enabled" if self.crosshair_enabled else "disabled"))
 
     # ===================== Cleanup =====================
@@ -17,8 +17,24 @@ from tkinter import ttk, messagebox
 from collections import deque
 import subprocess
 import os
+import sys
 import signal
 
+from payload_engine import PayloadEngine
+from uart_worker import PRIORITY_COMMAND
+from thermal_commands import THERMAL_FUNCTION_GROUPS, THERMAL_INFO_REQUESTS
+from thermal_palette import palette_engine
+from video_canvas import VideoCanvas
+from recorder import AppSrcRecorder, TeeRecorder, RECORDINGS_DIR, pick_encoder, recording_path
+from display_clock import DisplayClock
+from event_log import ERROR, INFO, EventLog
+from log_panel import EventLogView
+from governor import LoadGovernor, process_cpu_busy
+from snapshot import SnapshotWriter, FORMATS as SNAPSHOT_FORMATS
+from latency import FrameTrace, StreamLatency
+from frame_processing import render_thermal_frame
+from replay_buffer import ReplayRing, decode as replay_decode, nearest as replay_nearest
+
 Gst.init(None)
 
 # --- Safe Import for ImageTk ---
@@ -28,173 +44,84 @@ try:
 except Exception:
     PIL_AVAILABLE = False
 
-# ===================== CROSSHAIR (SIMPLE '+') =====================
-def overlay_crosshair(frame):
-    """
-    Draw a simple red '+' crosshair at the center of the frame.
-    Returns modified frame (same dtype).
-    """
-    if frame is None or frame.size == 0:
-        return frame
-
-    out = frame.copy()
-    h, w = out.shape[:2]
-    cx, cy = w // 2, h // 2
-
-    color = (0, 0, 255)  # Red (BGR)
-    thickness = 2
-    size = max(10, min(w, h) // 20)
-
-    # Horizontal line
-    cv2.line(out, (cx - size, cy), (cx + size, cy), color, thickness, cv2.LINE_AA)
-    # Vertical line
-    cv2.line(out, (cx, cy - size), (cx, cy + size), color, thickness, cv2.LINE_AA)
-
-    return out
-
-# =================== LRF COMMANDS ===================
-STOP_MEASUREMENT        = bytes([0x55, 0xAA, 0x8E, 0xFF, 0xFF, 0xFF, 0xFF, 0x8A])
-CONTINUOUS_MEASUREMENT  = bytes([0x55, 0xAA, 0x89, 0xFF, 0xFF, 0xFF, 0xFF, 0x85])
-SINGLE_MEASUREMENT      = bytes([0x55, 0xAA, 0x88, 0xFF, 0xFF, 0xFF, 0xFF, 0x84])
-
-# ================= THERMAL COMMANDS =================
-def build_sumcheck(val, func, opcode):
-    val = int(val)
-    ranges = {
-        "brightness": (10, 250),
-        "contrast": (10, 250),
-        "reference_image": (0, 128),
-        "DDE_mode": (1, 3),
-        "DDE_strength": (1, 128),
-        "zoom": (1, 16),
-    }
-    if func in ranges:
-        mn, mx = ranges[func]
-        if not (mn <= val <= mx):
-            raise ValueError(f"{func} must be between {mn} and {mx}")
-    checksum = opcode + val
-    return f"{checksum & 0xFF:02X} {(checksum >> 8) & 0xFF:02X}"
-
-def checksum_response(data):
-    return sum(data) & 0xFFFF
-
-def send_to_ir_camera(ser, hex_data, response_len=16, read_timeout=1):
-    try:
-        ser.timeout = read_timeout
-        data = [int(x, 16) for x in hex_data.split()]
-        ser.write(bytes(data))
-        time.sleep(0.1)
-        response = ser.read(response_len)
-        if len(response) < 8:
-            return 0
-        data_length = response[2]
-        chk_lo = response[6]
-        chk_hi = response[7]
-        recv_chk = (chk_hi << 8) | chk_lo
-        calc = list(response)
-        calc[6] = 0
-        calc[7] = 0
-        if recv_chk == checksum_response(calc):
-            expected = 8 + data_length
-            if len(response) >= expected:
-                return response[8:expected]
-            else:
-                return []
-        return 0
-    except serial.SerialException:
-        return 0
-
-THERMAL_FUNCTION_GROUPS = {
-    "color": {
-        "response_len": 10,
-        "functions": {
-            "rainbow": {"data": "68 11 03 01 00 00 80 00 02 01 00"},
-            "green":   {"data": "68 11 03 01 00 00 81 00 02 01 01"},
-            "metel":   {"data": "68 11 03 01 00 00 82 00 02 01 02"},
-            "white":   {"data": "68 11 03 01 00 00 83 00 02 01 03"},
-            "black":   {"data": "68 11 03 01 00 00 84 00 02 01 04"},
-            "save":    {"data": "68 11 01 01 00 00 7E 00 03"},
-        },
-    },
-    "hotspot": {
-        "response_len": 12,
-        "functions": {
-            "on":  {"data": "68 10 03 01 00 00 80 00 02 01 01"},
-            "off": {"data": "68 10 03 01 00 00 7F 00 02 01 00"},
-        },
-    },
-    "brightness": {
-        "response_len": 12,
-        "parameterized": True,
-        "opcode": 0x93,
-        "build_data": lambda v: f"68 24 04 01 00 00 {build_sumcheck(v, 'brightness', 0x93)} 02 00 {int(v):02X} 00",
-    },
-    "contrast": {
-        "response_len": 12,
-        "parameterized": True,
-        "opcode": 0x94,
-        "build_data": lambda v: f"68 24 04 01 00 00 {build_sumcheck(v, 'contrast', 0x94)} 02 01 {int(v):02X} 00",
-    },
-    "denoise": {
-        "response_len": 12,
-        "parameterized": True,
-        "opcode": 0x98,
-        "build_data": lambda v: f"68 24 04 01 00 00 {build_sumcheck(v,'denoise',0x98)} 02 05 {int(v):02X} 00",
-    },
-    "vstripe": {
-        "response_len": 12,
-        "parameterized": True,
-        "opcode": 0x9A,
-        "build_data": lambda v: f"68 24 04 01 00 00 {build_sumcheck(v,'vstripe',0x9A)} 02 07 {int(v)&1:02X} 00",
-    },
-    "zoom": {
-        "response_len": 12,
-        "parameterized": True,
-        "opcode": 0x96,
-        "build_data": lambda v: f"68 24 04 01 00 00 {build_sumcheck(v, 'zoom', 0x96)} 04 01 {int(v):02X} 00",
-    },
-}
-
-THERMAL_INFO_REQUESTS = [
-    {"label": "Chip model: ",   "data": "68 01 00 01 00 00 6A 00",        "response_len": 10},
-    {"label": "Chip ID: ",      "data": "68 35 00 01 00 00 9E 00",        "response_len": 16},
-    {"label": "Firmware ver: ", "data": "68 10 02 01 00 00 7C 00 01 00",  "response_len": 12},
-    {"label": "Hardware ver: ", "data": "68 10 02 01 00 00 7D 00 01 01",  "response_len": 12},
-]
+# Instant replay: RAM budget per stream (MB) and stored width. At these sizes the
+# day ring keeps ~60 s and the thermal ring ~45 s at 30 fps.
+REPLAY_BUDGET_MB = {"day": 64, "thermal": 24}
+REPLAY_MAX_WIDTH = {"day": 640, "thermal": 384}
+
+# Display clock rate, and the reduced rates the load governor steps down to
+DISPLAY_FPS = 30
+GOVERNOR_RATES = (20, 15)
 
 # ===================== UNIFIED SINGLE-PAGE GUI =====================
+def _rgb_to_bgr(img):
+    # snapshot transform for colour day frames (cv2 writes BGR)
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
 class TriplePayloadGUI:
-    def __init__(self, root):
+    def __init__(self, root, processes=False):
         self.root = root
         self.root.title("Entangled Photons EO/IR")
         self.root.geometry("1500x900")
 
         # ---- State ----
-        self.lrf_ser = None
-        self.lrf_running = False
-        self.lrf_last_distance = None
-        self.lrf_read_thread = None
-
-        self.thermal_ser = None
-        self.thermal_connected = False
-        self.thermal_cap = None
+        # Status / event history: any thread logs into the ring, the Tk thread
+        # drains it into the status bar and the log window a few times a second
+        self.events = EventLog()
+
+        # Devices, capture and processing live in the engine; this class only
+        # subscribes to it and paints. Engine events arrive on worker threads.
+        # processes=True: cameras are read in capture processes (no day recording)
+        self.engine = PayloadEngine(processes=processes)
+        self.engine.on_event(lambda msg: self.events.info(msg, "engine"))
+
+        self.thermal_main_sub = None
+        self.thermal_overlay_sub = None
         self.thermal_streaming = False
         self.thermal_size = (640, 480)
         self.thermal_palette = "white"
-        # Thermal overlay for Day+Thermal fullscreen mode
-        self.thermal_overlay_label = None
+        # Thermal PiP for Day+Thermal fullscreen mode
+        self.thermal_pip = None
         self.thermal_overlay_stream = False
-        self.day_overlay_label = None # NEW: For Thermal+Day mode
-        self.lrf_fullscreen_overlay_label = None # NEW: For LRF overlay in fullscreen
+        self.day_pip = None # NEW: For Thermal+Day mode
 
-        # Updated Day Camera state (from standalone logic)
-        self.day_pipeline = None
-        self.day_sink = None
+        # Day camera state
         self.day_streaming = False
         self.day_colour_running = False
-        self.day_imgtk = None
-        
-        self.day_black_img = None
+        # One "latest frame wins" subscription per day display target, drained by
+        # the display clock once per tick; sizes are set from the Tk side
+        self.day_main_sub = self.engine.day.subscribe("main")
+        self.day_overlay_sub = self.engine.day.subscribe("overlay")
+        # Recording: tee branch on the day pipeline, appsrc pipeline fed by the thermal capture
+        self.day_recorder = None
+        self.day_rec_busy = False  # a start/stop worker is running
+        self.thermal_recorder = None
+        self.thermal_rec_sub = None
+        # Instant replay rings, fed from the day pump and a thermal capture subscriber
+        self.replay = {key: ReplayRing(key, budget_mb=REPLAY_BUDGET_MB[key], max_width=REPLAY_MAX_WIDTH[key])
+                       for key in ("day", "thermal")}
+        self.thermal_replay_sub = None
+        self.replay_mode = False     # True while live display is paused for scrubbing
+        self.replay_frames = None    # frozen snapshots being scrubbed
+        self.replay_end = 0.0
+        # Full-resolution snapshots / bursts, encoded and written on a worker pool
+        self.snapshots = SnapshotWriter(report=lambda msg: self.events.info(msg, "snapshot"))
+        self.thermal_snap_sub = None
+        # Raw day taps on the pump thread: replay ring (downscaled JPEG, before zoom)
+        # and the full-resolution source frame when a snapshot/burst is armed
+        day_ring = self.replay["day"]
+        self.engine.day.subscribe("replay", callback=lambda f: day_ring.push(f.image, f.timestamp))
+        self.engine.day.subscribe("snapshot", callback=lambda f: self.snapshots.offer(
+            "day", f.image, transform=_rgb_to_bgr if f.image.ndim == 3 else None))
+        # Per-stage latency histograms (capture -> on screen) and the toggleable HUD
+        self.latency = {"day": StreamLatency("day"), "thermal": StreamLatency("thermal")}
+        self.latency_hud = False
+        # Load shedding applied by the governor (read when subscription sizes are synced)
+        self.pip_stride = 1          # render every n-th PiP frame
+        self.fast_scaling = False    # INTER_NEAREST instead of the normal resize filters
+        self.targets_hidden = False  # window minimised: no painting, no rendering
+
         self.fullscreen_mode = False
         
         # Crosshair state (NEW) - default OFF
@@ -203,134 +130,114 @@ class TriplePayloadGUI:
         self.day_zoom_level = tk.DoubleVar(value=1.0)
         self.thermal_zoom_var = tk.IntVar(value=1)
 
+        # User-defined thermal palettes (.npy / .txt / .csv / .pal) next to the built-in ones
+        palette_engine.load_dir("./palettes")
+
         # Build UI
         self._build_layout()
+        self.event_view = EventLogView(self.root, self.events, self.status_var)
+        self.event_view.watch("day-recorder", lambda e: self._sync_day_rec_button())
+        self.event_view.start()
+
+        # Single Tk timer that repaints every visible video target / overlay
+        self.display_clock = DisplayClock(self.root, fps=DISPLAY_FPS, report=self._show_paint_stats,
+                                          on_error=lambda name, e: self.events.error(
+                                              f"Display target {name} failed: {type(e).__name__}: {e}", "display"))
+        self.display_clock.add_target("day", lambda: self._paint_day("main"),
+                                      visible=lambda: self.day_streaming and not self.replay_mode
+                                      and not self.targets_hidden)
+        self.display_clock.add_target("day_overlay", lambda: self._paint_day("overlay"),
+                                      visible=lambda: self.day_streaming and self.day_pip is not None
+                                      and not self.targets_hidden)
+        self.display_clock.add_target("thermal", self._thermal_video_tick,
+                                      visible=lambda: self.thermal_streaming and not self.replay_mode
+                                      and not self.targets_hidden)
+        self.display_clock.add_target("thermal_overlay", self._thermal_video_tick_overlay,
+                                      visible=lambda: self.thermal_overlay_stream and not self.targets_hidden)
+        self.display_clock.add_target("range", self._update_lrf_overlay,
+                                      visible=lambda: self.engine.lrf.running)
+        self.display_clock.add_target("hud", self._update_zoom_hud)
+        self.display_clock.start()
+
+        # Load governor, sampled with the paint stats (once a second). Sheds in this
+        # order and restores in reverse: PiP frames, display rate, resize quality,
+        # display rate again. Minimised windows are paused regardless of load.
+        self.governor = LoadGovernor(report=self._governor_report)
+        self.governor.add_load("display", lambda: self.display_clock.total_paint_ms / 1000.0)
+        self.governor.add_load("day pump", lambda: self.engine.day.process_cpu)
+        self.governor.add_load("cpu", process_cpu_busy)
+        self.governor.add_step("skip PiP frames", lambda on: setattr(self, "pip_stride", 2 if on else 1))
+        self.governor.add_step(f"display {GOVERNOR_RATES[0]} Hz",
+                               lambda on: self.display_clock.set_rate(GOVERNOR_RATES[0] if on else DISPLAY_FPS))
+        self.governor.add_step("fast scaling", lambda on: setattr(self, "fast_scaling", on))
+        self.governor.add_step(f"display {GOVERNOR_RATES[1]} Hz",
+                               lambda on: self.display_clock.set_rate(GOVERNOR_RATES[1] if on else GOVERNOR_RATES[0]))
+        self.root.bind("<Unmap>", lambda e: self._refresh_visibility(), add="+")
+        self.root.bind("<Map>", lambda e: self._refresh_visibility(), add="+")
         if PIL_AVAILABLE:
             black_frame = np.zeros((480, 640, 3), dtype=np.uint8)
             try:
-                self.day_black_img = ImageTk.PhotoImage(image=Image.fromarray(black_frame))
-                self.day_video_label.config(image=self.day_black_img)
-                self.day_video_label.imgtk = self.day_black_img
+                self.day_view.show(Image.fromarray(black_frame))
             except Exception:
                 pass
 
         # Bind close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-    # ---------------- Day pipeline helper (Updated with standalone logic) ----------------
-    def _setup_day_pipeline(self, pipeline_str):
-        """Setup pipeline using the standalone day camera logic"""
-        if self.day_pipeline:
-            try:
-                self.day_pipeline.set_state(Gst.State.NULL)
-            except Exception:
-                pass
-        self.day_pipeline = Gst.parse_launch(pipeline_str)
-        self.day_sink = self.day_pipeline.get_by_name("sink")
-        self.day_sink.set_property("emit-signals", True)
-        self.day_sink.set_property("max-buffers", 1)
-        self.day_sink.set_property("drop", True)
-        self.day_sink.connect("new-sample", self._on_day_sample)
-
-    def _run_day_pipeline_loop(self, pipeline_str):
-        """Run pipeline loop using standalone logic pattern"""
-        self.day_stop_stream()  # just in case
-        self.day_streaming = True
-        self.day_imgtk = None
-
+    # ---------------- Day display (frames rendered by the engine's pump thread) ----------------
+    def _sync_day_sizes(self):
+        """Tell the engine which day targets to render and at what size (Tk thread)"""
+        if self.fullscreen_mode == "thermal_day":
+            self.day_main_sub.size = None
+            self.day_overlay_sub.size = (320, 240)  # Fixed size for overlay
+        else:
+            self.day_main_sub.size = (max(10, self.day_video_frame.winfo_width()),
+                                      max(10, self.day_video_frame.winfo_height()))
+            self.day_overlay_sub.size = None
+        zoom = self.day_zoom_level.get()
+        self.day_main_sub.zoom = self.day_overlay_sub.zoom = zoom
+        # rounded so slider jitter does not keep moving the sensor ROI
+        pan = (round(self.day_pan_x.get(), 2), round(self.day_pan_y.get(), 2))
+        self.day_main_sub.pan = self.day_overlay_sub.pan = pan
+        self.day_overlay_sub.stride = self.pip_stride
+        # with in-pipeline scaling, frames above the paint rate are dropped by videorate
+        self.day_main_sub.fps = self.day_overlay_sub.fps = self.display_clock.fps
+        interpolation = cv2.INTER_NEAREST if self.fast_scaling else cv2.INTER_LINEAR
+        self.day_main_sub.interpolation = self.day_overlay_sub.interpolation = interpolation
+
+    def _refresh_visibility(self):
+        """Pause every display target while the window is minimised (Tk thread)"""
         try:
-            self.day_pipeline = Gst.parse_launch(pipeline_str)
-            self.day_sink = self.day_pipeline.get_by_name("sink")
-            self.day_sink.set_property("emit-signals", False)
-            self.day_sink.set_property("max-buffers", 1)
-            self.day_sink.set_property("drop", True)
-            self.day_pipeline.set_state(Gst.State.PLAYING)
-        except Exception as e:
-            self.root.after(0, lambda: self._set_status(f"Pipeline error: {e}"))
+            hidden = self.root.state() in ("iconic", "withdrawn")
+        except Exception:
             return
-
-        # Loop pulling frames (from standalone logic)
-        def pull_frames():
-            while self.day_streaming and self.day_pipeline:
-                sample = self.day_sink.emit("try-pull-sample", 0)  # non-blocking
-                if sample:
-                    buf = sample.get_buffer()
-                    caps = sample.get_caps()
-                    try:
-                        w = caps.get_structure(0).get_value("width")
-                        h = caps.get_structure(0).get_value("height")
-                    except:
-                        w, h = 640, 480
-
-                    data = buf.extract_dup(0, buf.get_size())
-                    arr = np.frombuffer(data, np.uint8)
-
-                    if arr.size == (h * w):  # grayscale
-                        arr = arr.reshape((h, w))
-                        arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
-                    else:
-                        arr = arr.reshape((h, w, 3))
-
-                    # Apply digital zoom to the Day camera feed
-                    zoom_level = self.day_zoom_level.get()
-                    if zoom_level > 1.0:
-                        zoom_factor = 1.0 / zoom_level
-                        zoom_w, zoom_h = int(w * zoom_factor), int(h * zoom_factor)
-                        cx, cy = w // 2, h // 2
-                        x1, y1 = cx - zoom_w // 2, cy - zoom_h // 2
-                        x2, y2 = cx + zoom_w // 2, cy + zoom_h // 2
-                        arr = arr[y1:y2, x1:x2]
-
-                    # Check if we are in Day+Thermal fullscreen mode
-                    if self.fullscreen_mode == "day_thermal":
-                        widget_w, widget_h = max(10, self.day_video_frame.winfo_width()), max(10, self.day_video_frame.winfo_height())
-                        target_label = self.day_video_label
-                    elif self.fullscreen_mode == "thermal_day":
-                        widget_w, widget_h = 320, 240 # Fixed size for overlay
-                        target_label = self.day_overlay_label
-                    else:
-                        widget_w, widget_h = max(10, self.day_video_frame.winfo_width()), max(10, self.day_video_frame.winfo_height())
-                        target_label = self.day_video_label
-
-                    rgb = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
-                    rgb = cv2.resize(rgb, (widget_w, widget_h))
-
-                    # Apply crosshair overlay only if enabled, AFTER fixed resize
-                    if self.crosshair_enabled:
-                        try:
-                            rgb = overlay_crosshair(rgb)
-                        except Exception as e:
-                            self._set_status(f"Crosshair overlay error: {e}")
-
-                    # Convert back to RGB for PIL
-                    rgb = cv2.cvtColor(rgb, cv2.COLOR_BGR2RGB)
-                    img = Image.fromarray(rgb)
-
-                    # Update GUI safely
-                    self.root.after(0, lambda img=img, target=target_label: self._update_day_image(img, target))
-
-                time.sleep(0.01)
-
-        threading.Thread(target=pull_frames, daemon=True).start()
-
-    def _update_day_image(self, img, target_label=None):
-        """Update day image using standalone logic pattern"""
-        if target_label is None:
-            target_label = self.day_video_label
-            
-        if self.day_imgtk is None:
-            self.day_imgtk = ImageTk.PhotoImage(img)
-            target_label.config(image=self.day_imgtk, text="")
-        else:
-            try:
-                self.day_imgtk.paste(img)
-            except Exception:
-                self.day_imgtk = ImageTk.PhotoImage(img)
-                target_label.config(image=self.day_imgtk, text="")
-
-    def _on_day_sample(self, sink):
-        """Legacy callback - kept for compatibility but not used with new logic"""
-        return Gst.FlowReturn.OK
+        if hidden == self.targets_hidden:
+            return
+        self.targets_hidden = hidden
+        # the paint targets are skipped via visible(); stop the engine rendering for them too
+        if hidden:
+            self.day_main_sub.size = self.day_overlay_sub.size = None
+        for sub in (self.thermal_main_sub, self.thermal_overlay_sub):
+            if sub is not None:
+                sub.paused = hidden
+        self.governor.log("Governor: window minimised, display targets paused" if hidden
+                          else "Governor: window restored, display targets resumed")
+
+    def _paint_day(self, key):
+        """Paint the newest pending day frame for one target (display clock, Tk thread)"""
+        if key == "main":
+            self._sync_day_sizes()
+        sub = self.day_overlay_sub if key == "overlay" else self.day_main_sub
+        item = sub.latest()
+        if item is None:
+            return
+        item.trace.mark("mailbox")  # waiting for the display clock
+        view = self.day_pip if key == "overlay" else self.day_view
+        if view is not None:
+            view.show(item.image)
+            item.trace.mark("paint")
+            if key == "main":
+                self.latency["day"].record(item.trace)
 
     # ----------------- Layout helpers -----------------
     def _make_scrollable_frame(self, parent):
@@ -387,8 +294,6 @@ class TriplePayloadGUI:
 
         # Create the exit fullscreen button but don't pack it yet
         self.exit_fs_button = ttk.Button(self.root, text="Exit Fullscreen", command=self._exit_fullscreen)
-        # New variable for the day overlay label
-        self.day_overlay_label = None
 
         # -------- Main body: streams + stacked settings on right --------
         self.body = ttk.Frame(self.root, padding=6)
@@ -407,8 +312,8 @@ class TriplePayloadGUI:
 
         self.day_video_frame = tk.Frame(self.s1_group, bg="black")
         self.day_video_frame.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        self.day_video_label = tk.Label(self.day_video_frame, bg="black")
-        self.day_video_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.day_view = VideoCanvas(self.day_video_frame)
+        self.day_view.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.day_video_frame.grid_propagate(False)
 
         # ---- Stream-02 (Thermal) ----
@@ -419,16 +324,12 @@ class TriplePayloadGUI:
 
         self.thermal_video_frame = tk.Frame(self.s2_group, bg="black")
         self.thermal_video_frame.grid(row=0, column=0, sticky="nsew", padx=6, pady=6)
-        self.thermal_video_label = tk.Label(self.thermal_video_frame, bg="black")
-        self.thermal_video_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.thermal_view = VideoCanvas(self.thermal_video_frame)
+        self.thermal_view.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.thermal_video_frame.grid_propagate(False)
 
-        # Range overlay (previously LRF)
-        self.lrf_overlay = tk.Label(self.thermal_video_frame,
-                                    text="Range: --.- m",
-                                    font=("Segoe UI", 12, "bold"),
-                                    fg="cyan", bg="black")
-        self.lrf_overlay.place(relx=1.0, rely=0.0, anchor="ne", x=-8, y=8)
+        # Range overlay (previously LRF) - HUD text on the thermal view
+        self.thermal_view.set_range("Range: --.- m")
 
         # ---- Right column: stacked settings with scrolls ----
         self.right = ttk.Frame(self.body)
@@ -447,32 +348,48 @@ class TriplePayloadGUI:
         self.day_gain     = tk.DoubleVar(value=1.0)
         self.day_wb       = tk.IntVar(value=4500)
         self.day_zoom_level = tk.DoubleVar(value=1.0)
+        self.day_pan_x = tk.DoubleVar(value=0.0)
+        self.day_pan_y = tk.DoubleVar(value=0.0)
 
         ttk.Label(day_inner, text="Exposure (ms)").grid(row=0, column=0, sticky="w", padx=6, pady=(6,0))
         ttk.Scale(day_inner, from_=0.1, to=30.0, orient="horizontal", variable=self.day_exposure,
-                  command=lambda _=None: self._apply_day_setting("Exposure", self.day_exposure.get())).grid(row=0, column=1, sticky="ew", padx=6, pady=(6,0))
+                  command=lambda _=None: self._apply_day_setting("exposure", self.day_exposure.get())).grid(row=0, column=1, sticky="ew", padx=6, pady=(6,0))
         ttk.Label(day_inner, text="Gain").grid(row=1, column=0, sticky="w", padx=6, pady=(6,0))
         ttk.Scale(day_inner, from_=0.0, to=16.0, orient="horizontal", variable=self.day_gain,
-                  command=lambda _=None: self._apply_day_setting("Gain", self.day_gain.get())).grid(row=1, column=1, sticky="ew", padx=6, pady=(6,0))
+                  command=lambda _=None: self._apply_day_setting("gain", self.day_gain.get())).grid(row=1, column=1, sticky="ew", padx=6, pady=(6,0))
         ttk.Label(day_inner, text="White Balance (K)").grid(row=2, column=0, sticky="w", padx=6, pady=(6,0))
         ttk.Scale(day_inner, from_=2800, to=8000, orient="horizontal", variable=self.day_wb,
-                  command=lambda _=None: self._apply_day_setting("WB", self.day_wb.get())).grid(row=2, column=1, sticky="ew", padx=6, pady=(6,8))
+                  command=lambda _=None: self._apply_day_setting("wb", self.day_wb.get())).grid(row=2, column=1, sticky="ew", padx=6, pady=(6,8))
         
         # Add a new digital zoom slider for the day camera
         ttk.Label(day_inner, text="Digital Zoom (1-4x)").grid(row=3, column=0, sticky="w", padx=6, pady=(6,0))
         ttk.Scale(day_inner, from_=1.0, to=4.0, orient="horizontal", variable=self.day_zoom_level,
                   command=lambda _=None: self._set_status("Day Zoom: " + str(self.day_zoom_level.get()))).grid(row=3, column=1, sticky="ew", padx=6, pady=(6,8))
-        
+
+        # Move the zoom window off-centre (-1 = left/top edge, +1 = right/bottom edge)
+        ttk.Label(day_inner, text="Pan X").grid(row=4, column=0, sticky="w", padx=6, pady=(0,0))
+        ttk.Scale(day_inner, from_=-1.0, to=1.0, orient="horizontal", variable=self.day_pan_x).grid(row=4, column=1, sticky="ew", padx=6, pady=(0,0))
+        ttk.Label(day_inner, text="Pan Y").grid(row=5, column=0, sticky="w", padx=6, pady=(6,0))
+        ttk.Scale(day_inner, from_=-1.0, to=1.0, orient="horizontal", variable=self.day_pan_y).grid(row=5, column=1, sticky="ew", padx=6, pady=(6,8))
+
         day_inner.grid_columnconfigure(1, weight=1)
 
         # ====== Colour Stream toggle button ======
         self.colour_btn_text = tk.StringVar(value="Start Colour Stream")
         self.colour_btn = ttk.Button(day_inner, textvariable=self.colour_btn_text, command=self.toggle_day_colour_stream)
-        self.colour_btn.grid(row=4, column=0, columnspan=2, sticky="ew", padx=6, pady=(4,6))
+        self.colour_btn.grid(row=6, column=0, columnspan=2, sticky="ew", padx=6, pady=(4,6))
 
         # Add Crosshair button under Colour Stream
         self.crosshair_btn_text = tk.StringVar(value="Crosshair: OFF")
-        ttk.Button(day_inner, textvariable=self.crosshair_btn_text, command=self.toggle_crosshair).grid(row=5, column=0, columnspan=2, sticky="ew", padx=6, pady=(4,10))
+        ttk.Button(day_inner, textvariable=self.crosshair_btn_text, command=self.toggle_crosshair).grid(row=7, column=0, columnspan=2, sticky="ew", padx=6, pady=(4,10))
+
+        # Per-stage latency readout on both views
+        self.latency_btn_text = tk.StringVar(value="Latency HUD: OFF")
+        ttk.Button(day_inner, textvariable=self.latency_btn_text, command=self.toggle_latency_hud).grid(row=8, column=0, columnspan=2, sticky="ew", padx=6, pady=(0,10))
+
+        # Adaptive load shedding under CPU pressure
+        self.governor_btn_text = tk.StringVar(value="Load governor: ON")
+        ttk.Button(day_inner, textvariable=self.governor_btn_text, command=self.toggle_governor).grid(row=9, column=0, columnspan=2, sticky="ew", padx=6, pady=(0,10))
 
         # Thermal settings (scrollable)
         thermal_settings_frame = ttk.Labelframe(self.right, text="THERMAL")
@@ -484,7 +401,7 @@ class TriplePayloadGUI:
         pal_box = ttk.Labelframe(th_inner, text="Pseudo-color")
         pal_box.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(6,4), padx=6)
         self.thermal_palette_combo = ttk.Combobox(pal_box, width=12,
-                                                  values=["white","black","rainbow","green","metel"], state="readonly")
+                                                  values=palette_engine.names, state="readonly")
         self.thermal_palette_combo.set("white")
         self.thermal_palette_combo.grid(row=0, column=0, padx=4, pady=6)
         ttk.Button(pal_box, text="Apply", command=self.thermal_apply_palette).grid(row=0, column=1, padx=4)
@@ -557,6 +474,8 @@ class TriplePayloadGUI:
         ttk.Label(day_ctrl, text="DAY").pack(side="left", padx=(0,6))
         ttk.Button(day_ctrl, text="Start B/W", command=self.day_start_stream).pack(side="left", padx=4)
         ttk.Button(day_ctrl, text="Stop", command=self.day_stop_stream).pack(side="left", padx=4)
+        self.day_rec_btn_text = tk.StringVar(value="Record")
+        ttk.Button(day_ctrl, textvariable=self.day_rec_btn_text, command=self.day_toggle_recording).pack(side="left", padx=4)
 
         # Range / LRF controls
         lrf_ctrl = ttk.Frame(self.controls)
@@ -579,6 +498,8 @@ class TriplePayloadGUI:
         ttk.Label(th_ctrl, text="THERMAL").pack(side="left", padx=(0,6))
         ttk.Button(th_ctrl, text="Start", command=self.thermal_start_stream).pack(side="left", padx=4)
         ttk.Button(th_ctrl, text="Stop", command=self.thermal_stop_stream).pack(side="left", padx=4)
+        self.thermal_rec_btn_text = tk.StringVar(value="Record")
+        ttk.Button(th_ctrl, textvariable=self.thermal_rec_btn_text, command=self.thermal_toggle_recording).pack(side="left", padx=4)
         ttk.Label(th_ctrl, text="UART").pack(side="left", padx=(8,2))
         self.thermal_port_combo = ttk.Combobox(th_ctrl, width=12, values=self._list_ports())
         self.thermal_port_combo.set("/dev/ttyUSB0" if "/dev/ttyUSB0" in self.thermal_port_combo["values"] else (self.thermal_port_combo["values"][0] if self.thermal_port_combo["values"] else ""))
@@ -590,6 +511,31 @@ class TriplePayloadGUI:
         ttk.Button(th_ctrl, text="UART Connect", command=self.thermal_connect_uart).pack(side="left", padx=4)
         ttk.Button(th_ctrl, text="UART Disconnect", command=self.thermal_disconnect_uart).pack(side="left", padx=4)
 
+        # Instant replay: pause live view and scrub back through the RAM rings
+        replay_ctrl = ttk.Frame(self.controls)
+        replay_ctrl.pack(side="left", padx=12)
+        ttk.Label(replay_ctrl, text="REPLAY").pack(side="left", padx=(0,6))
+        self.replay_btn_text = tk.StringVar(value="Pause")
+        ttk.Button(replay_ctrl, textvariable=self.replay_btn_text, command=self.toggle_replay).pack(side="left", padx=4)
+        self.replay_pos = tk.DoubleVar(value=0.0)
+        self.replay_scale = ttk.Scale(replay_ctrl, from_=-30.0, to=0.0, orient="horizontal", length=160,
+                                      variable=self.replay_pos, command=self._replay_seek, state="disabled")
+        self.replay_scale.pack(side="left", padx=4)
+        ttk.Button(replay_ctrl, text="Save Replay", command=self.replay_save).pack(side="left", padx=4)
+
+        # Snapshots: full-resolution source frames, N-frame burst at source rate
+        snap_ctrl = ttk.Frame(self.controls)
+        snap_ctrl.pack(side="left", padx=12)
+        ttk.Label(snap_ctrl, text="SNAPSHOT").pack(side="left", padx=(0,6))
+        self.snap_format_combo = ttk.Combobox(snap_ctrl, width=5, values=list(SNAPSHOT_FORMATS), state="readonly")
+        self.snap_format_combo.set("png")
+        self.snap_format_combo.pack(side="left")
+        ttk.Label(snap_ctrl, text="x").pack(side="left", padx=(4,2))
+        self.snap_count = tk.IntVar(value=1)
+        ttk.Spinbox(snap_ctrl, from_=1, to=300, width=4, textvariable=self.snap_count).pack(side="left")
+        ttk.Button(snap_ctrl, text="Day", command=lambda: self.take_snapshot("day")).pack(side="left", padx=4)
+        ttk.Button(snap_ctrl, text="Thermal", command=lambda: self.take_snapshot("thermal")).pack(side="left", padx=4)
+
         # Right-side: Refresh Ports button
         ttk.Button(self.controls, text="Refresh Ports", command=self._refresh_ports).pack(side="right", padx=8)
 
@@ -598,6 +544,9 @@ class TriplePayloadGUI:
         self.footer.pack(fill="x")
         self.status_var = tk.StringVar(value="Ready.")
         ttk.Label(self.footer, textvariable=self.status_var).pack(side="left")
+        ttk.Button(self.footer, text="Log", width=5, command=lambda: self.event_view.open()).pack(side="right", padx=(6, 0))
+        self.paint_var = tk.StringVar(value="")
+        ttk.Label(self.footer, textvariable=self.paint_var).pack(side="right")
 
     # ===================== New Fullscreen Logic =====================
     def _show_fullscreen(self, mode):
@@ -610,15 +559,7 @@ class TriplePayloadGUI:
         self.thermal_stop_stream()
         
         # Clean up any existing overlays
-        if self.thermal_overlay_label:
-            self.thermal_overlay_label.destroy()
-            self.thermal_overlay_label = None
-        if self.day_overlay_label:
-            self.day_overlay_label.destroy()
-            self.day_overlay_label = None
-        if self.lrf_fullscreen_overlay_label:
-            self.lrf_fullscreen_overlay_label.destroy()
-            self.lrf_fullscreen_overlay_label = None
+        self._destroy_pips()
 
         # Force the main window to be fullscreen
         self.root.attributes('-fullscreen', True)
@@ -697,15 +638,7 @@ class TriplePayloadGUI:
         self.thermal_stop_stream()
         self.lrf_stop()
 
-        if self.thermal_overlay_label:
-            self.thermal_overlay_label.destroy()
-            self.thermal_overlay_label = None
-        if self.day_overlay_label:
-            self.day_overlay_label.destroy()
-            self.day_overlay_label = None
-        if self.lrf_fullscreen_overlay_label:
-            self.lrf_fullscreen_overlay_label.destroy()
-            self.lrf_fullscreen_overlay_label = None
+        self._destroy_pips()
 
         # Hide the temporary fullscreen exit frame
         self.fullscreen_exit_frame.pack_forget()
@@ -738,36 +671,69 @@ class TriplePayloadGUI:
 
         self.root.update_idletasks()
         
+    def _destroy_pips(self):
+        if self.thermal_pip:
+            self.thermal_pip.destroy()
+            self.thermal_pip = None
+        if self.day_pip:
+            self.day_pip.destroy()
+            self.day_pip = None
+        self.thermal_view.set_range_offset(8)
+
     def thermal_start_overlay_stream(self):
-        self.thermal_cap = cv2.VideoCapture(0)
-        if self.thermal_cap.isOpened():
+        self.thermal_overlay_sub = self._thermal_subscribe("overlay", (320, 240))
+        if self.thermal_overlay_sub:
             self.thermal_overlay_stream = True
-            self.thermal_overlay_label = tk.Label(self.day_video_frame, bg="black", borderwidth=2, relief="solid")
-            self.thermal_overlay_label.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=20)
-            self._thermal_video_tick_overlay()
+            self.thermal_pip = VideoCanvas(self.day_video_frame, border=True, width=320, height=240)
+            self.thermal_pip.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=20)
         else:
-            self._set_status("Cannot open thermal camera for overlay.")
+            self._set_status("Cannot open thermal camera for overlay.", ERROR)
             self.thermal_overlay_stream = False
 
     def day_start_overlay_stream(self):
         # Starts the Day stream to be used as an overlay on top of thermal
-        self.day_streaming = True
-        self.day_start_stream()
-        
-        self.day_overlay_label = tk.Label(self.thermal_video_frame, bg="black", borderwidth=2, relief="solid")
-        self.day_overlay_label.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=20)
+        if not self.day_streaming:
+            self.day_start_stream()
         
-        # LRF overlay right below the day overlay
-        self.lrf_fullscreen_overlay_label = tk.Label(self.thermal_video_frame,
-                                    text="Range: --.- m",
-                                    font=("Segoe UI", 12, "bold"),
-                                    fg="cyan", bg="black")
-        self.lrf_fullscreen_overlay_label.place(relx=1.0, rely=0.25, anchor="ne", x=-20, y=20) # Adjusted position to be below the day stream
+        self.day_pip = VideoCanvas(self.thermal_video_frame, border=True, width=320, height=240)
+        self.day_pip.place(relx=1.0, rely=0.0, anchor="ne", x=-20, y=20)
+        self.day_pip.set_crosshair(self.crosshair_enabled)
+
+        # LRF range text moves right below the day overlay
+        self.thermal_view.set_range_offset(20 + 240 + 12)
 
     # ===================== Helpers =====================
-    def _set_status(self, msg):
-        self.status_var.set(msg)
-        self.root.update_idletasks()
+    def _set_status(self, msg, level=INFO):
+        # safe from any thread; shown by the event log view on its next drain
+        self.events.log(msg, level, "gui")
+
+    def _show_paint_stats(self, stats):
+        self._refresh_visibility()
+        self.governor.sample()
+        gov = self.governor.status()
+        self.paint_var.set(f"Display {stats['fps']:.0f} Hz | paint {stats['last_paint_ms']:.1f} ms "
+                           f"(avg {stats['avg_paint_ms']:.1f}, max {stats['max_paint_ms']:.1f}) | "
+                           f"load {gov['pressure']:.0%}, shed {gov['level']}/{len(self.governor.steps)}")
+        # refreshed with the paint stats (once a second), not per frame
+        if self.latency_hud:
+            self.day_view.set_stats(self.latency["day"].hud_text() if self.day_streaming else "")
+            self.thermal_view.set_stats(self.latency["thermal"].hud_text() if self.thermal_streaming else "")
+
+    def _governor_report(self, msg):
+        self.events.info(msg, "governor")
+
+    def toggle_governor(self):
+        self.governor.enabled = not self.governor.enabled
+        if not self.governor.enabled:
+            self.governor.reset()
+        self.governor_btn_text.set("Load governor: ON" if self.governor.enabled else "Load governor: OFF")
+
+    def toggle_latency_hud(self):
+        self.latency_hud = not self.latency_hud
+        self.latency_btn_text.set("Latency HUD: ON" if self.latency_hud else "Latency HUD: OFF")
+        if not self.latency_hud:
+            self.day_view.set_stats("")
+            self.thermal_view.set_stats("")
 
     def _list_ports(self):
         return [p.device for p in serial.tools.list_ports.comports()]
@@ -784,271 +750,242 @@ class TriplePayloadGUI:
 
     # ===================== LRF (Range) =====================
     def lrf_start(self):
-        if not self.lrf_ser or not getattr(self.lrf_ser, "is_open", False):
+        lrf = self.engine.lrf
+        if not lrf.is_open:
             try:
-                port = self.lrf_port_combo.get().strip()
-                baud = int(self.lrf_baud_combo.get())
-                self.lrf_ser = serial.Serial(port, baudrate=baud, timeout=1)
-                self._set_status(f"Range connected: {port} @ {baud}")
+                lrf.open(self.lrf_port_combo.get().strip(), int(self.lrf_baud_combo.get()))
             except Exception as e:
                 messagebox.showerror("Range Error", f"Failed to open Range: {e}")
                 return
         try:
-            self.lrf_ser.write(CONTINUOUS_MEASUREMENT)
-            self.lrf_running = True
-            if not self.lrf_read_thread or not self.lrf_read_thread.is_alive():
-                self.lrf_read_thread = threading.Thread(target=self._lrf_read_loop, daemon=True)
-                self.lrf_read_thread.start()
+            lrf.start()
             self._set_status("Range continuous started.")
         except Exception as e:
             messagebox.showerror("Range Error", f"Failed to start: {e}")
 
     def lrf_stop(self):
-        self.lrf_running = False
         try:
-            if self.lrf_ser and self.lrf_ser.is_open:
-                self.lrf_ser.write(STOP_MEASUREMENT)
-                self.lrf_ser.close()
+            self.engine.lrf.stop()
             self._set_status("Range stopped & disconnected.")
         except Exception as e:
-            self._set_status(f"Range stop error: {e}")
-
-    def _lrf_read_loop(self):
-        while self.lrf_running and self.lrf_ser and self.lrf_ser.is_open:
-            try:
-                if self.lrf_ser.in_waiting >= 8:
-                    data = self.lrf_ser.read(8)
-                    if len(data) == 8:
-                        if data[4] == 0x00:
-                            pass
-                        else:
-                            distance = (data[5] * 256 + data[6]) / 10.0
-                            self.lrf_last_distance = distance
-                            self.root.after(0, self._update_lrf_overlay)
-                else:
-                    time.sleep(0.05)
-            except Exception:
-                time.sleep(0.1)
+            self._set_status(f"Range stop error: {e}", ERROR)
 
     def _update_lrf_overlay(self):
-        if self.lrf_last_distance is None:
+        distance = self.engine.lrf.last_distance
+        if distance is None:
             txt = "Range: --.- m"
         else:
-            txt = f"Range: {self.lrf_last_distance:.1f} m"
-        try:
-            if self.fullscreen_mode == 'thermal_day':
-                # Update the new fullscreen overlay label
-                self.lrf_fullscreen_overlay_label.config(text=txt)
-            else:
-                # Update the regular thermal video label
-                self.lrf_overlay.config(text=txt)
-        except Exception:
-            pass
+            txt = f"Range: {distance:.1f} m"
+        # HUD item is only reconfigured when the text actually changes
+        self.thermal_view.set_range(txt)
+
+    def _update_zoom_hud(self):
+        zoom = self.day_zoom_level.get()
+        self.day_view.set_zoom(f"Zoom {zoom:.1f}x" if zoom > 1.0 else "")
+        tzoom = int(self.thermal_zoom_var.get())
+        self.thermal_view.set_zoom(f"Zoom {tzoom}x" if tzoom > 1 else "")
 
     # ===================== THERMAL (video + UART controls) =====================
     def thermal_connect_uart(self):
-        if self.thermal_connected and self.thermal_ser and self.thermal_ser.is_open:
+        uart = self.engine.thermal_uart
+        if uart.connected:
             self._set_status("Thermal UART already connected.")
             return
         try:
-            port = self.thermal_port_combo.get().strip()
-            baud = int(self.thermal_baud_combo.get())
-            self.thermal_ser = serial.Serial(port, baudrate=baud, timeout=1)
-            self.thermal_connected = True
-            self._set_status(f"Thermal UART connected: {port} @ {baud}")
+            uart.connect(self.thermal_port_combo.get().strip(), int(self.thermal_baud_combo.get()))
         except Exception as e:
             messagebox.showerror("Thermal UART Error", str(e))
 
     def thermal_disconnect_uart(self):
         try:
-            if self.thermal_ser and self.thermal_ser.is_open:
-                self.thermal_ser.close()
-            self.thermal_connected = False
+            self.engine.thermal_uart.disconnect()
             self._set_status("Thermal UART disconnected.")
         except Exception as e:
-            self._set_status(f"UART disconnect error: {e}")
+            self._set_status(f"UART disconnect error: {e}", ERROR)
 
-    def _thermal_serial_send(self, hex_str, expect_len, label=None):
-        if not (self.thermal_connected and self.thermal_ser and self.thermal_ser.is_open):
+    def _thermal_serial_send(self, command, expect_len, label=None, priority=PRIORITY_COMMAND):
+        if not self.engine.thermal_uart.connected:
             self._set_status("Connect thermal UART first.")
             return
-        def worker():
-            resp = send_to_ir_camera(self.thermal_ser, hex_str, response_len=expect_len)
-            if resp != 0:
-                msg = ' '.join(f'{x:02X}' for x in resp[::-1])
-            else:
+        def done(future):
+            try:
+                resp = future.result()
+            except Exception as e:
+                self.events.error(f"{label or 'Command'} failed: {e}", "thermal-uart")
+                return
+            if resp == 0:
                 msg = "(no/invalid response)"
-            self.root.after(0, lambda: self._set_status((label + " " if label else "") + msg))
-        threading.Thread(target=worker, daemon=True).start()
+            else:
+                msg = resp[::-1].hex(" ").upper()
+            self.events.info(f"{label + ' ' if label else ''}{msg} ({future.rtt_ms:.0f} ms)", "thermal-uart")
+        future = self.engine.thermal_uart.send(command, expect_len, priority=priority, label=label)
+        future.add_done_callback(done)
 
     def thermal_apply_palette(self):
         name = self.thermal_palette_combo.get()
-        key = {"white":"white","black":"black","rainbow":"rainbow","green":"green","metel":"metel"}[name]
-        data = THERMAL_FUNCTION_GROUPS["color"]["functions"][key]["data"]
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["color"]["response_len"], f"Palette {name}:")
         self.thermal_palette = name
+        # user palettes loaded from ./palettes only exist locally, the camera has no command for them
+        if name not in THERMAL_FUNCTION_GROUPS["color"]["functions"]:
+            self._set_status(f"Palette {name}: local")
+            return
+        self._apply_thermal_setting("palette", name)
+
+    def _apply_thermal_setting(self, name, value):
+        # fires on every slider motion: only the newest value per setting is
+        # sent, and the camera's answer arrives as an engine event
+        if not self.engine.thermal_uart.connected:
+            self._set_status("Connect thermal UART first.")
+            return
+        self.engine.thermal_uart.controls.set(name, value)
 
     def thermal_apply_brightness(self):
-        v = self.thermal_bright.get()
-        data = THERMAL_FUNCTION_GROUPS["brightness"]["build_data"](v)
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["brightness"]["response_len"], "Brightness:")
+        self._apply_thermal_setting("brightness", self.thermal_bright.get())
 
     def thermal_apply_contrast(self):
-        v = self.thermal_contrast.get()
-        data = THERMAL_FUNCTION_GROUPS["contrast"]["build_data"](v)
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["contrast"]["response_len"], f"Contrast {v}:")
+        self._apply_thermal_setting("contrast", self.thermal_contrast.get())
 
     def thermal_apply_denoise(self):
-        v = self.thermal_denoise.get()
-        data = THERMAL_FUNCTION_GROUPS["denoise"]["build_data"](v)
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["denoise"]["response_len"], f"Denoise {v}:")
+        self._apply_thermal_setting("denoise", self.thermal_denoise.get())
 
     def thermal_apply_vstripe(self):
-        v = self.thermal_vstripe.get()
-        data = THERMAL_FUNCTION_GROUPS["vstripe"]["build_data"](v)
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["vstripe"]["response_len"], f"VStripe {v}:")
+        self._apply_thermal_setting("vstripe", self.thermal_vstripe.get())
 
     def thermal_apply_zoom(self, event=None):
-        v = int(self.thermal_zoom_var.get())
-        data = THERMAL_FUNCTION_GROUPS["zoom"]["build_data"](v)
-        self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS["zoom"]["response_len"], f"Zoom {v}x:")
+        self._apply_thermal_setting("zoom", self.thermal_zoom_var.get())
 
     def thermal_send_group(self, group, function):
+        if group == "hotspot":
+            self._apply_thermal_setting("hotspot", function)
+            return
         data = THERMAL_FUNCTION_GROUPS[group]["functions"][function]["data"]
         self._thermal_serial_send(data, THERMAL_FUNCTION_GROUPS[group]["response_len"], f"{group} {function}:")
 
     def thermal_read_info(self):
+        uart = self.engine.thermal_uart
+        if not uart.connected:
+            self._set_status("Connect thermal UART first.")
+            return
+        def done(identity, source, errors):
+            # identity never changes for one chip: after the first read it comes from the cache
+            suffix = "" if source == "camera" else f" ({source})"
+            for item in THERMAL_INFO_REQUESTS:
+                if item["key"] in identity:
+                    self.events.info(f"{item['label']}{identity[item['key']]}{suffix}", "thermal-uart")
+                elif item["key"] in errors:
+                    self.events.error(f"{item['label']}{errors[item['key']]}", "thermal-uart")
         self._set_status("Reading thermal camera info…")
-        for item in THERMAL_INFO_REQUESTS:
-            self._thermal_serial_send(item["data"], item["response_len"], item["label"])
+        uart.identify(done)
 
     def thermal_send_custom(self):
         hex_str = self.thermal_custom_entry.get().strip()
         try:
-            _ = bytes.fromhex(hex_str)  # validate
+            command = bytes.fromhex(hex_str)
         except Exception as e:
             self._set_status(f"Invalid hex: {e}")
             return
-        self._thermal_serial_send(hex_str, 16, "Custom:")
+        # a hand-typed frame may change any setting behind the cache's back
+        self.engine.thermal_uart.state.forget_settings()
+        self._thermal_serial_send(command, 16, "Custom:")
 
     def thermal_start_stream(self):
         if self.thermal_streaming:
             self._set_status("Thermal stream already running.")
             return
-        # Choose appropriate device or pipeline
-        self.thermal_cap = cv2.VideoCapture(0)
-        if not self.thermal_cap.isOpened():
-            self._set_status("Cannot open thermal camera.")
+        self.thermal_main_sub = self._thermal_subscribe("main")
+        if not self.thermal_main_sub:
+            self._set_status("Cannot open thermal camera.", ERROR)
             return
         self.thermal_streaming = True
+        self.latency["thermal"].reset()
+        ring = self.replay["thermal"]
+        self.thermal_replay_sub = self._thermal_subscribe(
+            "replay", callback=lambda f: ring.push(f.image, f.timestamp))
+        self.thermal_snap_sub = self._thermal_subscribe(
+            "snapshot", callback=lambda f: self.snapshots.offer("thermal", f.image))
         self._set_status("Thermal stream started.")
-        self._thermal_video_tick()
+
+    def _thermal_subscribe(self, name, size=None, callback=None):
+        """Subscribe to the engine's shared thermal capture (opened for the first subscriber)"""
+        return self.engine.thermal_subscribe(name, size, callback)
+
+    def _thermal_unsubscribe(self, sub):
+        """Drop a subscriber; the device is released once nobody is subscribed"""
+        self.engine.thermal_unsubscribe(sub)
 
     def thermal_stop_stream(self):
+        # Stops every thermal view (main + overlay) and any recording, like releasing the capture did
+        self._thermal_stop_recording()
         self.thermal_streaming = False
+        self.thermal_overlay_stream = False
         try:
-            if self.thermal_cap:
-                self.thermal_cap.release()
-                self.thermal_cap = None
+            self._thermal_unsubscribe(self.thermal_main_sub)
+            self._thermal_unsubscribe(self.thermal_overlay_sub)
+            self._thermal_unsubscribe(self.thermal_replay_sub)
+            self._thermal_unsubscribe(self.thermal_snap_sub)
+        except Exception:
+            pass
+        self.thermal_main_sub = None
+        self.thermal_overlay_sub = None
+        self.thermal_replay_sub = None
+        self.thermal_snap_sub = None
+        try:
+            self.thermal_view.clear()
         except Exception:
             pass
-        if PIL_AVAILABLE:
-            try:
-                self.thermal_video_label.config(image="", text="", bg="black")
-            except Exception:
-                pass
         self._set_status("Thermal stream stopped.")
 
     def _thermal_video_tick(self):
-        if not (self.thermal_streaming and self.thermal_cap):
+        """Paint the newest thermal frame from the capture worker (display clock target)"""
+        sub = self.thermal_main_sub
+        if not (self.thermal_streaming and sub):
             return
-        ok, frame = self.thermal_cap.read()
-        if ok and PIL_AVAILABLE:
-            show = frame
-            try:
-                if self.thermal_palette == "white":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_BONE)
-                elif self.thermal_palette == "black":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_OCEAN)
-                elif self.thermal_palette == "rainbow":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_JET)
-                elif self.thermal_palette == "green":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_SUMMER)
-                elif self.thermal_palette == "metel":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_HOT)
-            except Exception:
-                pass
-
+        # auto-scale to widget size; the capture worker resizes for us
+        w = max(10, self.thermal_video_frame.winfo_width())
+        h = max(10, self.thermal_video_frame.winfo_height())
+        sub.size = (w, h)
+        sub.interpolation = cv2.INTER_NEAREST if self.fast_scaling else cv2.INTER_AREA
+        # Newest frame from the capture worker (never blocks the Tk thread)
+        item = sub.latest()
+        if item is not None and PIL_AVAILABLE:
+            # item.timestamp is taken when the device read returns
+            trace = FrameTrace(item.timestamp)
+            trace.mark("capture+mailbox")
             try:
-                # show is BGR here; overlay only if crosshair enabled
-                if self.crosshair_enabled:
-                    show = overlay_crosshair(show)
-
-                rgb = cv2.cvtColor(show, cv2.COLOR_BGR2RGB)
-                # auto-scale to widget size
-                w = max(10, self.thermal_video_frame.winfo_width())
-                h = max(10, self.thermal_video_frame.winfo_height())
-                resized = cv2.resize(rgb, (w, h), interpolation=cv2.INTER_AREA)
-                img = Image.fromarray(resized)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.thermal_video_label.imgtk = imgtk
-                self.thermal_video_label.config(image=imgtk)
+                # palette LUT + RGB; the crosshair is a HUD item on the canvas
+                img = render_thermal_frame(item.image, self.thermal_palette, (w, h), trace)
+                self.thermal_view.show(img)
+                trace.mark("paint")
+                self.latency["thermal"].record(trace)
             except Exception as e:
-                self._set_status(f"Thermal display error: {e}")
-        self.root.after(30, self._thermal_video_tick)
+                self._set_status(f"Thermal display error: {e}", ERROR)
     
     # New method to handle thermal overlay stream in Day+Thermal mode
     def _thermal_video_tick_overlay(self):
-        if not (self.thermal_overlay_stream and self.thermal_cap):
+        """Paint the newest thermal frame into the PiP overlay (display clock target)"""
+        sub = self.thermal_overlay_sub
+        if not (self.thermal_overlay_stream and sub):
             return
-        
-        ok, frame = self.thermal_cap.read()
-        if ok and PIL_AVAILABLE:
-            show = frame
-            try:
-                # Apply color map
-                if self.thermal_palette == "white":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_BONE)
-                elif self.thermal_palette == "black":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_OCEAN)
-                elif self.thermal_palette == "rainbow":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_JET)
-                elif self.thermal_palette == "green":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_SUMMER)
-                elif self.thermal_palette == "metel":
-                    show = cv2.applyColorMap(show, cv2.COLORMAP_HOT)
-            except Exception:
-                pass
+        sub.stride = self.pip_stride
+        sub.interpolation = cv2.INTER_NEAREST if self.fast_scaling else cv2.INTER_AREA
 
+        # Newest 320x240 frame from the shared capture (never blocks the Tk thread)
+        item = sub.latest()
+        if item is not None and PIL_AVAILABLE:
             try:
-                # Convert to RGB and resize for the smaller overlay window
-                rgb = cv2.cvtColor(show, cv2.COLOR_BGR2RGB)
-                # This size is arbitrary; adjust as needed
-                overlay_w, overlay_h = 320, 240
-                resized = cv2.resize(rgb, (overlay_w, overlay_h), interpolation=cv2.INTER_AREA)
-                img = Image.fromarray(resized)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.thermal_overlay_label.imgtk = imgtk
-                self.thermal_overlay_label.config(image=imgtk)
+                # Already sized for the smaller overlay window by the subscription
+                self.thermal_pip.show(render_thermal_frame(item.image, self.thermal_palette))
             except Exception as e:
-                self._set_status(f"Thermal overlay display error: {e}")
-        
-        self.root.after(30, self._thermal_video_tick_overlay)
+                self._set_status(f"Thermal overlay display error: {e}", ERROR)
 
     # ===================== DAY CAMERA (Updated with standalone logic) =====================
     def day_start_stream(self):
-        """Start B/W day pipeline using standalone camera logic"""
+        """Start the B/W day pipeline"""
         if self.day_streaming:
             self._set_status("Day camera already running.")
             return
 
-        # If colour pipeline is running, stop it first
+        # If colour pipeline is running, it is replaced (engine.day.start stops it first)
         if self.day_colour_running:
-            try:
-                if self.day_pipeline:
-                    self.day_pipeline.set_state(Gst.State.NULL)
-            except Exception:
-                pass
             self.day_colour_running = False
             try:
                 self.colour_btn_text.set("Start Colour Stream")
@@ -1056,16 +993,10 @@ class TriplePayloadGUI:
                 pass
 
         self._set_status("Starting B/W stream...")
-        pipeline = (
-            "aravissrc ! "
-            "video/x-raw,format=GRAY8,width=1280,height=720,framerate=30/1 ! "
-            "videoconvert ! "
-            "appsink name=sink"
-        )
-        threading.Thread(target=lambda: self._run_day_pipeline_loop(pipeline), daemon=True).start()
+        self._day_start("bw")
 
     def toggle_day_colour_stream(self):
-        """Toggle the colour (RGB) day pipeline on/off using standalone logic"""
+        """Toggle the colour (RGB) day pipeline on/off"""
         # If colour running -> stop it
         if self.day_colour_running:
             self.day_stop_stream()
@@ -1078,18 +1009,23 @@ class TriplePayloadGUI:
             self.day_stop_stream()
 
         self._set_status("Starting Color stream...")
-        pipeline = (
-            "aravissrc ! "
-            "video/x-raw,format=RGB,width=1280,height=720,framerate=30/1 ! "
-            "videoconvert ! "
-            "appsink name=sink"
-        )
         self.day_colour_running = True
         self.colour_btn_text.set("Stop Colour Stream")
-        threading.Thread(target=lambda: self._run_day_pipeline_loop(pipeline), daemon=True).start()
+        self._day_start("colour")
+
+    def _day_start(self, mode):
+        self.day_streaming = True
+        self.latency["day"].reset()
+
+        def worker():
+            try:
+                self.engine.day.start(mode)
+            except Exception as e:
+                self._set_status(f"Pipeline error: {e}", ERROR)
+        threading.Thread(target=worker, daemon=True).start()
 
     def day_stop_stream(self):
-        """Stop day camera stream without blocking the UI - using standalone logic"""
+        """Stop day camera stream without blocking the UI"""
         if not self.day_streaming and not self.day_colour_running:
             self._set_status("Stream not running.")
             return
@@ -1097,67 +1033,231 @@ class TriplePayloadGUI:
         # Step 1: Update flags and UI immediately
         self.day_streaming = False
         self.day_colour_running = False
-        self.day_imgtk = None  # Reset PhotoImage here!
         if PIL_AVAILABLE:
-            self.day_video_label.config(image="", text="Stopped", fg="white", bg="black")
+            self.day_view.clear("Stopped")
         self._set_status("Stopping stream...")
 
         # Step 2: Stop pipeline in a background thread
+        recorder, self.day_recorder = self.day_recorder, None
+        self.day_rec_btn_text.set("Record")
         def worker():
-            if self.day_pipeline:
-                try:
-                    self.day_pipeline.set_state(Gst.State.NULL)
-                except Exception:
-                    pass
-                self.day_pipeline = None
-                self.day_sink = None
-            self.root.after(0, lambda: self._set_status("Stream stopped."))
+            if recorder and recorder.recording:
+                # let the recording branch see EOS so the file is finalised
+                recorder.stop()
+                recorder.wait(2.0)
+            summary = self.engine.day.stop()
+            self.engine.day.set_roi_enabled(True)
+            msg = "Stream stopped." + (f" Day pump: {summary}" if summary else "")
+            self._set_status(msg)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    # ===================== RECORDING =====================
+    def _report_recording(self, recorder, label, after=None, source="gui"):
+        """Wait for the file to be finalised off the Tk thread, then report the counters"""
+        def worker():
+            recorder.wait(3.0)
+            if after:
+                after()
+            self.events.info(f"{label} recording saved: {recorder.summary()}", source)
+        threading.Thread(target=worker, daemon=True).start()
 
+    def _sync_day_rec_button(self):
+        recording = self.day_recorder is not None and self.day_recorder.recording
+        self.day_rec_btn_text.set("Stop Rec" if recording else "Record")
+
+    def day_toggle_recording(self):
+        # start and stop both rebuild or drain the pipeline, so they run on a
+        # worker; the button follows the "day-recorder" events it logs
+        if self.day_rec_busy:
+            self._set_status("Day recording is still starting or stopping.")
+            return
+        if self.day_recorder and self.day_recorder.recording:
+            recorder, self.day_recorder = self.day_recorder, None
+            recorder.stop()
+            self.day_rec_busy = True
+            self.day_rec_btn_text.set("Stopping…")
+
+            def finalised():
+                # the sensor ROI may only come back once EOS has finalised the file:
+                # an ROI rebuild sets the pipeline to NULL under the recording branch
+                self.engine.day.set_roi_enabled(True)
+                self.day_rec_busy = False
+            self._report_recording(recorder, "Day", after=finalised, source="day-recorder")
+            return
+        if self.day_streaming and self.engine.processes:
+            self._set_status("Day recording is not available with capture processes.")
+            return
+        if not (self.day_streaming and self.engine.day.pipeline):
+            self._set_status("Start the day stream before recording.")
+            return
+        self.day_rec_busy = True
+        self.day_rec_btn_text.set("Starting…")
+
+        def worker():
+            try:
+                # the recording is full frame at a fixed size: leave the sensor ROI first
+                self.engine.day.set_roi_enabled(False, wait=True)
+                pipeline = self.engine.day.pipeline
+                if pipeline is None or not self.day_streaming:
+                    raise RuntimeError("day stream stopped")
+                path = recording_path(RECORDINGS_DIR, "day", pick_encoder()[2])
+                recorder = TeeRecorder(pipeline)
+                recorder.start(path)
+                self.day_recorder = recorder
+                self.events.info(f"Day recording to {path}", "day-recorder")
+            except Exception as e:
+                self.engine.day.set_roi_enabled(True)
+                self.events.error(f"Day recording error: {e}", "day-recorder")
+            finally:
+                self.day_rec_busy = False
         threading.Thread(target=worker, daemon=True).start()
 
-    # Placeholder for day control application
+    def thermal_toggle_recording(self):
+        if self.thermal_recorder and self.thermal_recorder.recording:
+            self._thermal_stop_recording()
+            return
+        recorder = AppSrcRecorder(report=lambda msg: self.events.warning(msg, "thermal-recorder"))
+        path = recording_path(RECORDINGS_DIR, "thermal", pick_encoder()[2])
+        recorder.start(path, fps=self.engine.thermal_fps)
+        # every frame goes straight from the capture thread into the appsrc
+        sub = self._thermal_subscribe("recorder", callback=lambda f: recorder.push(f.image, f.timestamp))
+        if not sub:
+            recorder.stop()
+            self._set_status("Cannot open thermal camera for recording.", ERROR)
+            return
+        self.thermal_recorder = recorder
+        self.thermal_rec_sub = sub
+        self.thermal_rec_btn_text.set("Stop Rec")
+        self._set_status(f"Thermal recording to {path}")
+
+    def _thermal_stop_recording(self):
+        recorder, self.thermal_recorder = self.thermal_recorder, None
+        sub, self.thermal_rec_sub = self.thermal_rec_sub, None
+        if recorder is None:
+            return
+        self._thermal_unsubscribe(sub)
+        recorder.stop()
+        self._report_recording(recorder, "Thermal")
+        self.thermal_rec_btn_text.set("Record")
+
+    # ===================== SNAPSHOTS =====================
+    def take_snapshot(self, key):
+        """Arm a snapshot/burst; the producer thread hands over the next source frame(s)"""
+        streaming = self.day_streaming if key == "day" else self.thermal_streaming
+        if not streaming:
+            self._set_status(f"Start the {key} stream before taking a snapshot.")
+            return
+        try:
+            count = max(1, int(self.snap_count.get()))
+        except (tk.TclError, ValueError):
+            count = 1
+        transform = None
+        if key == "thermal":
+            # native-resolution intensity frame, coloured with the palette on the worker
+            palette = self.thermal_palette
+            transform = lambda img: palette_engine.apply(img, palette)
+        self.snapshots.arm(key, count, fmt=self.snap_format_combo.get(), transform=transform)
+        self._set_status(f"Snapshot {key}: capturing {count} frame(s)...")
+
+    # ===================== INSTANT REPLAY =====================
+    def toggle_replay(self):
+        if self.replay_mode:
+            self.replay_mode = False
+            self.replay_frames = None
+            self.replay_scale.state(["disabled"])
+            self.replay_btn_text.set("Pause")
+            self._set_status("Replay closed, back to live.")
+            return
+        frames = {key: ring.snapshot() for key, ring in self.replay.items()}
+        stamps = [f[0].timestamp for f in frames.values() if f] + [f[-1].timestamp for f in frames.values() if f]
+        if not stamps:
+            self._set_status("Nothing to replay yet.")
+            return
+        self.replay_frames = frames
+        self.replay_end = max(stamps)
+        span = self.replay_end - min(stamps)
+        self.replay_mode = True
+        self.replay_scale.configure(from_=-max(span, 0.1), to=0.0)
+        self.replay_scale.state(["!disabled"])
+        self.replay_pos.set(0.0)
+        self.replay_btn_text.set("Live")
+        self._replay_seek()
+
+    def _replay_seek(self, _=None):
+        """Show the stored frames closest to the slider position (Tk thread)"""
+        if not (self.replay_mode and self.replay_frames and PIL_AVAILABLE):
+            return
+        offset = self.replay_pos.get()
+        t = self.replay_end + offset
+        for key, view in (("day", self.day_view), ("thermal", self.thermal_view)):
+            item = replay_nearest(self.replay_frames[key], t)
+            if item is None or view is None:
+                continue
+            try:
+                img = replay_decode(item)
+                if key == "thermal":
+                    img = palette_engine.apply(img, self.thermal_palette, rgb=True)
+                if img.ndim == 2:
+                    img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+                size = (max(10, view.winfo_width()), max(10, view.winfo_height()))
+                view.show(Image.fromarray(cv2.resize(img, size, interpolation=cv2.INTER_LINEAR)))
+            except Exception as e:
+                self._set_status(f"Replay display error: {e}", ERROR)
+                return
+        self._set_status(f"Replay {offset:.1f} s")
+
+    def replay_save(self):
+        """Dump both rings to disk on background threads"""
+        base = os.path.join(RECORDINGS_DIR, time.strftime("replay_%Y%m%d_%H%M%S"))
+
+        def done(count, result, key):
+            msg = (f"Replay {key}: saved {count} frames to {result}" if count is not None
+                   else f"Replay {key} save error: {result}")
+            self._set_status(msg)
+
+        for key, ring in self.replay.items():
+            if len(ring):
+                ring.dump(os.path.join(base, key), done=lambda c, r, k=key: done(c, r, k))
+        self._set_status(f"Saving replay to {base} ...")
+
     def _apply_day_setting(self, name, value):
-        self._set_status(f"Day setting {name}: {value:.2f}")
+        # fires on every slider motion: only the newest value is written, and the
+        # read-back arrives as an engine event once the camera has applied it
+        self.engine.day.controls.set(name, value)
 
     # ===================== CROSSHAIR TOGGLE =====================
     def toggle_crosshair(self):
         self.crosshair_enabled = not self.crosshair_enabled
         self.crosshair_btn_text.set("Crosshair: ON" if self.crosshair_enabled else "Crosshair: OFF")
+        # vector HUD item, nothing is drawn into the frames
+        for view in (self.day_view, self.thermal_view, self.day_pip):
+            if view is not None:
+                view.set_crosshair(self.crosshair_enabled)
         self._set_status("Crosshair " + ("enabled" if self.crosshair_enabled else "disabled"))
 
     # ===================== CLEANUP =====================
     def on_close(self):
-        # Stop LRF/Range
-        try:
-            if self.lrf_running and self.lrf_ser and self.lrf_ser.is_open:
-                self.lrf_ser.write(STOP_MEASUREMENT)
-                self.lrf_ser.flush()
-            if self.lrf_ser and self.lrf_ser.is_open:
-                self.lrf_ser.close()
-        except Exception as e:
-            print(f"LRF close error: {e}")
-        self.lrf_running = False
+        self.display_clock.stop()
+        self.event_view.stop()
+        self.snapshots.shutdown(wait=False)
 
-        # Thermal
+        # Thermal views and recording
         try:
             self.thermal_stop_stream()
             self.thermal_overlay_stream = False
-            if self.thermal_cap:
-                self.thermal_cap.release()
-                self.thermal_cap = None
-            if self.thermal_ser and self.thermal_ser.is_open:
-                self.thermal_ser.close()
         except Exception as e:
             print(f"Thermal close error: {e}")
 
-        # Day - using standalone logic
-        try:
-            self.day_stop_stream()
-            # If not handled inside stop_stream
-            if self.day_pipeline:
-                self.day_pipeline.set_state(Gst.State.NULL)
-        except Exception as e:
-            print(f"Day pipeline close error: {e}")
+        # Day recording is finalised before the pipeline goes down
+        if self.day_recorder and self.day_recorder.recording:
+            self.day_recorder.stop()
+            self.day_recorder.wait(2.0)
+        self.day_streaming = False
+        self.day_colour_running = False
+
+        # LRF, thermal capture + UART, day pipeline
+        self.engine.shutdown()
 
         # Destroy GUI
         try:
@@ -1174,5 +1274,5 @@ if __name__ == "__main__":
         root.call("tk", "scaling", 1.2)
     except Exception:
         pass
-    app = TriplePayloadGUI(root)
+    app = TriplePayloadGUI(root, processes="--processes" in sys.argv)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,983 @@
+# ===== Headless payload engine: day pipeline, thermal capture, LRF, thermal UART =====
+# No Tk in here. The GUI (main_gui.py) is one consumer; the engine can also run on
+# its own on a headless node:
+#
+#   python payload_engine.py --day bw --thermal --lrf /dev/serial0 --seconds 30
+#
+# With processes=True (--processes) each camera is read in its own process that
+# writes into a shared-memory ring; see capture_process.py.
+
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+import argparse
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import serial
+from PIL import Image
+
+from capture_process import MAX_DISPLAY_TARGETS, STAT_ERRORS, fit_display, start_day_process
+from day_controls import DayControls
+from frame_buffers import FramePool, sample_frame
+from frame_mailbox import FrameMailbox
+from frame_processing import CENTRE, render_day_frame, zoom_box
+from frame_pump import FramePump
+from latency import FrameTrace
+from thermal_capture import ThermalCapture
+from thermal_commands import CONTINUOUS_MEASUREMENT, STOP_MEASUREMENT, THERMAL_INFO_REQUESTS, send_to_ir_camera
+from thermal_controls import THERMAL_CONTROL_INTERVAL_S, ThermalControls
+from thermal_state import IDENTITY_KEYS, ThermalState
+from uart_worker import PRIORITY_COMMAND, PRIORITY_QUERY, UartWorker
+
+Gst.init(None)
+
+# Day camera pipelines; rec_tee is where the recording branch is attached on demand
+DAY_PIPELINES = {
+    "bw": (
+        "aravissrc name=src ! "
+        "video/x-raw,format=GRAY8,width=1280,height=720,framerate=30/1 ! "
+        "tee name=rec_tee ! "
+        "queue leaky=downstream max-size-buffers=2 ! "
+        "videoconvert ! "
+        "appsink name=sink"
+    ),
+    "colour": (
+        "aravissrc name=src ! "
+        "video/x-raw,format=RGB,width=1280,height=720,framerate=30/1 ! "
+        "tee name=rec_tee ! "
+        "queue leaky=downstream max-size-buffers=2 ! "
+        "videoconvert ! "
+        "appsink name=sink"
+    ),
+}
+
+# Sensor format per mode and full readout size, for the in-pipeline scaling layout below
+DAY_SOURCE_FORMATS = {"bw": "GRAY8", "colour": "RGB"}
+DAY_SOURCE_SIZE = (1280, 720)
+
+# Sensor-side region of interest: from the first tier up the camera only reads
+# out a window of sensor/tier (plus a margin) around the zoom area, so GigE
+# bandwidth and per-frame work shrink with zoom. Offsets and sizes are kept on
+# ROI_ALIGN pixels, which every camera we use accepts.
+ROI_TIERS = (2.0, 4.0)
+ROI_ALIGN = 16
+ROI_SETTLE_S = 0.4   # zoom must rest this long before the pipeline is rebuilt
+
+
+def day_source_caps(mode, roi=None):
+    w, h = roi[2:] if roi else DAY_SOURCE_SIZE
+    return f"video/x-raw,format={DAY_SOURCE_FORMATS[mode]},width={w},height={h},framerate=30/1"
+
+
+def sensor_roi(zoom, pan=CENTRE):
+    """Readout window (x, y, w, h) that contains the zoom window, or None for full frame."""
+    tier = max((t for t in ROI_TIERS if zoom >= t), default=None)
+    if tier is None:
+        return None
+    src_w, src_h = DAY_SOURCE_SIZE
+
+    def align_up(v, limit):
+        return min(limit, -(-int(v) // ROI_ALIGN) * ROI_ALIGN)
+
+    roi_w = align_up(src_w / tier + 2 * ROI_ALIGN, src_w)
+    roi_h = align_up(src_h / tier + 2 * ROI_ALIGN, src_h)
+    x, y, w, h = zoom_box(src_w, src_h, zoom, pan)
+    roi_x = min(max(0, int(x + w / 2 - roi_w / 2)), src_w - roi_w) // ROI_ALIGN * ROI_ALIGN
+    roi_y = min(max(0, int(y + h / 2 - roi_h / 2)), src_h - roi_h) // ROI_ALIGN * ROI_ALIGN
+    return roi_x, roi_y, roi_w, roi_h
+
+# Display branches of the scaled layout, in subscription order: the first
+# display subscriber gets "main", the second the low-resolution "pip" branch
+DAY_BRANCHES = ("main", "pip")
+
+
+def scaled_day_pipeline(mode, branches, raw=True, roi=None):
+    """
+    Day pipeline that crops, scales and rate-limits inside GStreamer, so each
+    display appsink receives RGB frames at its target's size and rate:
+
+      aravissrc name=src ! caps ! tee name=rec_tee
+        rec_tee. ! queue ! valve ! videocrop ! videoscale name=<branch>_scale ! videorate ! videoconvert
+                 ! capsfilter name=<branch>_caps ! appsink name=<branch>_sink   (per branch)
+        rec_tee. ! queue ! appsink name=raw_sink                               (raw taps)
+
+    The valves start closed and the caps open; _DisplayBranch sets both (and
+    the videoscale method) once its subscriber has a size. roi (x, y, w, h) makes the camera read out only
+    that sensor window.
+    """
+    offsets = f" offset-x={roi[0]} offset-y={roi[1]}" if roi else ""
+    parts = [f"aravissrc name=src{offsets} ! {day_source_caps(mode, roi)} ! "
+             "tee name=rec_tee allow-not-linked=true"]
+    for name in branches:
+        parts.append(
+            f"rec_tee. ! queue leaky=downstream max-size-buffers=2 ! "
+            f"valve name={name}_valve drop=true ! "
+            f"videocrop name={name}_crop ! "
+            f"videoscale name={name}_scale add-borders=false ! "
+            f"videorate drop-only=true ! "
+            f"videoconvert ! "
+            f"capsfilter name={name}_caps caps=video/x-raw,format=RGB,pixel-aspect-ratio=1/1 ! "
+            f"appsink name={name}_sink"
+        )
+    if raw:
+        parts.append("rec_tee. ! queue leaky=downstream max-size-buffers=2 ! appsink name=raw_sink")
+    return " ".join(parts)
+
+
+def _configure_sink(sink):
+    sink.set_property("emit-signals", False)
+    sink.set_property("max-buffers", 1)
+    sink.set_property("drop", True)
+
+
+# image: a PIL image at the subscriber's size for display subscribers, or the
+# source array (GRAY8 / RGB, valid only during the callback) for raw taps
+DayFrame = namedtuple("DayFrame", ["seq", "timestamp", "image", "trace"])
+
+
+# ===================== DAY CAPTURE =====================
+def _branch_setting(attr):
+    # subscription attribute whose changes are pushed to its pipeline branch
+    def get(self):
+        return getattr(self, attr)
+
+    def set(self, value):
+        if getattr(self, attr) != value:
+            setattr(self, attr, value)
+            self.source._reconfigure(self)
+    return property(get, set)
+
+
+class DaySubscription:
+    """
+    One consumer of the day stream. Display subscribers set size (w, h), zoom
+    and pan (see zoom_box) and read rendered frames with latest(); size None
+    pauses rendering for it.
+    stride n renders only every n-th frame and interpolation is the resize
+    flag; both are lowered by the load governor under pressure. fps is the
+    rate the target is painted at (None = source rate); the scaled pipeline
+    drops frames above it before they reach Python.
+    Raw taps (replay, snapshots) pass callback instead and get every source
+    frame on the pump thread; they must copy anything they keep.
+    """
+
+    def __init__(self, source, name, size=None, zoom=1.0, callback=None):
+        self.source = source
+        self.name = name
+        self._size = size
+        self._zoom = zoom
+        self._pan = CENTRE
+        self._fps = None
+        self._stride = 1
+        self.callback = callback
+        self._interpolation = cv2.INTER_LINEAR
+        self.mailbox = FrameMailbox(name)
+
+    size = _branch_setting("_size")
+    zoom = _branch_setting("_zoom")
+    pan = _branch_setting("_pan")
+    fps = _branch_setting("_fps")
+    stride = _branch_setting("_stride")
+    interpolation = _branch_setting("_interpolation")
+
+    def latest(self):
+        return self.mailbox.take()
+
+    def close(self):
+        self.source.unsubscribe(self)
+
+
+class DayCapture:
+    """
+    Owns the aravissrc pipeline and its FramePump. Each sample is mapped once,
+    offered to the raw taps and rendered once per display subscriber, all on
+    the pump thread.
+
+    With scaled=True (the default) cropping, scaling and rate limiting happen
+    in the pipeline instead (scaled_day_pipeline): the first two display
+    subscribers each get their own appsink branch delivering RGB frames at
+    their size, zoom and fps, so the pump only wraps them for Tk, and the raw
+    taps read a separate full-resolution branch. Display subscribers added
+    after start() are only picked up on the next start().
+
+    In the scaled layout, once every display target is zoomed to at least
+    ROI_TIERS[0] (and they share one pan) the camera is switched to a sensor
+    ROI around the zoom window. Panning within a tier moves the ROI offsets on
+    the running camera; changing tier rebuilds the pipeline once the zoom has
+    settled. Raw taps and the recording tee then see the ROI as well, so
+    set_roi_enabled(False) is used around recordings.
+
+    With process=True the pipeline runs in a capture process instead, which
+    also renders the first MAX_DISPLAY_TARGETS display subscribers into
+    shared-memory rings; a reader thread here only hands ring views to the
+    taps and wraps display frames for the GUI. There is no in-process
+    pipeline (and so no tee recording) in that mode.
+    """
+
+    def __init__(self, name="day", zero_copy=True, emit=None, process=False, scaled=True):
+        self.name = name
+        self.zero_copy = zero_copy  # map appsink buffers instead of extract_dup
+        self.process = process
+        self.scaled = scaled
+        self.emit = emit or (lambda msg: None)
+        self.pipeline = None
+        self.sink = None
+        self.pump = None
+        self.pumps = []      # every pump of the running pipeline (one per appsink)
+        self._branches = []  # _DisplayBranch per display appsink (scaled layout)
+        self.roi = None      # sensor readout window of the running pipeline, None = full frame
+        self.roi_enabled = True
+        self._roi_pending = None
+        self._roi_timer = None
+        self._reapply = False
+        self._lifecycle = threading.RLock()  # start / stop vs. ROI rebuilds
+        # exposure / gain / white balance on the live aravissrc, coalesced
+        self.controls = DayControls(self, report=self._control_report)
+        self.proc = None
+        self._reader = None
+        self.mode = None
+        self.pool = FramePool()
+        self.seq = 0
+        self._subs = {}
+        self._subs_lock = threading.Lock()
+
+    @property
+    def running(self):
+        if self.proc is not None:
+            return self.proc.alive
+        return any(pump.running for pump in self.pumps)
+
+    @property
+    def process_cpu(self):
+        """CPU seconds spent in the pump handlers so far, or None when stopped."""
+        return sum(pump.process_cpu for pump in self.pumps) if self.pumps else None
+
+    def start(self, mode="bw"):
+        """Build and play the pipeline for mode ("bw" / "colour"); raises on failure."""
+        with self._lifecycle:
+            self.stop()
+            if self.process:
+                self._start_process(mode)
+                return
+            if self.scaled:
+                displays = [sub for sub in self.subscriptions() if sub.callback is None]
+                self._start_scaled(mode, self._wanted_roi(displays[:len(DAY_BRANCHES)]))
+                return
+            self._start_python(mode)
+
+    def _start_python(self, mode):
+        self.pipeline = Gst.parse_launch(DAY_PIPELINES[mode])
+        self.sink = self.pipeline.get_by_name("sink")
+        self.sink.set_property("emit-signals", False)
+        self.sink.set_property("max-buffers", 1)
+        self.sink.set_property("drop", True)
+        self.mode = mode
+        for sub in self.subscriptions():
+            sub.mailbox.clear()
+            sub.mailbox.reset_stats()
+        self.pipeline.set_state(Gst.State.PLAYING)
+        self.controls.reapply()
+        # Frames are delivered by a pump that blocks inside try-pull-sample until a
+        # sample is ready (no busy polling / fixed sleep)
+        self.pump = FramePump(self.pipeline, self.sink, self._process,
+                              active=lambda: self.pipeline is not None, name=f"{self.name}-pump")
+        self.pumps = [self.pump]
+        self.pump.start()
+
+    def _start_scaled(self, mode, roi=None):
+        subs = self.subscriptions()
+        displays = [sub for sub in subs if sub.callback is None][:len(DAY_BRANCHES)]
+        taps = any(sub.callback is not None for sub in subs)
+        names = DAY_BRANCHES[:len(displays)]
+        self.pipeline = Gst.parse_launch(scaled_day_pipeline(mode, names, raw=taps, roi=roi))
+        self.mode = mode
+        self.roi = roi
+        for sub in subs:
+            sub.mailbox.clear()
+            sub.mailbox.reset_stats()
+        self._branches = [_DisplayBranch(self, name, sub) for name, sub in zip(names, displays)]
+        for branch in self._branches:
+            branch.apply()
+        self.pipeline.set_state(Gst.State.PLAYING)
+        self.controls.reapply()
+        active = lambda: self.pipeline is not None
+        for branch in self._branches:
+            branch.pump = FramePump(self.pipeline, branch.sink, branch.process, active=active,
+                                    name=f"{self.name}-{branch.name}-pump")
+            self.pumps.append(branch.pump)
+        if taps:
+            raw_sink = self.pipeline.get_by_name("raw_sink")
+            _configure_sink(raw_sink)
+            # the raw pump is self.pump, so _process_raw gets its capture_ts
+            self.pumps.insert(0, FramePump(self.pipeline, raw_sink, self._process_raw, active=active,
+                                           name=f"{self.name}-raw-pump"))
+        self.pump = self.pumps[0] if self.pumps else None
+        self.sink = self.pump.sink if self.pump else None
+        for pump in self.pumps:
+            pump.start()
+
+    def stop(self):
+        """Stop the pumps and the pipeline (blocking); returns the pump summary or None."""
+        with self._lifecycle:
+            self._cancel_roi_rebuild()
+            if self.proc is not None:
+                return self._stop_process()
+            return self._stop_pipeline()
+
+    def _stop_pipeline(self):
+        pumps, self.pumps, self.pump = self.pumps, [], None
+        self._branches = []
+        summary = None
+        if pumps:
+            for pump in pumps:
+                pump.stop()
+            coalesced = sum(sub.mailbox.coalesced for sub in self.subscriptions())
+            summary = "; ".join(f"{pump.name}: {pump.summary()}" for pump in pumps) if len(pumps) > 1 \
+                else pumps[0].summary()
+            summary = f"{summary}, {coalesced} frames coalesced"
+        if self.pipeline:
+            try:
+                self.pipeline.set_state(Gst.State.NULL)
+            except Exception:
+                pass
+        self.pipeline = None
+        self.sink = None
+        self.mode = None
+        self.roi = None
+        self.pool.clear()
+        return summary
+
+    # ---------------- Fan-out ----------------
+    def subscribe(self, name, size=None, zoom=1.0, callback=None):
+        sub = DaySubscription(self, name, size, zoom, callback)
+        with self._subs_lock:
+            self._subs[name] = sub
+        return sub
+
+    def unsubscribe(self, sub):
+        name = sub if isinstance(sub, str) else sub.name
+        with self._subs_lock:
+            if isinstance(sub, str) or self._subs.get(name) is sub:
+                self._subs.pop(name, None)
+
+    def subscriptions(self):
+        with self._subs_lock:
+            return list(self._subs.values())
+
+    def _reconfigure(self, sub):
+        """A subscription's size / zoom / pan / rate / interpolation changed; update its branch, if it has one."""
+        # never block the caller (Tk) behind a ROI rebuild; it re-applies afterwards
+        if not self._lifecycle.acquire(blocking=False):
+            self._reapply = True
+            return
+        try:
+            for branch in self._branches:
+                if branch.sub is sub:
+                    branch.apply()
+                    self._update_roi()
+        finally:
+            self._lifecycle.release()
+
+    def _control_report(self, name, requested, applied, latency_ms, error):
+        label = {"exposure": "Exposure", "gain": "Gain", "wb": "White balance"}[name]
+        if error is not None:
+            self.emit(f"Day {label} {requested:.5g} not applied: {error}")
+        elif name == "wb":
+            self.emit(f"Day {label} {requested:.0f} K -> R/B {applied[0]:.2f}/{applied[1]:.2f} ({latency_ms:.0f} ms)")
+        else:
+            unit = " ms" if name == "exposure" else " dB"
+            self.emit(f"Day {label} {requested:.2f} -> {applied:.2f}{unit} ({latency_ms:.0f} ms)")
+
+    # ---------------- Sensor ROI ----------------
+    def _wanted_roi(self, displays):
+        active = [sub for sub in displays if sub.size is not None]
+        if not (self.roi_enabled and active) or len({tuple(sub.pan) for sub in active}) > 1:
+            return None
+        return sensor_roi(min(sub.zoom for sub in active), active[0].pan)
+
+    def _update_roi(self):
+        if self.pipeline is None:
+            return
+        wanted = self._wanted_roi([branch.sub for branch in self._branches])
+        if wanted == self.roi:
+            self._cancel_roi_rebuild()
+            return
+        if wanted and self.roi and wanted[2:] == self.roi[2:] and self._move_roi(wanted):
+            return
+        self._roi_pending = wanted
+        self._cancel_roi_rebuild()
+        self._roi_timer = threading.Timer(ROI_SETTLE_S, self._rebuild_for_roi)
+        self._roi_timer.daemon = True
+        self._roi_timer.start()
+
+    def _move_roi(self, roi):
+        """Same-size ROI at new offsets: set OffsetX/OffsetY on the streaming camera."""
+        try:
+            camera = self.pipeline.get_by_name("src").get_property("camera")
+            camera.set_integer("OffsetX", roi[0])
+            camera.set_integer("OffsetY", roi[1])
+        except Exception:
+            return False  # offsets locked while streaming: rebuild instead
+        self.roi = roi
+        for branch in self._branches:
+            branch.apply()
+        return True
+
+    def _cancel_roi_rebuild(self):
+        timer, self._roi_timer = self._roi_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _rebuild_for_roi(self):
+        with self._lifecycle:
+            self._roi_timer = None
+            mode, roi = self.mode, self._roi_pending
+            if self.pipeline is None or self.proc is not None or roi == self.roi:
+                return
+            self._stop_pipeline()
+            try:
+                self._start_scaled(mode, roi)
+            except Exception as e:
+                self.emit(f"Day ROI change failed: {e}")
+                self._stop_pipeline()
+                self._start_scaled(mode, None)
+                return
+        self.emit(f"Day sensor ROI {roi[2]}x{roi[3]} at ({roi[0]}, {roi[1]})" if roi
+                  else "Day sensor ROI off (full frame)")
+        if self._reapply:
+            self._reapply = False
+            for branch in list(self._branches):
+                self._reconfigure(branch.sub)
+
+    def set_roi_enabled(self, enabled, wait=False):
+        """Allow or forbid the sensor ROI; with wait the full-frame rebuild happens before returning."""
+        self.roi_enabled = enabled
+        with self._lifecycle:
+            if self.pipeline is None:
+                return
+            if not enabled and self.roi is not None and wait:
+                self._cancel_roi_rebuild()
+                self._roi_pending = None
+                self._rebuild_for_roi()
+            else:
+                self._update_roi()
+
+    def _process_raw(self, sample):
+        """Raw taps of the scaled layout (full-resolution branch, pump thread)."""
+        pump = self.pump
+        t0 = pump.capture_ts if pump else time.monotonic()
+        self.seq += 1
+        taps = [sub for sub in self.subscriptions() if sub.callback is not None]
+        with sample_frame(sample, mapped=self.zero_copy) as arr:
+            for sub in taps:
+                try:
+                    sub.callback(DayFrame(self.seq, t0, arr, None))
+                except Exception:
+                    pass
+
+    def _process(self, sample):
+        """Runs on the pump thread for every sample."""
+        pump = self.pump
+        trace = FrameTrace(pump.capture_ts if pump else None)
+        trace.mark("pipeline")  # sensor PTS -> pulled from the appsink
+        self.seq += 1
+        subs = self.subscriptions()
+        # Everything that reads the mapped buffer stays inside this block
+        with sample_frame(sample, mapped=self.zero_copy) as arr:
+            for sub in subs:
+                if sub.callback is not None:
+                    try:
+                        sub.callback(DayFrame(self.seq, trace.t0, arr, None))
+                    except Exception:
+                        pass
+            trace.mark("taps")
+            for sub in subs:
+                size = sub.size
+                if sub.callback is not None or size is None or self.seq % sub.stride:
+                    continue
+                sub_trace = trace.fork()
+                img = render_day_frame(arr, sub.zoom, size, self.pool, sub_trace,
+                                       interpolation=sub.interpolation, pan=sub.pan)
+                # an undrained older frame is simply replaced
+                sub.mailbox.post(DayFrame(self.seq, trace.t0, img, sub_trace))
+
+    # ---------------- Capture process mode ----------------
+    def _start_process(self, mode):
+        self.mode = mode
+        for sub in self.subscriptions():
+            sub.mailbox.clear()
+        self.proc = start_day_process(DAY_PIPELINES[mode])
+        if not self.proc.wait_started():
+            self._stop_process()
+            raise RuntimeError("day capture process failed to start")
+        self._reader = threading.Thread(target=self._read_process, args=(self.proc,),
+                                        name=f"{self.name}-ring-reader", daemon=True)
+        self._reader.start()
+
+    def _stop_process(self):
+        proc, self.proc = self.proc, None
+        if self._reader:
+            self._reader.join(1.0)
+            self._reader = None
+        proc.stop()
+        self.mode = None
+        return proc.summary()
+
+    def _read_process(self, proc):
+        """Reader thread: ring views to the taps, display frames to the mailboxes."""
+        source = proc.rings["source"]
+        last = {}
+        while self.proc is proc:
+            subs = self.subscriptions()
+            displays = [s for s in subs if s.callback is None][:MAX_DISPLAY_TARGETS]
+            for i in range(MAX_DISPLAY_TARGETS):
+                sub = displays[i] if i < len(displays) else None
+                if sub:
+                    proc.set_target(i, sub.size, sub.zoom, sub.pan, sub.stride, sub.interpolation)
+                else:
+                    proc.set_target(i, None)
+            for text in proc.poll_messages():
+                self.emit(f"Day capture process error ({int(proc.stats[STAT_ERRORS])} so far): {text}")
+            if not proc.wait_frame(0.1):
+                continue
+            frame = source.latest(last.get("source", 0))
+            if frame is not None:
+                last["source"] = frame.seq
+                self.seq = frame.seq
+                for sub in subs:
+                    if sub.callback is not None:
+                        try:
+                            # zero-copy view into the ring, valid for the duration of the call
+                            sub.callback(DayFrame(frame.seq, frame.timestamp, frame.image, None))
+                        except Exception:
+                            pass
+            for i, sub in enumerate(displays):
+                ring = proc.rings[f"display{i}"]
+                frame = ring.latest(last.get(i, 0))
+                if frame is None:
+                    continue
+                last[i] = frame.seq
+                h, w = frame.image.shape[:2]
+                if sub.size is None or (w, h) != fit_display(sub.size):
+                    continue  # rendered for an older size
+                trace = FrameTrace(frame.timestamp)
+                trace.mark("capture process")
+                img = Image.fromarray(frame.image)  # the only copy out of the ring
+                if not ring.valid(frame):
+                    continue  # overwritten while copying
+                trace.mark("fromarray")
+                if (w, h) != tuple(sub.size):
+                    # larger than the ring holds: scale up the clamped render once here
+                    img = img.resize(tuple(sub.size), Image.BILINEAR)
+                    trace.mark("resize")
+                sub.mailbox.post(DayFrame(frame.seq, frame.timestamp, img, trace))
+
+
+class _DisplayBranch:
+    """
+    One display appsink of the scaled day layout, bound to one subscription.
+    apply() maps the subscription's size / zoom / pan / fps / interpolation
+    onto the branch's valve, videocrop, videoscale method and capsfilter; a
+    caps change makes videoscale and videorate renegotiate on the next buffer. The zoom window is computed in
+    full-sensor coordinates and cropped relative to the current sensor ROI.
+    """
+
+    def __init__(self, capture, name, sub):
+        self.capture = capture
+        self.name = name
+        self.sub = sub
+        pipeline = capture.pipeline
+        self.valve = pipeline.get_by_name(f"{name}_valve")
+        self.crop = pipeline.get_by_name(f"{name}_crop")
+        self.scale = pipeline.get_by_name(f"{name}_scale")
+        self.caps = pipeline.get_by_name(f"{name}_caps")
+        self.sink = pipeline.get_by_name(f"{name}_sink")
+        _configure_sink(self.sink)
+        self.pump = None
+        self.seq = 0
+        self._applied = None
+        self._lock = threading.Lock()
+
+    def apply(self):
+        """Tk or pump thread; cheap when nothing changed."""
+        sub = self.sub
+        size = sub.size
+        if size is None:
+            self.valve.set_property("drop", True)  # paused: nothing past the tee
+            return
+        w, h = int(size[0]), int(size[1])
+        fps = max(1, round(sub.fps / max(1, sub.stride))) if sub.fps else None
+        roi = self.capture.roi
+        wanted = (w, h, sub.zoom, tuple(sub.pan), fps, roi, sub.interpolation)
+        with self._lock:
+            if wanted != self._applied:
+                src_w, src_h = DAY_SOURCE_SIZE
+                x, y, crop_w, crop_h = zoom_box(src_w, src_h, sub.zoom, sub.pan)
+                roi_x, roi_y, roi_w, roi_h = roi or (0, 0, src_w, src_h)
+                # window relative to the readout, clamped while a ROI change is pending
+                left = min(max(0, x - roi_x), roi_w - 1)
+                top = min(max(0, y - roi_y), roi_h - 1)
+                crop_w = max(1, min(crop_w, roi_w - left))
+                crop_h = max(1, min(crop_h, roi_h - top))
+                self.crop.set_property("left", left)
+                self.crop.set_property("top", top)
+                self.crop.set_property("right", roi_w - left - crop_w)
+                self.crop.set_property("bottom", roi_h - top - crop_h)
+                caps = f"video/x-raw,format=RGB,width={w},height={h},pixel-aspect-ratio=1/1"
+                if fps:
+                    caps += f",framerate={fps}/1"
+                self.caps.set_property("caps", Gst.Caps.from_string(caps))
+                # the governor's fast-scaling step: nearest-neighbour (0) instead of bilinear (1)
+                self.scale.set_property("method", 0 if sub.interpolation == cv2.INTER_NEAREST else 1)
+                self._applied = wanted
+        self.valve.set_property("drop", False)
+
+    def process(self, sample):
+        """Pump thread: the frame is already cropped, scaled and converted."""
+        sub = self.sub
+        size = sub.size
+        self.seq += 1
+        if size is None or (not sub.fps and self.seq % sub.stride):
+            return
+        pump = self.pump
+        trace = FrameTrace(pump.capture_ts if pump else None)
+        trace.mark("pipeline")  # sensor PTS -> pulled, including crop/scale/convert
+        with sample_frame(sample, mapped=self.capture.zero_copy) as arr:
+            if (arr.shape[1], arr.shape[0]) == (int(size[0]), int(size[1])):
+                img = Image.fromarray(arr)  # RGB: copies out of the mapped buffer
+                trace.mark("fromarray")
+            else:
+                # renegotiation for a new size still in flight: resize this one in Python
+                img = render_day_frame(arr, 1.0, size, self.capture.pool, trace,
+                                       interpolation=sub.interpolation)
+        sub.mailbox.post(DayFrame(self.seq, trace.t0, img, trace))
+
+
+# ===================== LRF READER =====================
+class LrfReader:
+    """Continuous-measurement LRF on a serial port; distance readings go to subscribers."""
+
+    def __init__(self, emit=None):
+        self.emit = emit or (lambda msg: None)
+        self.ser = None
+        self.running = False
+        self.thread = None
+        self.last_distance = None
+        self.last_update = None
+        self._callbacks = []
+
+    @property
+    def is_open(self):
+        return bool(self.ser and getattr(self.ser, "is_open", False))
+
+    def subscribe(self, callback):
+        """callback(distance_m) on the reader thread for every valid measurement."""
+        self._callbacks.append(callback)
+
+    def open(self, port, baud):
+        if not self.is_open:
+            self.ser = serial.Serial(port, baudrate=baud, timeout=1)
+            self.emit(f"Range connected: {port} @ {baud}")
+
+    def start(self):
+        self.ser.write(CONTINUOUS_MEASUREMENT)
+        self.running = True
+        if not self.thread or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._read_loop, name="lrf-reader", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.is_open:
+            self.ser.write(STOP_MEASUREMENT)
+            self.ser.flush()
+            self.ser.close()
+
+    def _read_loop(self):
+        while self.running and self.is_open:
+            try:
+                if self.ser.in_waiting >= 8:
+                    data = self.ser.read(8)
+                    if len(data) == 8 and data[4] != 0x00:
+                        distance = (data[5] * 256 + data[6]) / 10.0
+                        self.last_distance = distance
+                        self.last_update = time.monotonic()
+                        for cb in list(self._callbacks):
+                            cb(distance)
+                else:
+                    time.sleep(0.05)
+            except Exception:
+                time.sleep(0.1)
+
+
+# ===================== THERMAL UART =====================
+class ThermalUart:
+    """
+    Thermal camera control port. One UartWorker thread owns the open port and
+    runs the queued commands one at a time, highest priority first. Settings
+    go through `controls`, which coalesces them per setting and skips values
+    `state` says the camera already has. On connect the cached settings are
+    dropped and the camera's identity is checked in one batched read.
+    """
+
+    def __init__(self, emit=None, control_interval=THERMAL_CONTROL_INTERVAL_S, state=None):
+        self.emit = emit or (lambda msg: None)
+        self.ser = None
+        self.worker = None
+        self.state = state or ThermalState()
+        self.controls = ThermalControls(self, self.state, report=self._control_report, min_interval=control_interval)
+
+    @property
+    def connected(self):
+        return bool(self.ser and getattr(self.ser, "is_open", False))
+
+    def connect(self, port, baud):
+        self.ser = serial.Serial(port, baudrate=baud, timeout=1)
+        self.worker = UartWorker(self.ser, lambda ser, data, n: send_to_ir_camera(ser, data, response_len=n),
+                                 name=f"thermal-uart-{port}")
+        self.emit(f"Thermal UART connected: {port} @ {baud}")
+        # the camera may have been power-cycled or swapped while the port was closed
+        self.state.invalidate(port)
+        self.identify(self._report_identity)
+
+    def disconnect(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        self.state.invalidate()
+        if self.connected:
+            self.ser.close()
+        self.ser = None
+
+    def send(self, command, expect_len, callback=None, priority=PRIORITY_COMMAND, label=None):
+        """
+        Queue one command. Returns a Future of the response (payload bytes, or
+        0 on no/invalid response); callback(response) is called on the worker.
+        The Future's rtt_ms holds the write-to-response time once it is done.
+        """
+        if not self.connected or self.worker is None:
+            raise RuntimeError("thermal UART not connected")
+        return self.worker.submit(command, expect_len, priority, callback, label)
+
+    # ---------------- Identity ----------------
+    def read_info(self, keys, done):
+        """
+        Queue the info requests for keys back to back; done(values, errors)
+        runs on the worker once all of them have answered. values maps key to
+        the decoded reply as text.
+        """
+        requests = [item for item in THERMAL_INFO_REQUESTS if item["key"] in keys]
+        values, errors = {}, {}
+        if not requests:
+            done(values, errors)
+            return
+        remaining = [len(requests)]
+        lock = threading.Lock()
+
+        def finished(item, future):
+            try:
+                resp = future.result()
+                if resp == 0:
+                    raise RuntimeError("no/invalid response")
+                value = item["decode"](resp)
+                values[item["key"]] = f"{value:X}" if isinstance(value, int) else str(value)
+            except Exception as e:
+                errors[item["key"]] = e
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                done(values, errors)
+
+        for item in requests:
+            future = self.send(item["data"], item["response_len"], priority=PRIORITY_QUERY, label=item["key"])
+            future.add_done_callback(lambda f, item=item: finished(item, f))
+
+    def identify(self, done, refresh=False):
+        """
+        done(identity, source, errors) with identity the chip model, ID and
+        versions. Comes straight from `state` once known (source "cache");
+        for a chip seen on this port before, only its ID is read to confirm
+        it ("confirmed"); otherwise everything is read in one batch ("camera").
+        """
+        if self.state.identified and not refresh:
+            done(dict(self.state.identity), "cache", {})
+            return
+        cached = None if refresh else self.state.cached_identity(self.state.port)
+
+        def full_read(values=None, errors=None):
+            def read(fresh, errs):
+                fresh = dict(values or {}, **fresh)
+                if all(k in fresh for k in IDENTITY_KEYS):
+                    self.state.set_identity(fresh)
+                done(fresh, "camera", errs)
+            missing = [k for k in IDENTITY_KEYS if k not in (values or {})]
+            self.read_info(missing, read)
+
+        def confirm(values, errors):
+            if values.get("chip_id") == cached["chip_id"]:
+                self.state.set_identity(cached)
+                done(dict(cached), "confirmed", {})
+            elif "chip_id" in values:
+                full_read(values)  # another chip on this port
+            else:
+                done({}, "camera", errors)
+
+        if cached is not None:
+            self.read_info(("chip_id",), confirm)
+        else:
+            full_read()
+
+    def _report_identity(self, identity, source, errors):
+        if errors:
+            self.emit(f"Thermal camera identity incomplete: {', '.join(f'{k}: {e}' for k, e in errors.items())}")
+        elif identity:
+            self.emit(f"Thermal camera {identity['chip_model']} (chip {identity['chip_id']}, "
+                      f"fw {identity['firmware']}, hw {identity['hardware']}; {source})")
+
+    def _control_report(self, name, value, response, latency_ms, error):
+        if error is not None:
+            self.emit(f"Thermal {name} {value} not applied: {error}")
+        else:
+            self.emit(f"Thermal {name} {value} ({latency_ms:.0f} ms)")
+
+    def stats(self):
+        return self.worker.stats() if self.worker is not None else None
+
+
+# ===================== ENGINE =====================
+class PayloadEngine:
+    """
+    Owns every device of the payload and exposes frames and telemetry through
+    subscriptions. Status messages go to listeners registered with on_event();
+    they are called from worker threads, so a GUI must marshal them itself.
+    """
+
+    def __init__(self, thermal_index=0, zero_copy=True, processes=False, gst_scaling=True):
+        self._listeners = []
+        self.thermal_index = thermal_index
+        self.processes = processes  # run each camera in its own capture process
+        self.day = DayCapture(zero_copy=zero_copy, emit=self.emit, process=processes, scaled=gst_scaling)
+        self.thermal = None  # shared ThermalCapture, opened on first subscriber
+        self._thermal_lock = threading.Lock()
+        self.lrf = LrfReader(emit=self.emit)
+        self.thermal_uart = ThermalUart(emit=self.emit)
+
+    # ---------------- Events ----------------
+    def on_event(self, callback):
+        self._listeners.append(callback)
+
+    def emit(self, msg):
+        for cb in list(self._listeners):
+            try:
+                cb(msg)
+            except Exception:
+                pass
+
+    # ---------------- Thermal capture ----------------
+    def thermal_subscribe(self, name, size=None, callback=None):
+        """Subscribe to the shared thermal capture, opening the device for the first subscriber"""
+        with self._thermal_lock:
+            if not (self.thermal and self.thermal.running):
+                # grey frames: the palette LUT works on intensity, and resizing 1 channel is cheaper
+                self.thermal = ThermalCapture(self.thermal_index, intensity=True, process=self.processes)
+                if not self.thermal.start():
+                    self.thermal = None
+                    return None
+            return self.thermal.subscribe(name, size, callback)
+
+    def thermal_unsubscribe(self, sub):
+        """Drop a subscriber; the device is released once nobody is subscribed"""
+        with self._thermal_lock:
+            if sub is None or not self.thermal:
+                return
+            self.thermal.unsubscribe(sub)
+            if not self.thermal.subscribers:
+                self.thermal.stop()
+                self.thermal = None
+
+    @property
+    def thermal_fps(self):
+        return self.thermal.fps if self.thermal else ThermalCapture.DEFAULT_FPS
+
+    # ---------------- Shutdown ----------------
+    def shutdown(self):
+        try:
+            self.lrf.stop()
+        except Exception as e:
+            self.emit(f"LRF close error: {e}")
+        try:
+            if self.thermal:
+                self.thermal.stop()
+                self.thermal = None
+            self.thermal_uart.disconnect()
+            self.thermal_uart.controls.close()
+        except Exception as e:
+            self.emit(f"Thermal close error: {e}")
+        try:
+            self.day.stop()
+            self.day.controls.close()
+        except Exception as e:
+            self.emit(f"Day pipeline close error: {e}")
+
+
+# ===================== HEADLESS RUN =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the payload engine without a GUI")
+    parser.add_argument("--day", choices=list(DAY_PIPELINES), help="start the day camera in this mode")
+    parser.add_argument("--thermal", action="store_true", help="open the thermal camera")
+    parser.add_argument("--lrf", metavar="PORT", help="start continuous ranging on this port")
+    parser.add_argument("--lrf-baud", type=int, default=115200)
+    parser.add_argument("--seconds", type=float, default=0, help="run time (0 = until Ctrl+C)")
+    parser.add_argument("--processes", action="store_true", help="one capture process per camera")
+    parser.add_argument("--size", metavar="WxH", help="also render a day display target of this size")
+    args = parser.parse_args(argv)
+
+    engine = PayloadEngine(processes=args.processes)
+    display = None
+    engine.on_event(print)
+    counts = {"day": 0, "thermal": 0}
+
+    def count(key):
+        def cb(frame):
+            counts[key] += 1
+        return cb
+
+    if args.day:
+        engine.day.subscribe("headless", callback=count("day"))
+        if args.size:
+            w, h = (int(v) for v in args.size.lower().split("x"))
+            display = engine.day.subscribe("display", size=(w, h))
+        engine.day.start(args.day)
+    if args.thermal and engine.thermal_subscribe("headless", callback=count("thermal")) is None:
+        print("Cannot open thermal camera.")
+    if args.lrf:
+        engine.lrf.open(args.lrf, args.lrf_baud)
+        engine.lrf.start()
+
+    t_end = time.monotonic() + args.seconds if args.seconds else None
+    try:
+        while t_end is None or time.monotonic() < t_end:
+            time.sleep(1.0)
+            if display is not None:
+                counts["display"] = display.mailbox.posted
+                display.mailbox.reset_stats()
+            rng = engine.lrf.last_distance
+            shown = f"display {counts['display']} fps | " if display is not None else ""
+            print(f"day {counts['day']} fps | {shown}thermal {counts['thermal']} fps | "
+                  f"range {'--.-' if rng is None else f'{rng:.1f}'} m", flush=True)
+            counts["day"] = counts["thermal"] = 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        summary = engine.day.stop()
+        if summary:
+            print(f"Day pump: {summary}")
+        engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import gi
+gi.require_version("Gst", "1.0")
+from gi.repository import Gst
+import os
+import threading
+import time
+
+RECORDINGS_DIR = "./recordings"
+
+
+# ===================== ENCODER SELECTION =====================
+def pick_encoder():
+    """Return (encoder, muxer, extension) for the best encoder installed."""
+    if Gst.ElementFactory.find("x264enc") and Gst.ElementFactory.find("matroskamux"):
+        return "x264enc tune=zerolatency speed-preset=ultrafast", "matroskamux", "mkv"
+    return "jpegenc", "avimux", "avi"
+
+
+def recording_path(directory, prefix, ext):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.{ext}")
+
+
+def _branch_description(path, encoder, muxer):
+    # leaky queue: if the encoder or the disk falls behind, frames are dropped
+    # here (and counted) instead of back-pressuring the live view
+    return (
+        "queue name=rec_queue leaky=downstream max-size-buffers=60 max-size-bytes=0 max-size-time=0 ! "
+        f"videoconvert ! {encoder} ! {muxer} ! "
+        f"filesink name=rec_sink location=\"{path}\" sync=false async=false"
+    )
+
+
+# ===================== COMMON COUNTERS =====================
+class _Recorder:
+    """Counters shared by the recorders; encoding itself runs on GStreamer threads."""
+
+    def __init__(self):
+        self.path = None
+        self.recording = False
+        self._finished = threading.Event()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames_in = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.started_at = None
+        self.stopped_at = None
+
+    def _instrument(self, container):
+        """Hook the counters onto rec_queue / rec_sink inside container."""
+        queue = container.get_by_name("rec_queue")
+        sink = container.get_by_name("rec_sink")
+        queue.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER, self._count_in)
+        queue.connect("overrun", self._on_overrun)
+        sink.get_static_pad("sink").add_probe(Gst.PadProbeType.BUFFER | Gst.PadProbeType.EVENT_DOWNSTREAM,
+                                              self._count_written)
+
+    def _count_in(self, pad, info):
+        self.frames_in += 1
+        return Gst.PadProbeReturn.OK
+
+    def _on_overrun(self, queue):
+        self.frames_dropped += 1
+
+    def _count_written(self, pad, info):
+        if info.type & Gst.PadProbeType.BUFFER:
+            buf = info.get_buffer()
+            if buf is not None:
+                self.bytes_written += buf.get_size()
+        else:
+            event = info.get_event()
+            if event is not None and event.type == Gst.EventType.EOS:
+                threading.Thread(target=self._finalize, daemon=True).start()
+        return Gst.PadProbeReturn.OK
+
+    def _finalize(self):
+        self._finished.set()
+
+    def wait(self, timeout=3.0):
+        """Wait until the file has been finalised after stop()."""
+        return self._finished.wait(timeout)
+
+    def stats(self):
+        end = self.stopped_at or time.monotonic()
+        elapsed = max(1e-6, end - self.started_at) if self.started_at else 0.0
+        return {
+            "path": self.path,
+            "recording": self.recording,
+            "seconds": elapsed,
+            "frames_in": self.frames_in,
+            "frames_dropped": self.frames_dropped,
+            "bytes_written": self.bytes_written,
+            "write_kbps": (self.bytes_written * 8 / 1000.0 / elapsed) if elapsed else 0.0,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{os.path.basename(s['path'] or '')}: {s['frames_in']} frames, "
+                f"{s['frames_dropped']} dropped, {s['bytes_written'] / 1e6:.1f} MB "
+                f"@ {s['write_kbps']:.0f} kbit/s")
+
+
+# ===================== TEE BRANCH (DAY) =====================
+class TeeRecorder(_Recorder):
+    """
+    Adds an encode-to-file branch to a running pipeline on its `tee` element.
+    The branch is linked while PLAYING and removed again behind an EOS, so
+    the live appsink branch never stops.
+    """
+
+    def __init__(self, pipeline, tee_name="rec_tee"):
+        super().__init__()
+        self.pipeline = pipeline
+        self.tee_name = tee_name
+        self.bin = None
+        self.tee_pad = None
+
+    def start(self, path):
+        tee = self.pipeline.get_by_name(self.tee_name)
+        if tee is None:
+            raise RuntimeError(f"Pipeline has no tee named {self.tee_name}")
+        encoder, muxer, _ = pick_encoder()
+        self._reset_stats()
+        self._finished.clear()
+        self.path = path
+        self.bin = Gst.parse_bin_from_description(_branch_description(path, encoder, muxer), True)
+        self._instrument(self.bin)
+        self.pipeline.add(self.bin)
+        self.tee_pad = tee.get_request_pad("src_%u")
+        self.tee_pad.link(self.bin.get_static_pad("sink"))
+        self.bin.sync_state_with_parent()
+        self.started_at = time.monotonic()
+        self.recording = True
+
+    def stop(self):
+        """Detach the branch when the tee pad is idle and push EOS through it."""
+        if not self.recording:
+            return
+        self.recording = False
+        self.stopped_at = time.monotonic()
+
+        def unlink(pad, info):
+            sinkpad = self.bin.get_static_pad("sink")
+            pad.unlink(sinkpad)
+            sinkpad.send_event(Gst.Event.new_eos())
+            return Gst.PadProbeReturn.REMOVE
+
+        self.tee_pad.add_probe(Gst.PadProbeType.IDLE, unlink)
+
+    def _finalize(self):
+        try:
+            self.bin.set_state(Gst.State.NULL)
+            self.pipeline.remove(self.bin)
+            tee = self.pipeline.get_by_name(self.tee_name)
+            if tee is not None:
+                tee.release_request_pad(self.tee_pad)
+        except Exception:
+            pass
+        self.bin = None
+        self.tee_pad = None
+        super()._finalize()
+
+
+# ===================== APPSRC PIPELINE (THERMAL) =====================
+class AppSrcRecorder(_Recorder):
+    """
+    Records frames pushed from Python through an appsrc into its own encode
+    pipeline. push() only wraps the frame's memory in a Gst.Buffer (no copy;
+    the buffer keeps the array alive, so frames must not be written to after
+    they are pushed); conversion, encoding and muxing run on GStreamer
+    streaming threads. The pipeline is built on the first frame so the caps
+    match the frame size.
+
+    When the encoder falls behind, the appsrc queue fills up to max-bytes and
+    signals enough-data; push() then drops frames until it asks for more
+    (need-data). Those drops and any failed push-buffer are counted in
+    frames_dropped, overruns and push_errors, and report(msg) is called once
+    per overrun and per failed push.
+    """
+
+    FORMATS = {1: "GRAY8", 3: "BGR"}
+
+    def __init__(self, report=None):
+        super().__init__()
+        self.report = report
+        self.pipeline = None
+        self.src = None
+        self.fps = 30
+        self._shape = None
+        self._t0 = None
+        self._full = False
+
+    def _reset_stats(self):
+        super()._reset_stats()
+        self.overruns = 0
+        self.push_errors = 0
+
+    def _log(self, msg):
+        if self.report:
+            try:
+                self.report(msg)
+            except Exception:
+                pass
+
+    def _on_enough_data(self, src):
+        if not self._full:
+            self._full = True
+            self.overruns += 1
+            self._log(f"Recorder: encoder behind, dropping frames ({os.path.basename(self.path or '')})")
+
+    def _on_need_data(self, src, length):
+        self._full = False
+
+    def start(self, path, fps=30):
+        self._reset_stats()
+        self._finished.clear()
+        self.path = path
+        self.fps = max(1, int(round(fps)))
+        self._shape = None
+        self._t0 = None
+        self._full = False
+        self.started_at = time.monotonic()
+        self.recording = True
+
+    def _open(self, frame):
+        h, w = frame.shape[:2]
+        fmt = self.FORMATS[1 if frame.ndim == 2 else frame.shape[2]]
+        encoder, muxer, _ = pick_encoder()
+        desc = (
+            f"appsrc name=rec_src is-live=true format=time block=false max-bytes={w * h * 3 * 4} "
+            f"caps=video/x-raw,format={fmt},width={w},height={h},framerate={self.fps}/1 ! "
+            + _branch_description(self.path, encoder, muxer)
+        )
+        self.pipeline = Gst.parse_launch(desc)
+        self.src = self.pipeline.get_by_name("rec_src")
+        self.src.connect("enough-data", self._on_enough_data)
+        self.src.connect("need-data", self._on_need_data)
+        self._instrument(self.pipeline)
+        self.pipeline.set_state(Gst.State.PLAYING)
+        self._shape = frame.shape
+
+    def push(self, frame, timestamp=None):
+        """Queue one frame for encoding (called from the capture thread)."""
+        if not self.recording or frame is None:
+            return
+        if self.pipeline is None:
+            self._open(frame)
+        if frame.shape != self._shape or self._full:
+            self.frames_dropped += 1
+            return
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if self._t0 is None:
+            self._t0 = timestamp
+        buf = _wrap(frame)
+        buf.pts = int((timestamp - self._t0) * Gst.SECOND)
+        buf.duration = Gst.SECOND // self.fps
+        ret = self.src.emit("push-buffer", buf)
+        if ret != Gst.FlowReturn.OK:
+            self.frames_dropped += 1
+            self.push_errors += 1
+            self._log(f"Recorder: push-buffer failed ({ret.value_nick})")
+
+    def stop(self):
+        if not self.recording:
+            return
+        self.recording = False
+        self.stopped_at = time.monotonic()
+        if self.src is not None:
+            self.src.emit("end-of-stream")
+        else:
+            self._finished.set()
+
+    def _finalize(self):
+        try:
+            self.pipeline.set_state(Gst.State.NULL)
+        except Exception:
+            pass
+        self.pipeline = None
+        self.src = None
+        super()._finalize()
+
+    def stats(self):
+        return dict(super().stats(), overruns=self.overruns, push_errors=self.push_errors)
+
+    def summary(self):
+        return f"{super().summary()}, {self.overruns} encoder overruns, {self.push_errors} push errors"
+
+
+def _wrap(frame):
+    """A read-only Gst.Buffer over frame's own memory; the buffer holds the array until it is freed."""
+    if not frame.flags.c_contiguous:
+        frame = frame.copy()
+    data = memoryview(frame).cast("B")
+    return Gst.Buffer.new_wrapped_full(Gst.MemoryFlags.READONLY, data, data.nbytes, 0, None,
+                                       lambda _: data.release())
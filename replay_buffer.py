@@ -0,0 +1,147 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+# timestamp: time.monotonic() of the source frame, shape: decoded (h, w[, 3]),
+# data: JPEG bytes
+ReplayFrame = namedtuple("ReplayFrame", ["timestamp", "shape", "data"])
+
+
+# ===================== REPLAY RING =====================
+class ReplayRing:
+    """
+    Bounded in-memory ring of recent frames for instant replay.
+
+    push() downscales a frame to at most max_width and stores it JPEG
+    compressed; once the stored bytes exceed budget_mb the oldest frames are
+    evicted first. At the defaults a 640 px wide frame is roughly 20-40 kB, so
+    64 MB holds well over 30 s at 30 fps. push() is thread safe and meant to be
+    called from a capture/pump thread, never from Tk.
+    """
+
+    def __init__(self, name="replay", budget_mb=64, max_width=640, quality=80, fps=30):
+        self.name = name
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.max_width = max_width
+        self.quality = quality
+        self.min_interval = 1.0 / fps if fps else 0.0
+        self._frames = deque()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.pushed = 0
+        self.evicted = 0
+        self.encode_ms = 0.0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def push(self, frame, timestamp=None):
+        """Compress and store one frame (grey or 3-channel, returned in the same channel order)."""
+        if frame is None:
+            return
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        last = self._frames[-1].timestamp if self._frames else None
+        if last is not None and timestamp - last < self.min_interval * 0.5:
+            return  # faster than the ring rate, keep the older one
+        t0 = time.perf_counter()
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, max(1, h * self.max_width // w)),
+                               interpolation=cv2.INTER_AREA)
+        ok, enc = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        item = ReplayFrame(timestamp, frame.shape, enc.tobytes())
+        self.encode_ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self._frames.append(item)
+            self.bytes_used += len(item.data)
+            self.pushed += 1
+            while self.bytes_used > self.budget_bytes and len(self._frames) > 1:
+                old = self._frames.popleft()
+                self.bytes_used -= len(old.data)
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.bytes_used = 0
+
+    def snapshot(self):
+        """Frozen list of the stored frames, oldest first (safe to keep while pushing continues)."""
+        with self._lock:
+            return list(self._frames)
+
+    @property
+    def duration(self):
+        with self._lock:
+            if len(self._frames) < 2:
+                return 0.0
+            return self._frames[-1].timestamp - self._frames[0].timestamp
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "frames": len(self._frames),
+            "seconds": self.duration,
+            "mb": self.bytes_used / (1024 * 1024),
+            "budget_mb": self.budget_bytes / (1024 * 1024),
+            "pushed": self.pushed,
+            "evicted": self.evicted,
+            "encode_ms": self.encode_ms,
+        }
+
+    def dump(self, directory, done=None):
+        """
+        Write the current contents to directory as numbered JPEGs plus an index
+        file, on a background thread. done(count, directory) is called from that
+        thread when finished (or done(None, error) on failure).
+        """
+        frames = self.snapshot()
+
+        def worker():
+            try:
+                os.makedirs(directory, exist_ok=True)
+                t0 = frames[0].timestamp if frames else 0.0
+                with open(os.path.join(directory, "index.csv"), "w") as index:
+                    index.write("file,seconds\n")
+                    for i, item in enumerate(frames):
+                        fn = f"{self.name}_{i:05d}.jpg"
+                        with open(os.path.join(directory, fn), "wb") as f:
+                            f.write(item.data)
+                        index.write(f"{fn},{item.timestamp - t0:.3f}\n")
+            except Exception as e:
+                if done:
+                    done(None, e)
+                return
+            if done:
+                done(len(frames), directory)
+
+        thread = threading.Thread(target=worker, name=f"{self.name}-dump", daemon=True)
+        thread.start()
+        return thread
+
+
+# ===================== PLAYBACK HELPERS =====================
+def decode(item):
+    """Decode a ReplayFrame back to a numpy image (grey stays single-channel)."""
+    flags = cv2.IMREAD_GRAYSCALE if len(item.shape) == 2 else cv2.IMREAD_COLOR
+    return cv2.imdecode(np.frombuffer(item.data, dtype=np.uint8), flags)
+
+
+def nearest(frames, timestamp):
+    """Frame from a snapshot whose timestamp is closest to timestamp, or None."""
+    if not frames:
+        return None
+    i = bisect.bisect_left([f.timestamp for f in frames], timestamp)
+    if i == 0:
+        return frames[0]
+    if i == len(frames):
+        return frames[-1]
+    before, after = frames[i - 1], frames[i]
+    return before if timestamp - before.timestamp <= after.timestamp - timestamp else after
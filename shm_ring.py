@@ -0,0 +1,137 @@
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# seq: frame number (1, 2, ...), timestamp: time.monotonic() of the capture
+# (CLOCK_MONOTONIC, so comparable between processes), image: view into the ring
+RingFrame = namedtuple("RingFrame", ["seq", "timestamp", "image"])
+
+_WORDS = 8             # int64 words per header
+_HDR = _WORDS * 8      # bytes per header (64, keeps slots cache-line aligned)
+
+
+def _open_shm(name, create, size=0):
+    # An attaching process must not unlink the block when it exits; only the
+    # creator owns it. Python < 3.13 has no track=False, so unregister by hand.
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+# ===================== SHARED-MEMORY FRAME RING =====================
+class ShmFrameRing:
+    """
+    Single-writer ring of frames in a multiprocessing.shared_memory block.
+
+    Layout: a ring header [write_count, slots, max_h, max_w, max_c] followed by
+    `slots` slots, each a header [seq_begin, seq_end, ts_ns, h, w, c] plus room
+    for one max_shape uint8 frame. The writer stamps seq_begin, fills the
+    pixels, stamps seq_end and then publishes write_count (a per-slot seqlock).
+    Readers take the newest slot as a numpy view without copying; the view
+    stays valid until the writer comes round to that slot again, `slots`
+    frames later, which valid(frame) checks.
+    """
+
+    def __init__(self, name=None, slots=4, max_shape=(720, 1280, 3), create=True):
+        if create:
+            max_shape = tuple(max_shape) + (1,) * (3 - len(max_shape))
+            self.slot_bytes = -(-int(np.prod(max_shape)) // 64) * 64
+            size = _HDR + slots * (_HDR + self.slot_bytes)
+            self.shm = _open_shm(name, True, size)
+            self._header = np.ndarray((_WORDS,), np.int64, self.shm.buf, 0)
+            self._header[:] = 0
+            self._header[1:5] = (slots, *max_shape)
+        else:
+            self.shm = _open_shm(name, False)
+            self._header = np.ndarray((_WORDS,), np.int64, self.shm.buf, 0)
+        self.owner = create
+        self.name = self.shm.name
+        self.slots = int(self._header[1])
+        self.max_shape = tuple(int(v) for v in self._header[2:5])
+        self.slot_bytes = -(-int(np.prod(self.max_shape)) // 64) * 64
+        self._slot_hdr = [np.ndarray((_WORDS,), np.int64, self.shm.buf, self._slot_offset(i))
+                          for i in range(self.slots)]
+        self._pending = None
+
+    @classmethod
+    def attach(cls, name):
+        return cls(name, create=False)
+
+    def _slot_offset(self, i):
+        return _HDR + i * (_HDR + self.slot_bytes)
+
+    def _view(self, i, shape):
+        return np.ndarray(shape, np.uint8, self.shm.buf, self._slot_offset(i) + _HDR)
+
+    @property
+    def write_count(self):
+        return int(self._header[0])
+
+    # ---------------- Writer ----------------
+    def begin_write(self, shape):
+        """Writable view of the next slot for a frame of shape; call commit() when filled."""
+        if int(np.prod(shape)) > self.slot_bytes:
+            raise ValueError(f"frame {shape} does not fit ring slot {self.max_shape}")
+        seq = self.write_count + 1
+        i = (seq - 1) % self.slots
+        hdr = self._slot_hdr[i]
+        hdr[0] = seq                     # slot is being rewritten from now on
+        hdr[3:6] = (shape[0], shape[1], shape[2] if len(shape) > 2 else 0)
+        self._pending = (seq, i)
+        return self._view(i, shape)
+
+    def commit(self, timestamp=None):
+        seq, i = self._pending
+        hdr = self._slot_hdr[i]
+        hdr[2] = int((time.monotonic() if timestamp is None else timestamp) * 1e9)
+        hdr[1] = seq
+        self._header[0] = seq            # publish
+        self._pending = None
+        return seq
+
+    def write(self, frame, timestamp=None):
+        self.begin_write(frame.shape)[...] = frame
+        return self.commit(timestamp)
+
+    # ---------------- Reader ----------------
+    def latest(self, after=0):
+        """Newest complete frame with seq > after as a zero-copy view, or None."""
+        seq = self.write_count
+        if seq <= after:
+            return None
+        i = (seq - 1) % self.slots
+        hdr = self._slot_hdr[i]
+        if hdr[0] != seq or hdr[1] != seq:
+            return None  # being rewritten (reader fell a whole ring behind)
+        h, w, c = (int(v) for v in hdr[3:6])
+        image = self._view(i, (h, w, c) if c else (h, w))
+        return RingFrame(seq, hdr[2] / 1e9, image)
+
+    def valid(self, frame):
+        """True while the writer has not started overwriting frame's slot."""
+        return int(self._slot_hdr[(frame.seq - 1) % self.slots][0]) == frame.seq
+
+    # ---------------- Cleanup ----------------
+    def close(self):
+        self._header = None
+        self._slot_hdr = []
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a reader still holds a view; the mapping goes with the process
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
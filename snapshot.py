@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+SNAPSHOT_DIR = "./snapshots"
+
+# cv2.imwrite parameters per format
+FORMATS = {
+    "png": [cv2.IMWRITE_PNG_COMPRESSION, 1],   # fast, still lossless
+    "jpg": [cv2.IMWRITE_JPEG_QUALITY, 95],
+    "tiff": [],
+}
+
+
+# ===================== SNAPSHOT WRITER =====================
+class SnapshotWriter:
+    """
+    Saves full-resolution source frames without blocking the producer.
+
+    Producers (day pump, thermal capture thread) call offer() for every frame;
+    it is a dictionary lookup unless a snapshot/burst has been armed for that
+    stream with arm(). Armed frames are copied and queued to a small thread
+    pool that runs the optional transform (colour conversion, palette),
+    encodes and writes the file. The queue is bounded by max_pending: when the
+    disk cannot keep up further frames are dropped and counted instead of
+    piling up in memory, and report() is told about it.
+
+    report(msg) is called from worker/producer threads; wrap it for Tk.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR, workers=2, max_pending=16, report=None):
+        self.directory = directory
+        self.report = report
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._armed = {}   # key -> burst dict
+        self.pending = 0
+        self.written = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.write_ms = 0.0
+        self.last_error = None
+
+    # ---------------- Arming ----------------
+    def arm(self, key, count=1, fmt="png", transform=None):
+        """Capture the next count frames offered for key (a burst at source rate when count > 1)."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown snapshot format: {fmt}")
+        burst = {"remaining": int(max(1, count)), "fmt": fmt, "transform": transform,
+                 "written": 0, "dropped": 0, "seq": 0,
+                 "stamp": time.strftime("%Y%m%d_%H%M%S")}
+        with self._lock:
+            self._armed[key] = burst
+        return burst
+
+    def armed(self, key):
+        return key in self._armed
+
+    def offer(self, key, frame, transform=None):
+        """Called by producers with each source frame; copies and queues it only when armed."""
+        burst = self._armed.get(key)
+        if burst is None or frame is None:
+            return False
+        with self._lock:
+            if burst["remaining"] <= 0:
+                return False
+            burst["remaining"] -= 1
+            burst["seq"] += 1
+            seq = burst["seq"]
+            if burst["remaining"] == 0:
+                self._armed.pop(key, None)
+        if not self._slots.acquire(blocking=False):
+            self._drop(key, burst)
+            return False
+        # copy now: the source buffer may be a mapped GStreamer buffer or a shared frame
+        img = np.array(frame, copy=True)
+        path = os.path.join(self.directory, f"{key}_{burst['stamp']}_{seq:03d}.{burst['fmt']}")
+        with self._lock:
+            self.pending += 1
+        self._pool.submit(self._write, key, burst, img, path, transform or burst["transform"])
+        return True
+
+    # ---------------- Workers ----------------
+    def _write(self, key, burst, img, path, transform):
+        t0 = time.perf_counter()
+        try:
+            if transform is not None:
+                img = transform(img)
+            os.makedirs(self.directory, exist_ok=True)
+            if not cv2.imwrite(path, img, FORMATS[burst["fmt"]]):
+                raise IOError(f"could not write {path}")
+            size = os.path.getsize(path)
+            with self._lock:
+                self.written += 1
+                self.bytes_written += size
+                burst["written"] += 1
+        except Exception as e:
+            self.last_error = e
+            with self._lock:
+                burst["dropped"] += 1
+            self._notify(f"Snapshot {key} error: {e}")
+        finally:
+            self.write_ms = (time.perf_counter() - t0) * 1000.0
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+        self._check_done(key, burst)
+
+    def _drop(self, key, burst):
+        with self._lock:
+            self.dropped += 1
+            burst["dropped"] += 1
+        self._notify(f"Snapshot {key}: write queue full, dropped frame ({burst['dropped']} so far)")
+        self._check_done(key, burst)
+
+    def _check_done(self, key, burst):
+        with self._lock:
+            done = (burst["remaining"] == 0 and not burst.get("reported")
+                    and burst["written"] + burst["dropped"] >= burst["seq"])
+            if done:
+                burst["reported"] = True
+        if done:
+            msg = f"Snapshot {key}: saved {burst['written']} frame(s) to {self.directory}"
+            if burst["dropped"]:
+                msg += f", {burst['dropped']} dropped"
+            self._notify(msg)
+
+    def _notify(self, msg):
+        if self.report:
+            try:
+                self.report(msg)
+            except Exception:
+                pass
+
+    # ---------------- Info / cleanup ----------------
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": self.pending,
+            "bytes_written": self.bytes_written,
+            "write_ms": self.write_ms,
+        }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._armed.clear()
+        self._pool.shutdown(wait=wait)
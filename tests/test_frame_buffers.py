@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("gi")
+
+from frame_buffers import _shape_frame  # noqa: E402
+
+
+def _padded(frame, stride):
+    """Lay frame rows out with GStreamer-style row padding, as a flat buffer."""
+    h = frame.shape[0]
+    rows = frame.reshape(h, -1)
+    buf = np.zeros((h, stride), np.uint8)
+    buf[:, :rows.shape[1]] = rows
+    return buf.reshape(-1)
+
+
+def test_rgb_odd_width_padded_rows():
+    h, w = 5, 7  # 21 bytes per row, padded to 24
+    frame = np.arange(h * w * 3, dtype=np.uint8).reshape(h, w, 3)
+    out = _shape_frame(_padded(frame, 24), w, h, channels=3)
+    assert out.shape == (h, w, 3)
+    assert np.array_equal(out, frame)
+
+
+def test_rgb_padding_inferred_without_layout():
+    h, w = 4, 9  # 27 bytes per row, padded to 28
+    frame = np.random.default_rng(0).integers(0, 256, (h, w, 3), dtype=np.uint8)
+    assert np.array_equal(_shape_frame(_padded(frame, 28), w, h), frame)
+
+
+def test_gray_odd_width_explicit_stride():
+    h, w = 3, 5
+    frame = np.arange(h * w, dtype=np.uint8).reshape(h, w)
+    out = _shape_frame(_padded(frame, 8), w, h, channels=1, stride=8)
+    assert out.shape == (h, w)
+    assert np.array_equal(out, frame)
+
+
+def test_packed_buffers_unchanged():
+    h, w = 4, 8
+    rgb = np.arange(h * w * 3, dtype=np.uint8)
+    gray = np.arange(h * w, dtype=np.uint8)
+    assert np.array_equal(_shape_frame(rgb, w, h), rgb.reshape(h, w, 3))
+    assert np.array_equal(_shape_frame(gray, w, h), gray.reshape(h, w))
+
+
+def test_pool_caps_distinct_shapes():
+    from frame_buffers import FramePool
+    pool = FramePool(max_per_shape=2, max_shapes=3)
+    for n in range(1, 11):
+        pool.release(pool.acquire((n, n, 3)))
+    assert len(pool._free) == 3
+    assert pool.evicted == 7
+    # the most recently used shapes survive
+    assert set(pool._free) == {((n, n, 3), np.dtype(np.uint8).str) for n in (8, 9, 10)}
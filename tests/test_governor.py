@@ -0,0 +1,29 @@
+from governor import LoadGovernor
+
+
+def test_reset_survives_failing_step():
+    calls = []
+
+    def broken(on):
+        calls.append(on)
+        raise RuntimeError("boom")
+
+    gov = LoadGovernor()
+    gov.add_step("ok", lambda on: calls.append(("ok", on)))
+    gov.add_step("broken", broken)
+    gov.level = 2  # both engaged
+    gov.reset()
+    assert gov.level == 0
+    assert calls == [False, ("ok", False)]
+    assert any("'broken' failed" in msg for _, msg in gov.history)
+
+
+def test_failing_escalation_keeps_level():
+    gov = LoadGovernor(escalate_after=1)
+    gov.add_step("broken", lambda on: 1 / 0)
+    t = [0.0]
+    gov.add_load("cpu", lambda: t[0])
+    gov.sample()
+    t[0] += 10.0  # far above `high`
+    gov.sample()
+    assert gov.level == 0
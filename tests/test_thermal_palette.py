@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from thermal_palette import PaletteEngine  # noqa: E402
+
+
+def test_rgb_lut_is_channel_swapped_bgr_lut():
+    engine = PaletteEngine()
+    bgr = engine.lut("rainbow")
+    rgb = engine.lut("rainbow", rgb=True)
+    assert rgb.flags["C_CONTIGUOUS"]
+    assert (rgb == bgr[:, :, ::-1]).all()
+    assert engine.lut("rainbow", rgb=True) is rgb
+    gray = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    assert (engine.apply(gray, "rainbow", rgb=True) == engine.apply(gray, "rainbow")[:, :, ::-1]).all()
+
+
+def test_add_palette_replaces_cached_rgb_lut():
+    engine = PaletteEngine()
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    lut[:, 0, 0] = 255  # pure blue in BGR
+    engine.add_palette("mine", lut)
+    assert (engine.lut("mine", rgb=True)[:, 0] == (0, 0, 255)).all()
+    lut[:, 0] = (0, 255, 0)
+    engine.add_palette("mine", lut)
+    assert (engine.lut("mine", rgb=True)[:, 0] == (0, 255, 0)).all()
@@ -1,6 +1,8 @@
 import cv2, time, threading, serial
-from PIL import Image, ImageTk
-from utils import overlay_crosshair, build_sumcheck, checksum_response
+from PIL import Image
+from utils import build_sumcheck, checksum_response
+from thermal_capture import ThermalCapture
+from thermal_palette import palette_engine
 
 class ThermalCamera:
     def __init__(self, gui_ref):
@@ -34,8 +36,9 @@ class ThermalCamera:
         if self.streaming:
             self.gui._set_status("Thermal already streaming")
             return
-        self.cap = cv2.VideoCapture(index)
-        if not self.cap.isOpened():
+        self.cap = ThermalCapture(index)
+        if not self.cap.start():
+            self.cap = None
             self.gui._set_status("Cannot open thermal cam")
             return
         self.streaming = True
@@ -44,30 +47,17 @@ class ThermalCamera:
     def _tick(self):
         if not (self.streaming and self.cap):
             return
-        ok, frame = self.cap.read()
-        if ok:
-            show = self._apply_palette(frame)
-            if self.gui.crosshair_enabled:
-                show = overlay_crosshair(show)
+        # the capture worker does the blocking read; just take its newest frame
+        item = self.cap.latest()
+        if item is not None:
+            show = self._apply_palette(item.image)
             rgb = cv2.cvtColor(show, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(rgb)
-            imgtk = ImageTk.PhotoImage(image=img)
-            self.gui.thermal_video_label.imgtk = imgtk
-            self.gui.thermal_video_label.config(image=imgtk)
-        self.gui.root.after(30, self._tick)
+            self.gui.thermal_view.show(Image.fromarray(rgb))
+        self.gui.root.after(max(5, int(1000 / self.cap.fps)), self._tick)
 
     def _apply_palette(self, frame):
         try:
-            if self.palette == "white":
-                return cv2.applyColorMap(frame, cv2.COLORMAP_BONE)
-            elif self.palette == "black":
-                return cv2.applyColorMap(frame, cv2.COLORMAP_OCEAN)
-            elif self.palette == "rainbow":
-                return cv2.applyColorMap(frame, cv2.COLORMAP_JET)
-            elif self.palette == "green":
-                return cv2.applyColorMap(frame, cv2.COLORMAP_SUMMER)
-            elif self.palette == "metel":
-                return cv2.applyColorMap(frame, cv2.COLORMAP_HOT)
+            return palette_engine.apply(frame, self.palette)
         except:
             pass
         return frame
@@ -78,7 +68,7 @@ class ThermalCamera:
             if self.cap:
                 self.cap.release()
                 self.cap = None
-            self.gui.thermal_video_label.config(image="", text="", bg="black")
+            self.gui.thermal_view.clear()
         except:
             pass
         self.gui._set_status("Thermal stopped.")
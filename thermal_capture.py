@@ -0,0 +1,238 @@
+import cv2
+import threading
+import time
+from collections import namedtuple
+
+from frame_mailbox import FrameMailbox
+
+# seq: frame counter, timestamp: time.monotonic() right after the read returned
+ThermalFrame = namedtuple("ThermalFrame", ["seq", "timestamp", "image"])
+
+
+# ===================== SUBSCRIPTIONS =====================
+class ThermalSubscription:
+    """
+    One consumer of a ThermalCapture. It has its own latest-frame mailbox and an
+    optional target size (w, h) that may be changed at any time; None means the
+    native frame. Frames are shared by reference between subscribers and must be
+    treated as read-only.
+
+    A subscriber that needs every frame (a recorder) can pass callback, which is
+    called with each ThermalFrame on the capture thread instead of using the
+    mailbox; it must be quick and must not touch Tk.
+
+    stride, interpolation and paused let the load governor thin out display
+    subscribers: post every n-th frame, resize with a cheaper flag, or skip
+    the subscriber entirely while its target is hidden.
+    """
+
+    def __init__(self, source, name, size=None, callback=None):
+        self.source = source
+        self.name = name
+        self.size = size
+        self.callback = callback
+        self.stride = 1
+        self.interpolation = cv2.INTER_AREA
+        self.paused = False
+        self.mailbox = FrameMailbox(name)
+
+    def latest(self):
+        """Newest frame since the previous call, or None."""
+        return self.mailbox.take()
+
+    def close(self):
+        self.source.unsubscribe(self)
+
+
+# ===================== THERMAL CAPTURE WORKER =====================
+class ThermalCapture:
+    """
+    Owns the thermal cv2.VideoCapture and reads it on a background thread, so a
+    blocking read never stalls the Tk main loop. The device is opened once and
+    each timestamped frame is fanned out to every subscriber (main view, PiP,
+    recorder, ...). Subscribers asking for the same target size share a single
+    resized copy; subscribers without a size get the captured array itself.
+    With intensity=True frames are converted to single-channel grey on the
+    worker thread, ready for the palette LUT.
+
+    The worker is paced by the device: read() blocks until the next frame, and
+    if the driver hands frames back faster than its reported frame rate the
+    worker sleeps out the rest of the frame period.
+
+    With process=True the device is read in a capture process that writes into
+    a shared-memory ring; the worker here waits for new ring frames and fans
+    out zero-copy views (valid for the ring's 8 frames, so native-size
+    subscribers that keep a frame longer than that must copy it).
+    """
+
+    DEFAULT_FPS = 30.0
+
+    def __init__(self, index=0, name="thermal-capture", intensity=False, process=False):
+        self.index = index
+        self.intensity = intensity  # publish single-channel frames instead of BGR
+        self.process = process
+        self.name = name
+        self.cap = None
+        self.proc = None
+        self.running = False
+        self.thread = None
+        self.fps = self.DEFAULT_FPS
+        self._subs = {}
+        self._subs_lock = threading.Lock()
+        self.seq = 0
+        self.failures = 0
+        self.read_ms = 0.0
+        self.timestamp = None
+
+    def isOpened(self):
+        if self.proc is not None:
+            return self.proc.alive
+        return self.cap is not None and self.cap.isOpened()
+
+    def start(self):
+        """Open the device and start the worker. Returns False if it cannot be opened."""
+        if self.running:
+            return True
+        if self.process:
+            # only process mode needs capture_process (and with it GStreamer)
+            from capture_process import STAT_FPS, start_thermal_process
+            # the capture process always publishes grey frames
+            self.proc = start_thermal_process(self.index)
+            if not self.proc.wait_started():
+                self.proc.stop()
+                self.proc = None
+                return False
+            self.fps = self.proc.stats[STAT_FPS]
+            self._clear_mailboxes()
+            self.running = True
+            self.thread = threading.Thread(target=self._run_process, name=self.name, daemon=True)
+            self.thread.start()
+            return True
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            return False
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 0
+        self.fps = fps if 1 <= fps <= 240 else self.DEFAULT_FPS
+        self._clear_mailboxes()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+        if self.proc is not None:
+            self.proc.stop()
+            self.proc = None
+        if self.cap is not None:
+            try:
+                self.cap.release()
+            except Exception:
+                pass
+            self.cap = None
+        self._clear_mailboxes()
+
+    # cv2.VideoCapture-style alias so existing cleanup code keeps working
+    release = stop
+
+    # ---------------- Fan-out ----------------
+    def subscribe(self, name, size=None, callback=None):
+        """Register (or replace) the subscriber called name and return it."""
+        sub = ThermalSubscription(self, name, size, callback)
+        with self._subs_lock:
+            self._subs[name] = sub
+        return sub
+
+    def unsubscribe(self, sub):
+        name = sub if isinstance(sub, str) else sub.name
+        with self._subs_lock:
+            if isinstance(sub, str) or self._subs.get(name) is sub:
+                self._subs.pop(name, None)
+
+    @property
+    def subscribers(self):
+        with self._subs_lock:
+            return list(self._subs)
+
+    def latest(self):
+        """Newest native-size frame for the default subscriber, or None."""
+        with self._subs_lock:
+            sub = self._subs.get("default")
+        if sub is None:
+            sub = self.subscribe("default")
+        return sub.latest()
+
+    def _clear_mailboxes(self):
+        with self._subs_lock:
+            subs = list(self._subs.values())
+        for sub in subs:
+            sub.mailbox.clear()
+
+    def _fan_out(self, frame):
+        with self._subs_lock:
+            subs = list(self._subs.values())
+        h, w = frame.shape[:2]
+        scaled = {}
+        for sub in subs:
+            if sub.paused or self.seq % sub.stride:
+                continue
+            size = sub.size
+            if size is None or tuple(size) == (w, h):
+                img = frame
+            else:
+                size = (int(size[0]), int(size[1]))
+                key = (size, sub.interpolation)
+                img = scaled.get(key)
+                if img is None:
+                    img = scaled[key] = cv2.resize(frame, size, interpolation=sub.interpolation)
+            item = ThermalFrame(self.seq, self.timestamp, img)
+            if sub.callback is None:
+                sub.mailbox.post(item)
+                continue
+            try:
+                sub.callback(item)
+            except Exception:
+                pass
+
+    def _run(self):
+        period = 1.0 / self.fps
+        while self.running and self.cap is not None:
+            t0 = time.monotonic()
+            try:
+                ok, frame = self.cap.read()
+            except Exception:
+                ok, frame = False, None
+            t1 = time.monotonic()
+            self.read_ms = (t1 - t0) * 1000.0
+            if ok:
+                if self.intensity and frame.ndim == 3:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                self.seq += 1
+                self.timestamp = t1
+                self._fan_out(frame)
+            else:
+                self.failures += 1
+            spare = period - (time.monotonic() - t0)
+            if spare > 0.001:
+                time.sleep(spare)
+
+    def _run_process(self):
+        from capture_process import STAT_PROCESS_MS
+        ring = self.proc.rings["source"]
+        last = 0
+        while self.running and self.proc is not None:
+            if not self.proc.wait_frame(0.2):
+                continue
+            frame = ring.latest(last)
+            if frame is None:
+                continue
+            last = frame.seq
+            self.read_ms = self.proc.stats[STAT_PROCESS_MS]
+            self.seq += 1
+            self.timestamp = frame.timestamp
+            self._fan_out(frame.image)
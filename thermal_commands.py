@@ -0,0 +1,103 @@
+import serial
+import time
+
+from thermal_protocol import HEADER, HEADER_LEN, HOTSPOT, INFO_REQUESTS, PALETTE_SAVE, PALETTES, SETTINGS, checksum_ok
+
+# =================== LRF COMMANDS ===================
+STOP_MEASUREMENT        = bytes([0x55, 0xAA, 0x8E, 0xFF, 0xFF, 0xFF, 0xFF, 0x8A])
+CONTINUOUS_MEASUREMENT  = bytes([0x55, 0xAA, 0x89, 0xFF, 0xFF, 0xFF, 0xFF, 0x85])
+SINGLE_MEASUREMENT      = bytes([0x55, 0xAA, 0x88, 0xFF, 0xFF, 0xFF, 0xFF, 0x84])
+
+# ================= THERMAL COMMANDS =================
+# Frame layout and checksum: see thermal_protocol.
+def read_frame(ser, timeout=1.0):
+    """
+    Read one response frame: skip to a 0x68 header, read the 8 header bytes,
+    then exactly the payload length from byte 2. Returns the frame as soon as
+    its last byte arrives, or None on timeout. A 0x68 whose frame fails the
+    checksum, or never completes, is treated as a false sync and the scan
+    resumes at the next byte of what was already received.
+    """
+    deadline = time.monotonic() + timeout
+    buf = bytearray()
+
+    def fill(n):
+        while len(buf) < n:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ser.timeout = remaining
+            chunk = ser.read(n - len(buf))
+            if not chunk:
+                return False
+            buf.extend(chunk)
+        return True
+
+    while True:
+        start = buf.find(HEADER)
+        if start < 0:
+            buf.clear()
+            if not fill(1):
+                return None
+            continue
+        del buf[:start]
+        if not fill(HEADER_LEN):
+            return None
+        total = HEADER_LEN + buf[2]
+        if fill(total):
+            frame = bytes(buf[:total])
+            if checksum_ok(frame):
+                return frame
+        elif buf.find(HEADER, 1) < 0:
+            return None
+        del buf[:1]
+
+
+def send_to_ir_camera(ser, command, response_len=16, read_timeout=1):
+    """
+    Write one command frame (bytes from thermal_protocol; a hex string is
+    accepted for hand-typed commands) and return the payload of its response
+    frame, or 0 on timeout / bad frame. response_len is no longer needed:
+    the frame's own length byte decides how much is read.
+    """
+    try:
+        if isinstance(command, str):
+            command = bytes.fromhex(command)
+        ser.write(command)
+        frame = read_frame(ser, read_timeout)
+        if frame is None:
+            return 0
+        return frame[HEADER_LEN:]
+    except serial.SerialException:
+        return 0
+
+
+# Frames are encoded once by thermal_protocol; parameterised settings
+# encode with one struct.pack per value.
+THERMAL_FUNCTION_GROUPS = {
+    "color": {
+        "response_len": 10,
+        "functions": dict({name: {"data": frame} for name, frame in PALETTES.items()},
+                          save={"data": PALETTE_SAVE}),
+    },
+    "hotspot": {
+        "response_len": 12,
+        "functions": {name: {"data": frame} for name, frame in HOTSPOT.items()},
+    },
+}
+for _name, _setting in SETTINGS.items():
+    THERMAL_FUNCTION_GROUPS[_name] = {
+        "response_len": 12,
+        "parameterized": True,
+        "build_data": _setting.encode,
+    }
+
+THERMAL_INFO_REQUESTS = [
+    {"key": key, "label": label, "data": INFO_REQUESTS[key][0], "decode": INFO_REQUESTS[key][1], "response_len": n}
+    for key, label, n in (
+        ("chip_model", "Chip model: ", 10),
+        ("chip_id", "Chip ID: ", 16),
+        ("firmware", "Firmware ver: ", 12),
+        ("hardware", "Hardware ver: ", 12),
+    )
+]
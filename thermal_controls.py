@@ -0,0 +1,75 @@
+from coalesce import Coalescer
+from thermal_protocol import HOTSPOT, PALETTES, SETTINGS
+from uart_worker import PRIORITY_SETTING
+
+# Minimum time between two writes of the same setting. A UART round trip is
+# a few ms to tens of ms; a drag emits a value per pixel of slider travel.
+THERMAL_CONTROL_INTERVAL_S = 0.1
+SETTING_RESPONSE_LEN = 12
+SETTING_TIMEOUT_S = 2.0
+
+
+# Discrete settings: value -> precompiled frame
+CHOICES = {"palette": PALETTES, "hotspot": HOTSPOT}
+
+
+# ===================== THERMAL CAMERA SETTINGS =====================
+class ThermalControls:
+    """
+    Brightness, contrast, denoise, vstripe, zoom, palette and hotspot over
+    the thermal UART.
+
+    set(name, value) only records the latest value; a Coalescer hands it to
+    the UART worker at most every `min_interval` seconds per setting, so
+    values superseded during a drag are dropped before they are encoded and
+    never reach the wire. A value the camera has already acknowledged
+    (state) is not sent again. report(name, value, response, latency_ms,
+    error) is called on the coalescer thread once the camera has answered.
+    """
+
+    NAMES = tuple(SETTINGS) + tuple(CHOICES)
+
+    def __init__(self, uart, state, report=None, min_interval=THERMAL_CONTROL_INTERVAL_S):
+        self.uart = uart
+        self.state = state
+        self.report = report
+        self.skipped = 0
+        self.coalescer = Coalescer(self._apply, min_interval, self._done, name="thermal-controls")
+
+    def set(self, name, value):
+        if name in SETTINGS:
+            value = int(value)
+        elif name not in CHOICES:
+            raise ValueError(f"unknown thermal setting {name!r}")
+        elif value not in CHOICES[name]:
+            raise ValueError(f"unknown {name} {value!r}")
+        # a pending different value must still be superseded by this one
+        if self.state.get(name) == value and not self.coalescer.pending(name):
+            self.skipped += 1
+            return
+        self.coalescer.submit(name, value)
+
+    def _apply(self, name, value):
+        """Coalescer thread: send one setting and wait for the camera's answer; None if already set."""
+        if self.state.get(name) == value:
+            self.skipped += 1
+            return None
+        frame = CHOICES[name][value] if name in CHOICES else SETTINGS[name].encode(value)
+        response = self.uart.send(frame, SETTING_RESPONSE_LEN, priority=PRIORITY_SETTING,
+                                  label=name).result(SETTING_TIMEOUT_S)
+        if response == 0:
+            raise RuntimeError("no/invalid response")
+        self.state.record(name, value)
+        return response
+
+    def _done(self, name, value, result, latency_ms, error):
+        if result is None and error is None:
+            return  # nothing was sent
+        if self.report:
+            self.report(name, value, result, latency_ms, error)
+
+    def stats(self):
+        return dict(self.coalescer.stats(), skipped=self.skipped)
+
+    def close(self):
+        self.coalescer.close()
@@ -0,0 +1,153 @@
+import os
+import threading
+import cv2
+import numpy as np
+
+# ===================== BUILT-IN PALETTES =====================
+# Control points (intensity 0-255 -> RGB), linearly interpolated into a
+# 256-entry LUT. Names match THERMAL_FUNCTION_GROUPS["color"] on the camera.
+BUILTIN_PALETTES = {
+    "white": [(0, (0, 0, 0)), (255, (255, 255, 255))],                  # white hot
+    "black": [(0, (255, 255, 255)), (255, (0, 0, 0))],                  # black hot
+    "rainbow": [(0, (0, 0, 96)), (40, (0, 0, 255)), (96, (0, 255, 255)), (128, (0, 255, 0)),
+                (168, (255, 255, 0)), (216, (255, 0, 0)), (255, (255, 255, 255))],
+    "green": [(0, (0, 8, 0)), (192, (60, 230, 60)), (255, (220, 255, 220))],
+    "metel": [(0, (0, 0, 0)), (64, (72, 0, 140)), (128, (200, 36, 60)), (192, (255, 150, 0)),
+              (255, (255, 255, 210))],                                  # iron
+}
+
+
+def lut_from_points(points):
+    """Build a (256, 1, 3) BGR uint8 LUT from [(index, (r, g, b)), ...] control points."""
+    points = sorted(points)
+    xs = np.array([p[0] for p in points], dtype=np.float32)
+    rgb = np.array([p[1] for p in points], dtype=np.float32)
+    idx = np.arange(256, dtype=np.float32)
+    lut = np.empty((256, 1, 3), dtype=np.uint8)
+    for ch_out, ch_in in enumerate((2, 1, 0)):  # RGB control points -> BGR LUT
+        lut[:, 0, ch_out] = np.clip(np.rint(np.interp(idx, xs, rgb[:, ch_in])), 0, 255)
+    return lut
+
+
+def load_palette_file(path):
+    """
+    Load a palette file and return its LUT.
+
+    .npy files hold a (256, 3) RGB array. Text files (.txt/.csv/.pal) hold one
+    "r g b" or "r,g,b" row per line: 256 rows are used as-is, fewer rows are
+    spread evenly over 0-255 and interpolated. Lines starting with '#' are ignored.
+    """
+    if path.lower().endswith(".npy"):
+        rows = np.asarray(np.load(path), dtype=np.float32).reshape(-1, 3)
+    else:
+        rows = []
+        with open(path) as f:
+            for line in f:
+                line = line.split("#", 1)[0].replace(",", " ").split()
+                if line:
+                    rows.append([float(v) for v in line[:3]])
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, 3)
+    if len(rows) < 2:
+        raise ValueError(f"{path}: a palette needs at least 2 colours")
+    xs = np.linspace(0, 255, len(rows))
+    return lut_from_points([(x, tuple(c)) for x, c in zip(xs, rows)])
+
+
+def to_intensity(frame):
+    """Single-channel view/copy of a thermal frame (grey frames are returned as-is)."""
+    if frame.ndim == 2:
+        return frame
+    if frame.shape[2] == 1:
+        return frame[:, :, 0]
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+# ===================== PALETTE ENGINE =====================
+class PaletteEngine:
+    """
+    Caches one 256-entry LUT per palette and colourises single-channel
+    intensity frames with it in one pass (grey -> BGR, or grey -> RGB with
+    rgb=True for the display path). LUTs are built once, so switching
+    palettes is a dictionary lookup; the RGB-ordered copy is a channel swap
+    of the BGR LUT made the first time it is asked for.
+    """
+
+    def __init__(self):
+        self._luts = {}
+        self._rgb_luts = {}
+        self._custom = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self):
+        return list(BUILTIN_PALETTES) + [n for n in self._custom if n not in BUILTIN_PALETTES]
+
+    def lut(self, name, rgb=False):
+        if rgb:
+            return self._rgb_lut(name)
+        lut = self._luts.get(name)
+        if lut is None:
+            with self._lock:
+                lut = self._luts.get(name)
+                if lut is None:
+                    if name in self._custom:
+                        lut = self._custom[name]
+                    elif name in BUILTIN_PALETTES:
+                        lut = lut_from_points(BUILTIN_PALETTES[name])
+                    else:
+                        return None
+                    self._luts[name] = lut
+        return lut
+
+    def _rgb_lut(self, name):
+        lut = self._rgb_luts.get(name)
+        if lut is None:
+            bgr = self.lut(name)
+            if bgr is None:
+                return None
+            with self._lock:
+                lut = self._rgb_luts.get(name)
+                if lut is None:
+                    lut = np.ascontiguousarray(bgr[:, :, ::-1])
+                    self._rgb_luts[name] = lut
+        return lut
+
+    def add_palette(self, name, lut):
+        lut = np.ascontiguousarray(lut, dtype=np.uint8).reshape(256, 1, 3)
+        with self._lock:
+            self._custom[name] = lut
+            self._luts[name] = lut
+            self._rgb_luts.pop(name, None)
+
+    def load_file(self, path, name=None):
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        self.add_palette(name, load_palette_file(path))
+        return name
+
+    def load_dir(self, path):
+        """Load every palette file in a directory; returns the names that loaded."""
+        loaded = []
+        if not os.path.isdir(path):
+            return loaded
+        for fn in sorted(os.listdir(path)):
+            if fn.lower().endswith((".npy", ".txt", ".csv", ".pal")):
+                try:
+                    loaded.append(self.load_file(os.path.join(path, fn)))
+                except Exception:
+                    pass
+        return loaded
+
+    def apply(self, frame, name, dst=None, rgb=False):
+        """Colourise frame with palette name (BGR, or RGB if rgb); unknown palettes return the frame unchanged."""
+        lut = self.lut(name, rgb)
+        if lut is None or frame is None:
+            return frame
+        gray = to_intensity(frame)
+        try:
+            return cv2.applyColorMap(gray, lut, dst=dst)
+        except cv2.error:
+            # older OpenCV without user colour maps: plain table lookup
+            return lut[:, 0][gray]
+
+
+palette_engine = PaletteEngine()
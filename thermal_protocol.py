@@ -0,0 +1,124 @@
+import struct
+from collections import namedtuple
+
+# ===================== THERMAL UART FRAMES =====================
+# 0x68, cmd, payload length, address, 2 reserved bytes, checksum (u16 LE), payload.
+# The checksum is the 16-bit sum of every other byte of the frame.
+HEADER = 0x68
+ADDRESS = 0x01
+FRAME_HEADER = struct.Struct("<BBBBHH")
+HEADER_LEN = FRAME_HEADER.size
+
+Frame = namedtuple("Frame", ["cmd", "address", "payload"])
+
+# One precompiled layout per payload length: cmd, address and the payload
+# come out of a single unpack_from with no intermediate slicing.
+_LAYOUTS = tuple(struct.Struct(f"<xBxBxxxx{n}s") for n in range(256))
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def encode(cmd, payload=b"", address=ADDRESS):
+    """One complete request frame as bytes."""
+    payload = bytes(payload)
+    checksum = (HEADER + cmd + len(payload) + address + sum(payload)) & 0xFFFF
+    return FRAME_HEADER.pack(HEADER, cmd, len(payload), address, 0, checksum) + payload
+
+
+def checksum_ok(frame):
+    return (frame[6] | frame[7] << 8) == (sum(frame) - frame[6] - frame[7]) & 0xFFFF
+
+
+def decode(frame, _new=tuple.__new__):
+    """Frame(cmd, address, payload) of a complete frame; ProtocolError if it is not one."""
+    if len(frame) < HEADER_LEN:
+        raise ProtocolError(f"short frame ({len(frame)} bytes)")
+    if frame[0] != HEADER:
+        raise ProtocolError(f"bad header 0x{frame[0]:02X}")
+    layout = _LAYOUTS[frame[2]]
+    if len(frame) != layout.size:
+        raise ProtocolError(f"length byte says {frame[2]}, frame carries {len(frame) - HEADER_LEN}")
+    if (frame[6] | frame[7] << 8) != (sum(frame) - frame[6] - frame[7]) & 0xFFFF:
+        raise ProtocolError("checksum mismatch")
+    return _new(Frame, layout.unpack_from(frame))
+
+
+# ===================== SETTINGS (cmd 0x24) =====================
+# payload: group, selector, value, 0. The frame is one struct; its checksum
+# is a per-setting constant plus the value byte.
+SET_CMD = 0x24
+_SETTING_FRAME = struct.Struct("<BBBBHHBBBB")
+
+
+class Setting:
+    __slots__ = ("name", "group", "selector", "limits", "mask", "_base")
+
+    def __init__(self, name, group, selector, limits=None, mask=0xFF):
+        self.name = name
+        self.group = group
+        self.selector = selector
+        self.limits = limits
+        self.mask = mask
+        self._base = HEADER + SET_CMD + 4 + ADDRESS + group + selector
+
+    def encode(self, value):
+        value = int(value)
+        if self.limits is not None and not (self.limits[0] <= value <= self.limits[1]):
+            raise ValueError(f"{self.name} must be between {self.limits[0]} and {self.limits[1]}")
+        value &= self.mask
+        return _SETTING_FRAME.pack(HEADER, SET_CMD, 4, ADDRESS, 0, (self._base + value) & 0xFFFF,
+                                   self.group, self.selector, value, 0)
+
+    @staticmethod
+    def decode_value(frame):
+        """The value byte of an encoded setting frame (the inverse of encode)."""
+        return _SETTING_FRAME.unpack(frame)[8]
+
+
+SETTINGS = {
+    "brightness": Setting("brightness", 0x02, 0x00, (10, 250)),
+    "contrast":   Setting("contrast",   0x02, 0x01, (10, 250)),
+    "denoise":    Setting("denoise",    0x02, 0x05),
+    "vstripe":    Setting("vstripe",    0x02, 0x07, mask=0x01),
+    "zoom":       Setting("zoom",       0x04, 0x01, (1, 16)),
+}
+
+# ===================== STATIC COMMANDS (built once) =====================
+PALETTES = {name: encode(0x11, (0x02, 0x01, i))
+            for i, name in enumerate(("rainbow", "green", "metel", "white", "black"))}
+PALETTE_SAVE = encode(0x11, (0x03,))
+HOTSPOT = {"on": encode(0x10, (0x02, 0x01, 0x01)), "off": encode(0x10, (0x02, 0x01, 0x00))}
+
+
+# ===================== TYPED RESPONSES =====================
+# Multi-byte fields come least significant byte first.
+class Version(tuple):
+    """Version bytes, most significant first; str() gives "1.2.3"."""
+
+    def __str__(self):
+        return ".".join(str(p) for p in self)
+
+
+def decode_text(payload):
+    text = bytes(payload).rstrip(b"\x00")
+    if text and all(32 <= c < 127 for c in text):
+        return text.decode("ascii")
+    return bytes(reversed(payload)).hex(" ").upper()
+
+
+def decode_int(payload):
+    return int.from_bytes(payload, "little")
+
+
+def decode_version(payload):
+    return Version(tuple(reversed(payload)))
+
+
+INFO_REQUESTS = {
+    "chip_model": (encode(0x01), decode_text),
+    "chip_id":    (encode(0x35), decode_int),
+    "firmware":   (encode(0x10, (0x01, 0x00)), decode_version),
+    "hardware":   (encode(0x10, (0x01, 0x01)), decode_version),
+}
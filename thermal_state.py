@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+# Identity of every thermal camera seen so far, keyed by chip ID, and the
+# chip ID last seen on each serial port
+DEVICE_CACHE_PATH = "./thermal_devices.json"
+IDENTITY_KEYS = ("chip_model", "chip_id", "firmware", "hardware")
+
+
+# ===================== THERMAL CAMERA STATE CACHE =====================
+class ThermalState:
+    """
+    What the host knows about the connected thermal camera.
+
+    settings: values the camera has acknowledged since the port was opened
+    (brightness, zoom, palette, ...). The protocol has no read-back for them,
+    so they are only trusted for the current connection and invalidate()
+    drops them on every (re)connect. identity: chip model, chip ID and
+    firmware/hardware versions, which never change for one chip; they are
+    persisted to `path` so a reconnect only has to confirm the chip ID.
+    Updated from the UART worker and coalescer threads, hence the lock.
+    """
+
+    def __init__(self, path=DEVICE_CACHE_PATH):
+        self.path = path
+        self.port = None
+        self.settings = {}
+        self.identity = {}
+        self._lock = threading.Lock()
+        self._devices = {"ports": {}, "chips": {}}
+        self._load()
+
+    # ---------------- Settings ----------------
+    def get(self, name):
+        with self._lock:
+            return self.settings.get(name)
+
+    def record(self, name, value):
+        with self._lock:
+            self.settings[name] = value
+
+    def forget_settings(self):
+        with self._lock:
+            self.settings.clear()
+
+    def invalidate(self, port=None):
+        with self._lock:
+            self.port = port
+            self.settings.clear()
+            self.identity = {}
+
+    # ---------------- Identity ----------------
+    @property
+    def identified(self):
+        with self._lock:
+            return all(k in self.identity for k in IDENTITY_KEYS)
+
+    def cached_identity(self, port):
+        """The persisted identity of the chip last seen on port, or None."""
+        with self._lock:
+            chip = self._devices["ports"].get(port)
+            identity = self._devices["chips"].get(chip) if chip is not None else None
+            return dict(identity) if identity else None
+
+    def set_identity(self, identity):
+        """Adopt a complete identity for the current port and persist it."""
+        with self._lock:
+            self.identity = dict(identity)
+            chip = self.identity["chip_id"]
+            self._devices["chips"][chip] = dict(self.identity)
+            if self.port is not None:
+                self._devices["ports"][self.port] = chip
+            devices = json.loads(json.dumps(self._devices))
+        self._save(devices)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._devices = {"ports": dict(data.get("ports", {})), "chips": dict(data.get("chips", {}))}
+        except (OSError, ValueError):
+            pass
+
+    def _save(self, devices):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(devices, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only working directory only costs the cache
@@ -0,0 +1,115 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from latency import Histogram
+
+# Lower runs first. Settings the operator is dragging go ahead of queued
+# informational reads; FIFO within one priority.
+PRIORITY_SETTING = 0
+PRIORITY_COMMAND = 1
+PRIORITY_QUERY = 2
+
+
+class UartCommand:
+    __slots__ = ("data", "response_len", "label", "future", "submitted_at", "rtt_ms")
+
+    def __init__(self, data, response_len, label):
+        self.data = data
+        self.response_len = response_len
+        self.label = label
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.rtt_ms = None
+
+
+# ===================== SERIAL COMMAND WORKER =====================
+class UartWorker:
+    """
+    The only thread that touches one serial port. Commands are queued by
+    priority and run strictly one at a time: write the request, read its
+    response, complete its Future. Nothing else reads the port in between,
+    so a response always belongs to the command that is on the wire; stale
+    bytes left from an earlier timed-out command are flushed before each write.
+
+    transact(ser, data, response_len) does the actual exchange and returns the
+    response (whatever the protocol layer returns, e.g. payload bytes or 0).
+    Round-trip times (write to response) are kept in a Histogram.
+    """
+
+    def __init__(self, ser, transact, name="uart-worker"):
+        self.ser = ser
+        self.transact = transact
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self.rtt = Histogram()
+        self.sent = 0
+        self.failed = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, data, response_len, priority=PRIORITY_COMMAND, callback=None, label=None):
+        """Queue one command; returns a Future whose result is the response. callback(response) runs on the worker."""
+        cmd = UartCommand(data, response_len, label)
+        if callback is not None:
+            cmd.future.add_done_callback(lambda f: callback(f.result() if not f.cancelled() and f.exception() is None else 0))
+        if not self.running:
+            cmd.future.set_exception(RuntimeError("UART worker stopped"))
+            return cmd.future
+        self._queue.put((priority, next(self._seq), cmd))
+        return cmd.future
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            _, _, cmd = self._queue.get()
+            if cmd is None:
+                return
+            if not cmd.future.set_running_or_notify_cancel():
+                continue  # cancelled while queued
+            try:
+                self.ser.reset_input_buffer()
+                t0 = time.monotonic()
+                response = self.transact(self.ser, cmd.data, cmd.response_len)
+                cmd.rtt_ms = (time.monotonic() - t0) * 1000.0
+            except Exception as e:
+                self.failed += 1
+                cmd.future.set_exception(e)
+                continue
+            self.sent += 1
+            self.rtt.add(cmd.rtt_ms)
+            if not response:
+                self.failed += 1
+            cmd.future.rtt_ms = cmd.rtt_ms
+            cmd.future.set_result(response)
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "queued": self.pending(),
+            "rtt_ms": {"mean": self.rtt.mean, "p50": self.rtt.percentile(50),
+                       "p99": self.rtt.percentile(99), "max": self.rtt.max},
+        }
+
+    def stop(self, timeout=2.0):
+        """Finish the command on the wire, fail everything still queued."""
+        self.running = False
+        dropped = []
+        try:
+            while True:
+                dropped.append(self._queue.get_nowait()[2])
+        except queue.Empty:
+            pass
+        for cmd in dropped:
+            if cmd is not None and cmd.future.set_running_or_notify_cancel():
+                cmd.future.set_exception(RuntimeError("UART worker stopped"))
+        self._queue.put((-1, -1, None))
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
@@ -0,0 +1,126 @@
+import tkinter as tk
+
+try:
+    from PIL import ImageTk
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+
+# ===================== VIDEO CANVAS + VECTOR HUD =====================
+class VideoCanvas(tk.Canvas):
+    """
+    Video display widget: one canvas image item for the frame plus persistent
+    vector HUD items (crosshair, range text, zoom indicator, border) drawn by
+    Tk on top of it. Frames are pasted into a reused PhotoImage; HUD items are
+    only reconfigured when their value (or the canvas size) changes, so there
+    is no per-frame pixel work for overlays.
+    """
+
+    HUD_COLOUR = "#ff0000"
+    TEXT_COLOUR = "cyan"
+    FONT = ("Segoe UI", 12, "bold")
+    SMALL_FONT = ("Segoe UI", 9)
+
+    def __init__(self, parent, border=False, **kw):
+        kw.setdefault("bg", "black")
+        kw.setdefault("highlightthickness", 0)
+        super().__init__(parent, **kw)
+        self.imgtk = None
+        self._image_item = self.create_image(0, 0, anchor="center")
+        self._message_item = self.create_text(0, 0, text="", fill="white", font=self.FONT)
+        self._cross_items = (self.create_line(0, 0, 0, 0, fill=self.HUD_COLOUR, width=2, state="hidden"),
+                             self.create_line(0, 0, 0, 0, fill=self.HUD_COLOUR, width=2, state="hidden"))
+        self._range_item = self.create_text(0, 0, text="", anchor="ne", fill=self.TEXT_COLOUR, font=self.FONT)
+        self._zoom_item = self.create_text(0, 0, text="", anchor="nw", fill=self.TEXT_COLOUR, font=self.FONT)
+        self._border_item = self.create_rectangle(0, 0, 0, 0, outline="white", width=2, state="hidden")
+        self._stats_item = self.create_text(0, 0, text="", anchor="sw", fill=self.TEXT_COLOUR, font=self.SMALL_FONT)
+        self._hud = {"crosshair": False, "range": "", "zoom": "", "border": False, "message": "", "stats": ""}
+        self.range_offset_y = 8  # distance of the range text from the top edge
+        self._size = (0, 0)
+        self.bind("<Configure>", self._on_configure)
+        if border:
+            self.set_border(True)
+
+    # ---------------- Frame ----------------
+    def show(self, img):
+        """Display a PIL image, reusing the PhotoImage while the size is unchanged."""
+        if not PIL_AVAILABLE:
+            return
+        if self.imgtk is not None and (self.imgtk.width(), self.imgtk.height()) == img.size:
+            try:
+                self.imgtk.paste(img)
+            except Exception:
+                self.imgtk = None
+        if self.imgtk is None or (self.imgtk.width(), self.imgtk.height()) != img.size:
+            self.imgtk = ImageTk.PhotoImage(img)
+            self.itemconfigure(self._image_item, image=self.imgtk, state="normal")
+        if self._hud["message"]:
+            self.set_message("")
+
+    def clear(self, message=""):
+        """Blank the frame (keeps the HUD) and optionally show a centred message."""
+        self.imgtk = None
+        self.itemconfigure(self._image_item, image="")
+        self.set_message(message)
+
+    # ---------------- HUD ----------------
+    def _changed(self, key, value):
+        if self._hud[key] == value:
+            return False
+        self._hud[key] = value
+        return True
+
+    def set_message(self, text):
+        if self._changed("message", text):
+            self.itemconfigure(self._message_item, text=text)
+
+    def set_crosshair(self, enabled):
+        if self._changed("crosshair", bool(enabled)):
+            state = "normal" if enabled else "hidden"
+            for item in self._cross_items:
+                self.itemconfigure(item, state=state)
+
+    def set_range(self, text):
+        if self._changed("range", text or ""):
+            self.itemconfigure(self._range_item, text=text or "")
+
+    def set_range_offset(self, y):
+        if y != self.range_offset_y:
+            self.range_offset_y = y
+            self._layout()
+
+    def set_zoom(self, text):
+        if self._changed("zoom", text or ""):
+            self.itemconfigure(self._zoom_item, text=text or "")
+
+    def set_stats(self, text):
+        """Bottom-left diagnostics line (latency HUD); empty hides it."""
+        if self._changed("stats", text or ""):
+            self.itemconfigure(self._stats_item, text=text or "")
+
+    def set_border(self, enabled):
+        if self._changed("border", bool(enabled)):
+            self.itemconfigure(self._border_item, state="normal" if enabled else "hidden")
+
+    # ---------------- Geometry ----------------
+    def _on_configure(self, event):
+        size = (event.width, event.height)
+        if size != self._size:
+            self._size = size
+            self._layout()
+
+    def _layout(self):
+        w, h = self._size
+        cx, cy = w // 2, h // 2
+        self.coords(self._image_item, cx, cy)
+        self.coords(self._message_item, cx, cy)
+        size = max(10, min(w, h) // 20)
+        self.coords(self._cross_items[0], cx - size, cy, cx + size, cy)
+        self.coords(self._cross_items[1], cx, cy - size, cx, cy + size)
+        self.coords(self._range_item, w - 8, self.range_offset_y)
+        self.coords(self._zoom_item, 8, 8)
+        self.coords(self._border_item, 1, 1, w - 1, h - 1)
+        self.coords(self._stats_item, 8, h - 6)
+        for item in (*self._cross_items, self._range_item, self._zoom_item, self._stats_item, self._border_item):
+            self.tag_raise(item)